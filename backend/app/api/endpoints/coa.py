@@ -1,16 +1,19 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import bump_cache_version
 from core.database import get_session
+from core.etag import collection_etag, etag_matches, not_modified, set_etag
 from core.deps import get_current_user
 from models.models import ChartOfAccount
 from models.user_models import User, UserRole
 from pydantic import BaseModel
+from services.account_registry import account_registry
 
 
 class AccountBase(BaseModel):
@@ -57,16 +60,20 @@ async def create_account(
 
     db_account = ChartOfAccount(**account.model_dump())
     session.add(db_account)
+    await bump_cache_version(session, account_registry.version_key)
     await session.commit()
+    account_registry.invalidate()
     await session.refresh(db_account)
     return db_account
 
 
 @router.get("/", response_model=List[AccountResponse])
 async def get_accounts(
+    response: Response,
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
     x_user_role: str = Header(..., alias="X-User-Role"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
 ):
     # Admin and invoicing users can view list
     if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER] or x_user_role.lower() not in ["admin", "invoicing_user"]:
@@ -75,6 +82,10 @@ async def get_accounts(
             detail="Only admin and invoicing users can view accounts",
         )
 
+    etag = await collection_etag(session, (account_registry.version_key,))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     result = await session.execute(select(ChartOfAccount))
     return result.scalars().all()
 
@@ -123,7 +134,9 @@ async def update_account(
     for field, value in update_data.items():
         setattr(account, field, value)
 
+    await bump_cache_version(session, account_registry.version_key)
     await session.commit()
+    account_registry.invalidate()
     await session.refresh(account)
     return account
 
@@ -148,5 +161,7 @@ async def delete_account(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
 
     await session.delete(account)
+    await bump_cache_version(session, account_registry.version_key)
     await session.commit()
+    account_registry.invalidate()
     return None
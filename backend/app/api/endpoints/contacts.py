@@ -1,14 +1,17 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from uuid import UUID
 
+from core.cache import CONTACTS_VERSION_KEY, bump_cache_version
 from core.database import get_session
+from core.etag import collection_etag, etag_matches, not_modified, set_etag
 from core.deps import get_current_user
 from models.models import Contact
 from models.user_models import User, UserRole
 from schemas.schemas import ContactCreate, ContactResponse, ContactUpdate
+from services.contact_search import contact_search_index, search_contacts
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
@@ -53,14 +56,18 @@ async def create_contact(
     
     db_contact = Contact(**contact.model_dump())
     session.add(db_contact)
+    await bump_cache_version(session, CONTACTS_VERSION_KEY)
     await session.commit()
+    contact_search_index.invalidate()
     await session.refresh(db_contact)
     return db_contact
 
 @router.get("/", response_model=List[ContactResponse])
 async def get_contacts(
+    response: Response,
     current_user: User = Depends(verify_user_role),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
 ):
     # Build query based on user role
     if current_user.role == UserRole.CONTACT_USER:
@@ -75,10 +82,31 @@ async def get_contacts(
             detail="Insufficient permissions to access contacts"
         )
     
+    # contact users get a different (single-row) list, so their tag is scoped to them
+    scope = str(current_user.id) if current_user.role == UserRole.CONTACT_USER else ""
+    etag = await collection_etag(session, (CONTACTS_VERSION_KEY,), scope)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     result = await session.execute(query)
     contacts = result.scalars().all()
     return contacts
 
+@router.get("/search", response_model=List[ContactResponse])
+async def search(
+    q: str = Query(..., min_length=1, max_length=100, description="Part of a name, email or mobile; close spellings match too"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(verify_user_role),
+    session: AsyncSession = Depends(get_session)
+):
+    # Only admin and invoicing_user can search the contact book
+    if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient permissions to search contacts"
+        )
+    return await search_contacts(session, q, limit)
+
 @router.get("/{contact_id}", response_model=ContactResponse)
 async def get_contact(
     contact_id: UUID,
@@ -133,7 +161,9 @@ async def update_contact(
     for field, value in contact_update.model_dump(exclude_unset=True).items():
         setattr(contact, field, value)
     
+    await bump_cache_version(session, CONTACTS_VERSION_KEY)
     await session.commit()
+    contact_search_index.invalidate()
     await session.refresh(contact)
     return contact
 
@@ -156,5 +186,7 @@ async def delete_contact(
         raise HTTPException(status_code=404, detail="Contact not found")
     
     await session.delete(contact)
+    await bump_cache_version(session, CONTACTS_VERSION_KEY)
     await session.commit()
+    contact_search_index.invalidate()
     return {"message": "Contact deleted successfully"}
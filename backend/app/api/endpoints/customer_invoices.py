@@ -1,13 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Response
+from fastapi.responses import StreamingResponse
 from typing import Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.counting import CountMode
 from core.deps import get_current_user
+from core.exceptions import ConflictError
+from core.filters import ListFilters
+from core.projection import parse_projection, projected_response
 from models.user_models import User, UserRole
-from core.database import get_session
-from schemas.schemas import CustomerInvoiceCreate, CustomerInvoiceResponse
-from schemas.schemas import CustomerInvoiceCreate, CustomerInvoiceResponse
+from core.database import AsyncSessionLocal, get_session
+from core.streaming import ExportFormat, stream_documents
+from schemas.schemas import (
+    CustomerInvoiceCreate,
+    CustomerInvoiceResponse,
+    CustomerInvoiceSummary,
+    InvoiceBatchFromSalesOrders,
+)
 from pydantic import BaseModel
 from services.customer_invoice_service import CustomerInvoiceService
 
@@ -68,13 +80,41 @@ async def create_customer_invoice(
 
 @router.get("/", response_model=list[CustomerInvoiceResponse])
 async def list_customer_invoices(
+    response: Response,
+    format: ExportFormat = Query('json', description="'ndjson' or 'csv' stream the matching invoices as an export"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    include: Optional[str] = Query(None, description="'lines' to return line items"),
+    filters: ListFilters = Depends(),
+    count: CountMode = Query('exact', description="X-Total-Count: exact, estimated (planner statistics) or none"),
     current_user: User = Depends(verify_user_role),
     session: AsyncSession = Depends(get_session)
 ):
+    """Invoices matching the filters, newest first by default; the number of matches is
+    returned in X-Total-Count (json only).
+    """
     if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
+    if format != 'json':
+        # validated here: once streaming has started the status code is already sent
+        try:
+            stmt = CustomerInvoiceService.list_statement(filters)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        async def invoices():
+            async with AsyncSessionLocal() as stream_session:
+                async for inv in CustomerInvoiceService(stream_session).stream_invoices(stmt):
+                    yield inv
+        return stream_documents(invoices, format, CustomerInvoiceResponse, "customer-invoices")
     service = CustomerInvoiceService(session)
-    return await service.list_invoices()
+    try:
+        projection = parse_projection(fields, include, CustomerInvoiceResponse)
+        page = await service.list_invoices(include_lines=projection.include_lines, filters=filters, count=count)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Total-Count": str(page.total)} if page.total is not None else {}
+    response.headers.update(headers)
+    return projected_response(page.items, projection, CustomerInvoiceSummary, headers)
 
 
 @router.get("/{invoice_id}", response_model=CustomerInvoiceResponse)
@@ -103,5 +143,31 @@ async def create_invoice_from_sales_order(
     service = CustomerInvoiceService(session)
     try:
         return await service.create_invoice_from_sales_order(sales_order_id)
+    except ConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/from-sales-orders")
+async def create_invoices_from_sales_orders(
+    payload: InvoiceBatchFromSalesOrders,
+    current_user: User = Depends(verify_user_role),
+):
+    """Invoice many confirmed sales orders; progress is streamed as NDJSON, one event per chunk."""
+    if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+
+    async def events():
+        # the request-scoped session is closed once the response starts, so the stream owns its own
+        async with AsyncSessionLocal() as session:
+            service = CustomerInvoiceService(session)
+            async for event in service.create_invoices_from_sales_orders(
+                sales_order_ids=payload.sales_order_ids,
+                date_from=payload.date_from,
+                date_to=payload.date_to,
+                chunk_size=payload.chunk_size,
+            ):
+                yield json.dumps(event) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
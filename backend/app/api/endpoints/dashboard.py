@@ -1,12 +1,20 @@
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+import asyncio
+import json
+from datetime import date
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
 
+from config.settings import settings
 from core.deps import get_current_user
-from core.database import get_session
+from core.database import AsyncSessionLocal, get_session
+from core.events import RESYNC, event_bus
+from core.streaming import SSE_KEEPALIVE, sse_event
 from models.user_models import User, UserRole
-from schemas.schemas import DashboardResponse, DashboardMonthlyItem
+from schemas.schemas import DashboardResponse
+from services.dashboard_cache import dashboard_cache
+from services.dashboard_service import DashboardService
 
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
@@ -29,6 +37,8 @@ async def verify_user_role(
 
 @router.get("/", response_model=DashboardResponse)
 async def get_dashboard(
+    date_from: Optional[date] = Query(None, description="Count payments dated on or after this day"),
+    date_to: Optional[date] = Query(None, description="Count payments dated on or before this day"),
     current_user: User = Depends(verify_user_role),
     session: AsyncSession = Depends(get_session),
 ):
@@ -36,80 +46,52 @@ async def get_dashboard(
     if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
 
-    # Totals
-    total_revenue = 0.0
-    total_expenses = 0.0
-    total_items_in_stock = 0
-
-    # Use SQL as we don't have a Payments ORM model defined
-    # Sum of receive amounts
-    revenue_sql = text(
-        """
-        SELECT COALESCE(SUM(amount), 0) AS total
-        FROM payments
-        WHERE payment_direction = 'receive'
-        """
-    )
-    # Sum of send amounts
-    expenses_sql = text(
-        """
-        SELECT COALESCE(SUM(amount), 0) AS total
-        FROM payments
-        WHERE payment_direction = 'send'
-        """
-    )
-    # Total stock items as sum of current_stock across products
-    stock_sql = text(
-        """
-        SELECT COALESCE(SUM(current_stock), 0) AS total
-        FROM products
-        """
-    )
-
-    res_rev = await session.execute(revenue_sql)
-    total_revenue = float(res_rev.scalar() or 0)
-
-    res_exp = await session.execute(expenses_sql)
-    total_expenses = float(res_exp.scalar() or 0)
+    key = (current_user.role.value, date_from, date_to)
+    try:
+        return await dashboard_cache.get(
+            session, key, lambda: DashboardService(session).get_dashboard(date_from, date_to)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    res_stock = await session.execute(stock_sql)
-    total_items_in_stock = int(res_stock.scalar() or 0)
 
-    # Sales vs Purchases by month (based on payments.payment_date month)
-    # We format month as YYYY-MM
-    monthly_sql = text(
-        """
-        WITH months AS (
-            SELECT to_char(payment_date, 'YYYY-MM') AS ym,
-                   payment_direction,
-                   SUM(amount) AS total
-            FROM payments
-            GROUP BY 1, 2
-        )
-        SELECT ym,
-               COALESCE(SUM(CASE WHEN payment_direction = 'receive' THEN total END), 0) AS sales,
-               COALESCE(SUM(CASE WHEN payment_direction = 'send' THEN total END), 0) AS purchases
-        FROM months
-        GROUP BY ym
-        ORDER BY ym
-        """
-    )
+@router.get("/stream")
+async def stream_dashboard(
+    current_user: User = Depends(verify_user_role),
+):
+    """Server-sent events: a ``dashboard`` snapshot first, then ``payment`` deltas (sales and
+    purchases to add to a month and the totals) and ``invoice`` state changes as they
+    commit. A fresh ``dashboard`` snapshot replaces the deltas whenever some may have
+    been lost."""
+    if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+    key = (current_user.role.value, None, None)
 
-    res_monthly = await session.execute(monthly_sql)
-    sales_vs_purchases: list[DashboardMonthlyItem] = []
-    for row in res_monthly.mappings():
-        sales_vs_purchases.append(
-            DashboardMonthlyItem(
-                month=row["ym"],
-                sales=float(row["sales"] or 0),
-                purchases=float(row["purchases"] or 0),
+    async def snapshot() -> str:
+        # the request session is closed once streaming starts; use a short-lived one
+        async with AsyncSessionLocal() as session:
+            dashboard = await dashboard_cache.get(
+                session, key, lambda: DashboardService(session).get_dashboard()
             )
-        )
+        return sse_event("dashboard", dashboard.model_dump_json())
+
+    async def events():
+        # subscribe before the snapshot so no event between the two is missed
+        async with event_bus.subscribe() as queue:
+            yield await snapshot()
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), settings.SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield SSE_KEEPALIVE
+                    continue
+                if message["type"] == RESYNC["type"]:
+                    yield await snapshot()
+                else:
+                    yield sse_event(message["type"], json.dumps(message["data"], default=str))
 
-    return DashboardResponse(
-        total_revenue=total_revenue,
-        total_expenses=total_expenses,
-        net_profit=float(total_revenue - total_expenses),
-        total_items_in_stock=total_items_in_stock,
-        sales_vs_purchases=sales_vs_purchases,
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Response
 from typing import Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.counting import CountMode
 from core.deps import get_current_user
+from core.filters import ListFilters
 from models.user_models import User, UserRole
 from core.database import get_session
-from schemas.schemas import PaymentCreate, PaymentResponse, PaymentUpdate
+from schemas.schemas import DocumentPaymentsResponse, PaymentCreate, PaymentResponse, PaymentUpdate
 from services.payment_service import PaymentService
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
@@ -41,13 +43,51 @@ async def create_payment(
 
 @router.get("/", response_model=list[PaymentResponse])
 async def list_payments(
+    response: Response,
+    filters: ListFilters = Depends(),
+    count: CountMode = Query('exact', description="X-Total-Count: exact, estimated (planner statistics) or none"),
     current_user: User = Depends(verify_user_role),
     session: AsyncSession = Depends(get_session)
 ):
+    """Payments matching the filters, newest first by default; the number of matches is
+    returned in X-Total-Count.
+    """
     if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     service = PaymentService(session)
-    return await service.list_payments()
+    try:
+        page = await service.list_payments(filters, count=count)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
+    return page.items
+
+@router.get("/vendor-bill/{bill_id}", response_model=DocumentPaymentsResponse)
+async def vendor_bill_payments(
+    bill_id: UUID,
+    current_user: User = Depends(verify_user_role),
+    session: AsyncSession = Depends(get_session)
+):
+    if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    summary = await PaymentService(session).document_payments(vendor_bill_id=bill_id)
+    if not summary:
+        raise HTTPException(status_code=404, detail="Vendor Bill not found")
+    return summary
+
+@router.get("/customer-invoice/{invoice_id}", response_model=DocumentPaymentsResponse)
+async def customer_invoice_payments(
+    invoice_id: UUID,
+    current_user: User = Depends(verify_user_role),
+    session: AsyncSession = Depends(get_session)
+):
+    if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    summary = await PaymentService(session).document_payments(customer_invoice_id=invoice_id)
+    if not summary:
+        raise HTTPException(status_code=404, detail="Customer Invoice not found")
+    return summary
 
 @router.get("/{payment_id}", response_model=PaymentResponse)
 async def get_payment(
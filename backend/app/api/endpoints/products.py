@@ -1,12 +1,16 @@
 from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, status, Query, Header, HTTPException
+from fastapi import APIRouter, Depends, status, Query, Header, HTTPException, Response
+from core.etag import collection_etag, etag_matches, not_modified, set_etag
 from core.deps import get_current_user
 from models.user_models import User, UserRole
-from schemas.schemas import Product as ProductSchema, ProductCreate, ProductUpdate, HSNResponse
+from schemas.schemas import Product as ProductSchema, ProductCreate, ProductUpdate, HSNResponse, ProductSuggestion
 from core.database import get_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from services.product_service import ProductService
+from services.tax_registry import tax_registry
+from services.product_autocomplete import AutocompleteField, product_autocomplete
+from repositories.product_repository import product_cache
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
@@ -41,16 +45,40 @@ async def verify_user_role(
 
 @router.get("/", response_model=list[ProductSchema])
 async def get_products(
+    response: Response,
     current_user: User = Depends(verify_user_role),
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
 ):
-    """List products. Requires invoicing_user or admin."""
+    """List products. Requires invoicing_user or admin.
+
+    Answers 304 while neither products nor taxes (joined in) changed since ``If-None-Match``.
+    """
     if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+    etag = await collection_etag(session, (product_cache.version_key, tax_registry.version_key))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     service = ProductService(session)
     return await service.list_products()
 
 
+@router.get("/autocomplete", response_model=list[ProductSuggestion])
+async def autocomplete_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    field: AutocompleteField = Query('any', description="Match on name (any word), hsn_code, or both"),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(verify_user_role),
+    session: AsyncSession = Depends(get_session)
+):
+    """Type-ahead over product names and HSN codes, served from memory. Requires invoicing_user or admin."""
+    if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+    await product_autocomplete.ensure_fresh(session)
+    return product_autocomplete.suggest(q, limit, field)
+
+
 @router.get("/{product_id}", response_model=ProductSchema)
 async def get_product(
     product_id: UUID,
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Response
 from typing import Optional
+from config.settings import settings
 from core.deps import get_current_user
+from core.counting import CountMode
+from core.filters import ListFilters
+from core.projection import parse_projection, projected_response
 from models.user_models import User, UserRole
 from core.database import get_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from schemas.schemas import PurchaseOrderCreate, PurchaseOrderResponse, PurchaseOrderUpdate
+from schemas.schemas import PurchaseOrderCreate, PurchaseOrderResponse, PurchaseOrderSummary, PurchaseOrderUpdate
 from services.purchase_order_service import PurchaseOrderService
 
 router = APIRouter(prefix="/purchase-orders", tags=["Purchase Orders"])
@@ -40,13 +44,35 @@ async def create_purchase_order(
 
 @router.get("/", response_model=list[PurchaseOrderResponse])
 async def list_purchase_orders(
+    response: Response,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    include: Optional[str] = Query(None, description="'lines' to return line items"),
+    filters: ListFilters = Depends(),
+    count: CountMode = Query('estimated', description="X-Total-Count: exact, estimated (planner statistics) or none"),
     current_user: User = Depends(verify_user_role),
     session: AsyncSession = Depends(get_session)
 ):
+    """Orders matching the filters (newest first by default), one page at a time; the next
+    page's cursor is returned in X-Next-Cursor and the number of matches in X-Total-Count.
+    Header fields only unless include=lines (or fields=...,lines) is given.
+    """
     if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     service = PurchaseOrderService(session)
-    return await service.list_orders()
+    try:
+        projection = parse_projection(fields, include, PurchaseOrderResponse)
+        page = await service.list_orders(
+            limit, cursor, include_lines=projection.include_lines, filters=filters, count=count
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Next-Cursor": page.next_cursor} if page.next_cursor else {}
+    if page.total is not None:
+        headers["X-Total-Count"] = str(page.total)
+    response.headers.update(headers)
+    return projected_response(page.items, projection, PurchaseOrderSummary, headers)
 
 @router.get("/{order_id}", response_model=PurchaseOrderResponse)
 async def get_purchase_order(
@@ -0,0 +1,50 @@
+from datetime import date
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from typing import Literal, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.deps import get_current_user
+from core.database import AsyncSessionLocal, get_session
+from core.streaming import stream_csv
+from models.user_models import User, UserRole
+from schemas.schemas import AgedReceivablesResponse, AgedReceivablesRow
+from services.receivables_service import ReceivablesService
+
+
+router = APIRouter(prefix="/reports", tags=["Reports"])
+
+
+async def verify_user_role(
+    current_user: User = Depends(get_current_user),
+    x_user_role: Optional[str] = Header(None, alias="X-User-Role"),
+) -> User:
+    if not x_user_role:
+        raise HTTPException(status_code=400, detail="X-User-Role header is required")
+    try:
+        role_enum = UserRole(x_user_role.lower())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid role specified")
+    if current_user.role != role_enum:
+        raise HTTPException(status_code=403, detail="Role in header does not match user's role")
+    return current_user
+
+
+@router.get("/aged-receivables", response_model=AgedReceivablesResponse)
+async def aged_receivables(
+    as_of: Optional[date] = Query(None, description="Age balances on this day (default: today)"),
+    format: Literal['json', 'csv'] = Query('json', description="'csv' streams one row per customer"),
+    current_user: User = Depends(verify_user_role),
+    session: AsyncSession = Depends(get_session),
+):
+    # Only admin and invoicing_user can access
+    if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+
+    as_of = as_of or date.today()
+    if format == 'csv':
+        async def rows():
+            async with AsyncSessionLocal() as stream_session:
+                async for row in ReceivablesService(stream_session).stream_aged_receivables(as_of):
+                    yield row
+        return stream_csv(rows, AgedReceivablesRow, f"aged-receivables-{as_of.isoformat()}")
+    return await ReceivablesService(session).aged_receivables(as_of)
@@ -0,0 +1,59 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import settings
+from core.database import get_session
+from core.deps import get_current_user
+from models.user_models import User, UserRole
+from schemas.schemas import SyncChangesResponse
+from services.sync_service import SyncService
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+async def verify_user_role(
+    current_user: User = Depends(get_current_user),
+    x_user_role: Optional[str] = Header(None, alias="X-User-Role")
+) -> User:
+    if not x_user_role:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="X-User-Role header is required"
+        )
+
+    try:
+        requested_role = UserRole(x_user_role.lower())
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid role specified"
+        )
+
+    if current_user.role != requested_role:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Role in header does not match user's role"
+        )
+
+    return current_user
+
+
+@router.get("/changes", response_model=SyncChangesResponse)
+async def get_changes(
+    since: Optional[str] = Query(None, description="next_cursor of the previous call; omit for a full initial sync"),
+    limit: Optional[int] = Query(None, ge=1, le=settings.SYNC_PAGE_SIZE * 4),
+    current_user: User = Depends(verify_user_role),
+    session: AsyncSession = Depends(get_session),
+):
+    """Records created, updated or deleted since ``since``, oldest first.
+
+    Contacts, products, taxes, orders, bills, invoices and payments share one ordered
+    feed. Keep calling with ``next_cursor`` while ``has_more`` is true.
+    """
+    if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admin and invoicing users can sync")
+    try:
+        return await SyncService(session).changes(since, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
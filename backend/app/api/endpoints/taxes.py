@@ -1,41 +1,18 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from uuid import UUID
 
+from core.cache import bump_cache_version
 from core.database import get_session
+from core.etag import collection_etag, etag_matches, not_modified, set_etag
 from core.deps import get_current_user
 from models.models import Tax
 from models.user_models import User, UserRole
-from pydantic import BaseModel, condecimal
+from schemas.schemas import TaxCreate, TaxResponse, TaxUpdate
+from services.tax_registry import tax_registry
 from typing import Optional
-from datetime import datetime
-
-# Pydantic models for request/response
-class TaxBase(BaseModel):
-    name: str
-    computation_method: str  # 'percentage' or 'fixed'
-    value: float
-    is_applicable_on_sales: bool = True
-    is_applicable_on_purchase: bool = True
-
-class TaxCreate(TaxBase):
-    pass
-
-class TaxUpdate(BaseModel):
-    name: str | None = None
-    computation_method: str | None = None
-    value: float | None = None
-    is_applicable_on_sales: bool | None = None
-    is_applicable_on_purchase: bool | None = None
-
-class TaxResponse(TaxBase):
-    id: UUID
-    created_at: datetime
-
-    class Config:
-        from_attributes = True
 
 router = APIRouter(prefix="/taxes", tags=["taxes"])
 
@@ -54,15 +31,19 @@ async def create_tax(
     
     db_tax = Tax(**tax.model_dump())
     session.add(db_tax)
+    await bump_cache_version(session, tax_registry.version_key)
     await session.commit()
+    tax_registry.invalidate()
     await session.refresh(db_tax)
     return db_tax
 
 @router.get("/", response_model=List[TaxResponse])
 async def get_taxes(
+    response: Response,
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
-    x_user_role: str = Header(..., alias="X-User-Role")
+    x_user_role: str = Header(..., alias="X-User-Role"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
 ):
     if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER] or x_user_role.lower() not in ["admin", "invoicing_user"]:
         raise HTTPException(
@@ -70,6 +51,10 @@ async def get_taxes(
             detail="Only admin and invoicing users can view taxes"
         )
     
+    etag = await collection_etag(session, (tax_registry.version_key,))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     query = select(Tax)
     result = await session.execute(query)
     taxes = result.scalars().all()
@@ -130,7 +115,9 @@ async def update_tax(
     for field, value in update_data.items():
         setattr(tax, field, value)
     
+    await bump_cache_version(session, tax_registry.version_key)
     await session.commit()
+    tax_registry.invalidate()
     await session.refresh(tax)
     return tax
 
@@ -160,4 +147,6 @@ async def delete_tax(
     
     # Hard delete the tax
     await session.delete(tax)
-    await session.commit()
\ No newline at end of file
+    await bump_cache_version(session, tax_registry.version_key)
+    await session.commit()
+    tax_registry.invalidate()
\ No newline at end of file
@@ -1,12 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Response
 from typing import Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.counting import CountMode
 from core.deps import get_current_user
+from core.exceptions import ConflictError
+from core.filters import ListFilters
+from core.projection import parse_projection, projected_response
 from models.user_models import User, UserRole
-from core.database import get_session
-from schemas.schemas import VendorBillCreate, VendorBillResponse, VendorBillUpdate
+from core.database import AsyncSessionLocal, get_session
+from core.streaming import ExportFormat, stream_documents
+from schemas.schemas import (
+    VendorBillBulkResponse,
+    VendorBillCreate,
+    VendorBillFromPurchaseOrders,
+    VendorBillResponse,
+    VendorBillSummary,
+    VendorBillUpdate,
+)
 from services.vendor_bill_service import VendorBillService
 
 
@@ -45,13 +57,41 @@ async def create_vendor_bill(
 
 @router.get("/", response_model=list[VendorBillResponse])
 async def list_vendor_bills(
+    response: Response,
+    format: ExportFormat = Query('json', description="'ndjson' or 'csv' stream the matching bills as an export"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    include: Optional[str] = Query(None, description="'lines' to return line items"),
+    filters: ListFilters = Depends(),
+    count: CountMode = Query('exact', description="X-Total-Count: exact, estimated (planner statistics) or none"),
     current_user: User = Depends(verify_user_role),
     session: AsyncSession = Depends(get_session)
 ):
+    """Bills matching the filters, newest first by default; the number of matches is
+    returned in X-Total-Count (json only).
+    """
     if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
+    if format != 'json':
+        # validated here: once streaming has started the status code is already sent
+        try:
+            stmt = VendorBillService.list_statement(filters)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        async def bills():
+            async with AsyncSessionLocal() as stream_session:
+                async for bill in VendorBillService(stream_session).stream_bills(stmt):
+                    yield bill
+        return stream_documents(bills, format, VendorBillResponse, "vendor-bills")
     service = VendorBillService(session)
-    return await service.list_bills()
+    try:
+        projection = parse_projection(fields, include, VendorBillResponse)
+        page = await service.list_bills(include_lines=projection.include_lines, filters=filters, count=count)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Total-Count": str(page.total)} if page.total is not None else {}
+    response.headers.update(headers)
+    return projected_response(page.items, projection, VendorBillSummary, headers)
 
 
 @router.get("/{bill_id}", response_model=VendorBillResponse)
@@ -84,10 +124,27 @@ async def create_vendor_bill_from_purchase_order(
     service = VendorBillService(session)
     try:
         return await service.create_bill_from_purchase_order(purchase_order_id)
+    except ConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/from-purchase-orders", response_model=VendorBillBulkResponse)
+async def create_vendor_bills_from_purchase_orders(
+    payload: VendorBillFromPurchaseOrders,
+    current_user: User = Depends(verify_user_role),
+    session: AsyncSession = Depends(get_session)
+):
+    """Bill all confirmed purchase orders (or the listed ones) that have no bill yet.
+    Returns per-PO success or failure; successful bills are created as drafts.
+    """
+    if current_user.role not in [UserRole.ADMIN, UserRole.INVOICING_USER]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    service = VendorBillService(session)
+    return await service.create_bills_from_purchase_orders(payload.purchase_order_ids)
+
+
 @router.put("/{bill_id}", response_model=VendorBillResponse)
 async def update_vendor_bill(
     bill_id: UUID,
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from api.endpoints import auth, contacts, users, taxes, products, coa, sales_orders, purchase_orders, vendor_bills, customer_invoices, dashboard, payments
+from api.endpoints import auth, contacts, users, taxes, products, coa, sales_orders, purchase_orders, vendor_bills, customer_invoices, dashboard, payments, sync, reports
 
 # Create main API router
 router = APIRouter(prefix="/api/v1")
@@ -18,6 +18,8 @@ router.include_router(vendor_bills.router)
 router.include_router(customer_invoices.router)
 router.include_router(dashboard.router)
 router.include_router(payments.router)
+router.include_router(sync.router)
+router.include_router(reports.router)
 
 # Backward-compatible alias
 api_router = router
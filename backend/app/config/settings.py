@@ -41,6 +41,33 @@ class Settings(BaseSettings):
     USERNAME_MIN_LENGTH: int = Field(default=3, description="Minimum username length")
     USERNAME_MAX_LENGTH: int = Field(default=30, description="Maximum username length")
     
+    # Cache Configuration
+    CACHE_VERSION_CHECK_SECONDS: float = Field(
+        default=5.0, description="How often process-local caches re-check their version stamp"
+    )
+    PRODUCT_CACHE_SIZE: int = Field(default=10000, description="Maximum products held in the catalog cache")
+    DASHBOARD_CACHE_TTL_SECONDS: float = Field(
+        default=60.0, description="Upper bound on how long a cached dashboard is served without recomputing"
+    )
+
+    # Pagination Configuration
+    DEFAULT_PAGE_SIZE: int = Field(default=50, description="Rows per page when a list request gives no limit")
+    MAX_PAGE_SIZE: int = Field(default=200, description="Upper bound for the limit query parameter")
+    COUNT_ESTIMATE_TTL_SECONDS: float = Field(
+        default=30.0, description="How long an estimated X-Total-Count is reused before re-asking the planner"
+    )
+
+    # Sync Configuration
+    SYNC_PAGE_SIZE: int = Field(default=500, description="Changes per /sync/changes page when no limit is given")
+
+    # Live Updates Configuration
+    EVENT_QUEUE_SIZE: int = Field(
+        default=100, description="Events buffered per live subscriber before it is told to resync"
+    )
+    SSE_HEARTBEAT_SECONDS: float = Field(
+        default=15.0, description="Idle interval after which event streams send a keep-alive comment"
+    )
+
     # Note: model_config above handles env_file
 
 
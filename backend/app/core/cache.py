@@ -0,0 +1,113 @@
+import asyncio
+import time
+from typing import Callable, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import settings
+from core.database import dialect_insert
+from models.models import CacheVersion
+
+
+# version key for collections without a process-local registry
+CONTACTS_VERSION_KEY = "contacts"
+# bumped by every write that changes dashboard figures (payments, stock, posted invoices)
+DASHBOARD_VERSION_KEY = "dashboard"
+
+
+async def get_cache_version(session: AsyncSession, key: str) -> int:
+    """Return the current write counter for ``key`` (0 if it was never bumped)."""
+    res = await session.execute(select(CacheVersion.version).where(CacheVersion.key == key))
+    return res.scalar_one_or_none() or 0
+
+
+def bump_statement(session, key: str):
+    """Upsert incrementing the counter for ``key`` and returning its new value.
+
+    The counter row stays locked until the transaction ends, so concurrent bumps of one
+    key are handed out in commit order. ``session`` may be sync or async.
+    """
+    insert = dialect_insert(session)
+    return insert(CacheVersion).values(key=key, version=1).on_conflict_do_update(
+        index_elements=[CacheVersion.key],
+        set_={"version": CacheVersion.version + 1, "updated_at": func.now()},
+    ).returning(CacheVersion.version)
+
+
+async def bump_cache_version(session: AsyncSession, key: str) -> int:
+    """Increment the write counter for ``key`` inside the caller's transaction.
+
+    Call this next to the write it describes, before commit, so other workers see the
+    new version exactly when they can see the new data. Returns the new version.
+    """
+    return (await session.execute(bump_statement(session, key))).scalar_one()
+
+
+class VersionedRegistry:
+    """Process-local snapshot of a small table kept coherent through a version stamp.
+
+    Writes in this worker call ``invalidate()`` after commit; writes in other workers are
+    picked up by comparing the ``cache_versions`` row for ``version_key`` at most once per
+    ``CACHE_VERSION_CHECK_SECONDS``. Subclasses implement ``_load``.
+    """
+
+    version_key: str = ""
+
+    def __init__(self):
+        self._loaded = False
+        self._version: int | None = None
+        self._checked_at = 0.0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._loaded and time.monotonic() - self._checked_at < settings.CACHE_VERSION_CHECK_SECONDS
+
+    async def ensure_fresh(self, session: AsyncSession) -> None:
+        """Reload the snapshot if it was invalidated or another worker bumped the version."""
+        if self._is_fresh():
+            return
+        async with self._lock:
+            if self._is_fresh():
+                return
+            generation = self._generation
+            version = await get_cache_version(session, self.version_key)
+            if not self._loaded or version != self._version:
+                await self._load(session)
+            # An invalidate() that raced with the load leaves the snapshot marked stale.
+            if generation == self._generation:
+                self._version = version
+                self._loaded = True
+            self._checked_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Drop the snapshot; the next ``ensure_fresh`` reloads it."""
+        self._generation += 1
+        self._loaded = False
+
+    async def apply_write(self, version: int, patch: Callable[[], None]) -> None:
+        """Fold a write committed by this worker into the snapshot instead of reloading it.
+
+        ``version`` is what ``bump_cache_version`` returned for the write. ``patch`` runs
+        only when the snapshot was exactly one version behind; otherwise (nothing loaded,
+        or another write landed in between) the snapshot is invalidated as usual.
+        """
+        async with self._lock:
+            if self._loaded and self._version == version - 1:
+                patch()
+                self._version = version
+            else:
+                self.invalidate()
+
+    async def _load(self, session: AsyncSession) -> None:
+        raise NotImplementedError
+
+
+async def get_cache_versions(session: AsyncSession, keys: Sequence[str]) -> dict[str, int]:
+    """Current write counters for several keys in one primary-key lookup."""
+    res = await session.execute(
+        select(CacheVersion.key, CacheVersion.version).where(CacheVersion.key.in_(keys))
+    )
+    found = dict(res.all())
+    return {key: found.get(key, 0) for key in keys}
@@ -0,0 +1,92 @@
+import json
+import time
+from typing import Literal
+
+from sqlalchemy import Select, Table, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+from config.settings import settings
+
+
+# 'estimated' reads planner statistics instead of counting; 'none' skips the total
+CountMode = Literal['exact', 'estimated', 'none']
+
+_MAX_CACHED_ESTIMATES = 1024
+
+# cache key -> (monotonic expiry, estimate)
+_estimates: dict[tuple, tuple[float, int]] = {}
+
+
+class _ExplainJson(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON) <stmt>``, keeping the statement's bound parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_ExplainJson, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    sql = compiler.process(element.statement, **kw)
+    # the result is the single plan column, not the select's columns; drop their result map
+    # so no type processors are applied to it
+    compiler._result_columns = []
+    return "EXPLAIN (FORMAT JSON) " + sql
+
+
+async def _exact(session: AsyncSession, stmt: Select) -> int:
+    count = select(func.count()).select_from(stmt.order_by(None).subquery())
+    return (await session.execute(count)).scalar_one()
+
+
+async def _reltuples(session: AsyncSession, table: Table) -> int | None:
+    """Row count pg_class keeps from the last VACUUM/ANALYZE; None if never analyzed."""
+    res = await session.execute(
+        text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"), {"name": table.fullname}
+    )
+    estimate = res.scalar_one_or_none()
+    return int(estimate) if estimate is not None and estimate >= 0 else None
+
+
+async def _planner_rows(session: AsyncSession, stmt: Select) -> int:
+    plan = (await session.execute(_ExplainJson(stmt.order_by(None)))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(session: AsyncSession, stmt: Select, mode: CountMode) -> int | None:
+    """Total rows ``stmt`` would return without a LIMIT.
+
+    ``estimated`` on PostgreSQL uses ``pg_class.reltuples`` for an unfiltered single
+    table and the planner's row estimate otherwise; either is kept for
+    ``COUNT_ESTIMATE_TTL_SECONDS`` so paging does not repeat it. Other databases and
+    ``exact`` run ``COUNT(*)``. ``none`` returns None.
+    """
+    if mode == 'none':
+        return None
+    if mode == 'exact' or session.bind.dialect.name != "postgresql":
+        return await _exact(session, stmt)
+
+    compiled = stmt.compile(dialect=session.bind.dialect)
+    key = (str(compiled), tuple(sorted((k, repr(v)) for k, v in compiled.params.items())))
+    cached = _estimates.get(key)
+    now = time.monotonic()
+    if cached and cached[0] > now:
+        return cached[1]
+
+    froms = stmt.get_final_froms()
+    estimate = None
+    if stmt.whereclause is None and len(froms) == 1 and isinstance(froms[0], Table):
+        estimate = await _reltuples(session, froms[0])
+    if estimate is None:
+        estimate = await _planner_rows(session, stmt)
+
+    if len(_estimates) >= _MAX_CACHED_ESTIMATES:
+        _estimates.pop(next(iter(_estimates)))
+    _estimates[key] = (now + settings.COUNT_ESTIMATE_TTL_SECONDS, estimate)
+    return estimate
@@ -1,3 +1,4 @@
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 
@@ -43,13 +44,25 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def dialect_insert(session: AsyncSession):
+    """Return the dialect-specific ``insert`` construct (supports ON CONFLICT upserts)."""
+    if session.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
 async def create_tables():
     """Create all database tables."""
     # Import models to register them with metadata
     from models.user_models import User, UserProfile, AuthRefreshToken
-    from models.models import Contact, Product, SalesOrder, SalesOrderLine, PurchaseOrder, PurchaseOrderLine, VendorBill, VendorBillLine, CustomerInvoice, CustomerInvoiceItem
+    from models.models import CacheVersion, Contact, Product, SalesOrder, SalesOrderLine, PurchaseOrder, PurchaseOrderLine, VendorBill, VendorBillLine, CustomerInvoice, CustomerInvoiceItem
     
     async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # trigram indexes on contacts need the extension before the tables are created
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
 
 
@@ -0,0 +1,44 @@
+from typing import Sequence
+
+from fastapi import Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import get_cache_versions
+
+
+# let browsers keep the body but ask every time; the 304 path is a single PK lookup
+REVALIDATE = "private, no-cache"
+
+
+async def collection_etag(session: AsyncSession, keys: Sequence[str], scope: str = "") -> str:
+    """Weak ETag for a collection built from the ``cache_versions`` counters it depends on.
+
+    Every writer already bumps those counters in its transaction, so the tag changes with
+    any committed write. ``scope`` separates responses that differ per caller (e.g. a
+    contact user only sees their own contact). Read the tag *before* querying the data:
+    a write landing in between then only costs the client one extra full response.
+    """
+    versions = await get_cache_versions(session, keys)
+    token = ".".join(f"{key}{versions[key]}" for key in keys)
+    return f'W/"{token}{"." + scope if scope else ""}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of ``If-None-Match`` against ``etag`` (RFC 9110 §13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 answer for a matching ``If-None-Match``."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": REVALIDATE})
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Attach the validator headers to a full (200) response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import logging
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from core.database import engine
+
+
+logger = logging.getLogger(__name__)
+
+# Postgres NOTIFY channel shared by every worker
+EVENTS_CHANNEL = "app_events"
+
+# seconds between attempts to re-establish a lost LISTEN connection
+_RECONNECT_SECONDS = 5.0
+
+# session.info key holding events to publish once the transaction commits
+_PENDING = "pending_events"
+
+# queued in place of the backlog when a subscriber falls too far behind
+RESYNC = {"type": "resync", "data": {}}
+
+
+class EventBus:
+    """In-process pub/sub for change events, fanned out across workers with LISTEN/NOTIFY.
+
+    Writers call ``emit`` inside their transaction. Subscribers in this worker get the
+    event when the transaction commits; on PostgreSQL the event also rides a NOTIFY
+    (delivered by Postgres only on commit) to the ``listen`` task of every other worker.
+    Subscribers are bounded queues with no database connection of their own, so idle
+    ones cost only memory.
+    """
+
+    def __init__(self):
+        self._subscribers: set[asyncio.Queue] = set()
+        # tags NOTIFY payloads so a worker skips the events it already delivered itself
+        self._origin = uuid.uuid4().hex
+        self._listener: asyncio.Task | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[asyncio.Queue]:
+        """Queue receiving every event published while the context is open."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENT_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    def publish(self, event_type: str, data: dict[str, Any]) -> None:
+        """Deliver an event to this worker's subscribers without blocking.
+
+        A subscriber whose queue is full loses its backlog and gets ``RESYNC`` instead,
+        telling it to reload the full state.
+        """
+        message = {"type": event_type, "data": data}
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+
+    async def emit(self, session: AsyncSession, event_type: str, data: dict[str, Any]) -> None:
+        """Publish an event when the caller's transaction commits; dropped on rollback."""
+        session.info.setdefault(_PENDING, []).append((event_type, data))
+        if session.bind.dialect.name == "postgresql":
+            payload = json.dumps({"origin": self._origin, "type": event_type, "data": data}, default=str)
+            await session.execute(select(func.pg_notify(EVENTS_CHANNEL, payload)))
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        message = json.loads(payload)
+        if message.get("origin") != self._origin:
+            self.publish(message["type"], message["data"])
+
+    async def listen(self) -> None:
+        """Forward NOTIFYs from other workers to local subscribers, reconnecting as needed."""
+        while True:
+            try:
+                async with engine.connect() as conn:
+                    raw = (await conn.get_raw_connection()).driver_connection
+                    lost = asyncio.Event()
+                    raw.add_termination_listener(lambda _: lost.set())
+                    await raw.add_listener(EVENTS_CHANNEL, self._on_notify)
+                    # events from other workers may have been missed while disconnected
+                    self.publish(RESYNC["type"], RESYNC["data"])
+                    await lost.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("LISTEN connection failed; retrying in %ss", _RECONNECT_SECONDS, exc_info=True)
+            await asyncio.sleep(_RECONNECT_SECONDS)
+
+    def start(self) -> None:
+        """Start the LISTEN task (PostgreSQL only; elsewhere there is a single worker)."""
+        if engine.dialect.name == "postgresql" and self._listener is None:
+            self._listener = asyncio.create_task(self.listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+event_bus = EventBus()
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for event_type, data in session.info.pop(_PENDING, ()):
+        event_bus.publish(event_type, data)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
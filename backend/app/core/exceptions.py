@@ -1 +1,8 @@
 # Custom exception classes
+
+
+class ConflictError(ValueError):
+    """The request clashes with the current state of a record (HTTP 409).
+
+    A ValueError, so callers that only map ValueError still reject the request.
+    """
@@ -0,0 +1,118 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Annotated, Optional
+from uuid import UUID
+
+from fastapi import Query
+from sqlalchemy import DateTime, Select
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+class ListFilters:
+    """Typed query parameters shared by the document and payment list endpoints.
+
+    Use as ``filters: ListFilters = Depends()``; apply with ``apply_filters`` and
+    ``apply_sort`` (or ``sort_keys`` for keyset-paginated lists).
+    """
+
+    def __init__(
+        self,
+        status: Annotated[Optional[str], Query(description="Exact status, e.g. draft")] = None,
+        party: Annotated[Optional[str], Query(description="Case-insensitive part of the customer/vendor name")] = None,
+        party_id: Annotated[Optional[UUID], Query(description="Customer contact id (where the document links one)")] = None,
+        date_from: Annotated[Optional[date], Query(description="Document date on or after (inclusive)")] = None,
+        date_to: Annotated[Optional[date], Query(description="Document date on or before (inclusive)")] = None,
+        amount_min: Annotated[Optional[Decimal], Query(description="Total amount at least")] = None,
+        amount_max: Annotated[Optional[Decimal], Query(description="Total amount at most")] = None,
+        sort: Annotated[Optional[str], Query(
+            pattern=r"^-?[a-z_]+$", description="Sort key, '-' prefix for descending, e.g. -total_amount"
+        )] = None,
+    ):
+        self.status = status
+        self.party = party
+        self.party_id = party_id
+        self.date_from = date_from
+        self.date_to = date_to
+        self.amount_min = amount_min
+        self.amount_max = amount_max
+        self.sort = sort
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    """Which columns of a model the generic list filters map to."""
+    id: InstrumentedAttribute
+    status: InstrumentedAttribute
+    party: InstrumentedAttribute
+    date: InstrumentedAttribute
+    amount: InstrumentedAttribute
+    sorts: dict[str, InstrumentedAttribute] = field(default_factory=dict)
+    party_id: InstrumentedAttribute | None = None
+    default_sort: str = '-created_at'
+
+
+def _escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def apply_filters(stmt: Select, spec: FilterSpec, filters: ListFilters) -> Select:
+    """Add the WHERE clauses for ``filters``; raises ValueError for invalid combinations."""
+    if filters.status is not None:
+        allowed = getattr(spec.status.type, 'enums', None)
+        if allowed and filters.status not in allowed:
+            raise ValueError(f"Invalid status '{filters.status}'; expected one of: {', '.join(allowed)}")
+        stmt = stmt.where(spec.status == filters.status)
+    if filters.party:
+        stmt = stmt.where(spec.party.ilike(f"%{_escape_like(filters.party)}%", escape='\\'))
+    if filters.party_id is not None:
+        if spec.party_id is None:
+            raise ValueError("party_id filter is not supported for this list")
+        stmt = stmt.where(spec.party_id == filters.party_id)
+
+    if filters.date_from and filters.date_to and filters.date_from > filters.date_to:
+        raise ValueError("date_from must not be after date_to")
+    # DateTime columns are compared against whole days so both bounds are inclusive
+    is_timestamp = isinstance(spec.date.type, DateTime)
+    if filters.date_from:
+        lower = datetime.combine(filters.date_from, time.min) if is_timestamp else filters.date_from
+        stmt = stmt.where(spec.date >= lower)
+    if filters.date_to:
+        if is_timestamp:
+            stmt = stmt.where(spec.date < datetime.combine(filters.date_to + timedelta(days=1), time.min))
+        else:
+            stmt = stmt.where(spec.date <= filters.date_to)
+
+    if filters.amount_min is not None and filters.amount_max is not None and filters.amount_min > filters.amount_max:
+        raise ValueError("amount_min must not exceed amount_max")
+    if filters.amount_min is not None:
+        stmt = stmt.where(spec.amount >= filters.amount_min)
+    if filters.amount_max is not None:
+        stmt = stmt.where(spec.amount <= filters.amount_max)
+    return stmt
+
+
+def _resolve_sort(spec: FilterSpec, filters: ListFilters) -> tuple[str, InstrumentedAttribute, bool]:
+    key = filters.sort or spec.default_sort
+    descending = key.startswith('-')
+    name = key.lstrip('-')
+    column = spec.sorts.get(name)
+    if column is None:
+        raise ValueError(f"Invalid sort '{name}'; expected one of: {', '.join(spec.sorts)}")
+    return name, column, descending
+
+
+def apply_sort(stmt: Select, spec: FilterSpec, filters: ListFilters) -> Select:
+    """ORDER BY the requested key (NULLs last), with the id as a stable tiebreaker."""
+    _, column, descending = _resolve_sort(spec, filters)
+    ordered = column.desc() if descending else column.asc()
+    return stmt.order_by(ordered.nulls_last(), spec.id.desc() if descending else spec.id.asc())
+
+
+def sort_keys(spec: FilterSpec, filters: ListFilters) -> tuple[tuple, bool, str]:
+    """Keyset (keys, descending, cursor scope) for the requested sort.
+
+    Keyset lists must only offer non-null sort columns; the id breaks ties.
+    """
+    name, column, descending = _resolve_sort(spec, filters)
+    return (column, spec.id), descending, name
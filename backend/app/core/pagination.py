@@ -0,0 +1,117 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Generic, Sequence, TypeVar
+from uuid import UUID
+
+from sqlalchemy import DateTime, Select, func, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+T = TypeVar("T")
+
+# tag -> (python type, parser) for the values a cursor may carry
+_DECODERS = {
+    "dt": datetime.fromisoformat,
+    "d": date.fromisoformat,
+    "u": UUID,
+    "n": Decimal,
+    "s": str,
+    "i": int,
+}
+
+
+def _tag(value: Any) -> list:
+    if isinstance(value, datetime):
+        return ["dt", value.isoformat()]
+    if isinstance(value, date):
+        return ["d", value.isoformat()]
+    if isinstance(value, UUID):
+        return ["u", str(value)]
+    if isinstance(value, Decimal):
+        return ["n", str(value)]
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise TypeError(f"Unsupported cursor value {value!r}")
+    return ["i" if isinstance(value, int) else "s", value]
+
+
+def encode_cursor(values: Sequence[Any], scope: str = "") -> str:
+    """Pack the sort-key values of the last row of a page into an opaque token.
+
+    ``scope`` names the ordering the cursor belongs to, so a cursor issued for one
+    sort order is rejected by another.
+    """
+    payload = json.dumps({"s": scope, "v": [_tag(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, scope: str = "", size: int | None = None) -> tuple:
+    """Inverse of ``encode_cursor``; raises ValueError for malformed or foreign cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload["s"] != scope:
+            raise ValueError
+        values = tuple(_DECODERS[tag](value) for tag, value in payload["v"])
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise ValueError("Invalid cursor")
+    if size is not None and len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+# SQLite keeps timestamps as text in whatever precision they were written with
+# (CURRENT_TIMESTAMP: whole seconds; bound datetimes: microseconds), so they only
+# compare correctly once both sides are rendered the same way
+_SQLITE_TIMESTAMP = '%Y-%m-%d %H:%M:%f'
+
+
+def _comparable(session: AsyncSession, key, value=None):
+    """``key`` (or ``value`` bound with its type) in a form that orders like the stored data."""
+    expr = key if value is None else literal(value, key.type)
+    if session.bind.dialect.name == "sqlite" and isinstance(key.type, DateTime):
+        return func.strftime(_SQLITE_TIMESTAMP, expr)
+    return expr
+
+
+@dataclass
+class Page(Generic[T]):
+    items: list[T]
+    next_cursor: str | None
+    total: int | None = None  # rows matching across all pages, when requested
+
+
+async def keyset_paginate(
+    session: AsyncSession,
+    stmt: Select,
+    keys: Sequence,
+    limit: int,
+    cursor: str | None = None,
+    descending: bool = True,
+    scope: str = "",
+) -> Page:
+    """Fetch one page of ``stmt`` (a single-entity select) ordered by ``keys``.
+
+    ``keys`` are non-null columns whose combination is unique, e.g.
+    ``(Model.created_at, Model.id)``, and should be backed by a composite index in the
+    same order. The page after ``cursor`` is found with a row-value comparison, so the
+    cost stays constant however deep the client pages, unlike OFFSET.
+    """
+    columns = [_comparable(session, k) for k in keys]
+    if cursor:
+        after = decode_cursor(cursor, scope, size=len(keys))
+        row = tuple_(*columns)
+        bound = tuple_(*(_comparable(session, k, v) for k, v in zip(keys, after)))
+        stmt = stmt.where(row < bound if descending else row > bound)
+    stmt = stmt.order_by(*(c.desc() if descending else c.asc() for c in columns)).limit(limit + 1)
+    items = list((await session.execute(stmt)).scalars().unique().all())
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, k.key) for k in keys], scope)
+    return Page(items, next_cursor)
@@ -0,0 +1,50 @@
+from dataclasses import dataclass
+from typing import Sequence
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+@dataclass
+class Projection:
+    include_lines: bool
+    fields: set[str] | None  # None: every field of the returned schema
+
+
+def parse_projection(fields: str | None, include: str | None, schema: type[BaseModel]) -> Projection:
+    """Parse ``?fields=a,b`` and ``?include=lines`` for a document list endpoint.
+
+    ``schema`` is the full (with lines) response schema; asking for the ``lines``
+    field is the same as ``include=lines``. Raises ValueError for unknown names.
+    """
+    included = {name.strip() for name in (include or '').split(',') if name.strip()}
+    if included - {'lines'}:
+        raise ValueError(f"Unknown include: {', '.join(sorted(included - {'lines'}))}")
+    selected = None
+    if fields:
+        selected = {name.strip() for name in fields.split(',') if name.strip()}
+        unknown = selected - schema.model_fields.keys()
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+        if 'lines' in selected:
+            included.add('lines')
+        elif included:
+            selected.add('lines')
+    return Projection(include_lines='lines' in included, fields=selected)
+
+
+def projected_response(
+    items: Sequence[BaseModel],
+    projection: Projection,
+    summary_schema: type[BaseModel],
+    headers: dict | None = None,
+):
+    """Return ``items`` as-is for full documents, otherwise only the projected fields.
+
+    Summaries and ``fields=`` projections are serialized here into a JSONResponse
+    (which bypasses the endpoint's response_model), so ``headers`` must be passed in.
+    """
+    if projection.include_lines and projection.fields is None:
+        return items
+    fields = projection.fields or set(summary_schema.model_fields)
+    return JSONResponse([item.model_dump(mode='json', include=fields) for item in items], headers=headers)
@@ -0,0 +1,98 @@
+import csv
+import io
+from typing import AsyncIterator, Callable, Literal, get_args
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+
+ExportFormat = Literal['json', 'ndjson', 'csv']
+
+# rows fetched per server-side cursor round trip when streaming exports
+STREAM_BATCH_SIZE = 500
+
+# sent as an SSE comment when a stream has been idle, so proxies keep the connection open
+SSE_KEEPALIVE = ": keep-alive\n\n"
+
+
+def sse_event(event: str, data: str) -> str:
+    """One server-sent event; ``data`` must be a single line (e.g. compact JSON)."""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+def document_csv_columns(schema: type[BaseModel], lines_field: str = 'lines') -> list[str]:
+    """CSV header for a document schema: header fields, then its line fields prefixed 'line_'."""
+    line_schema = get_args(schema.model_fields[lines_field].annotation)[0]
+    header = [name for name in schema.model_fields if name != lines_field]
+    return header + [f"line_{name}" for name in line_schema.model_fields]
+
+
+def _document_csv_rows(doc: BaseModel, lines_field: str) -> list[dict]:
+    data = doc.model_dump(mode='json')
+    lines = data.pop(lines_field) or [{}]
+    return [{**data, **{f"line_{k}": v for k, v in line.items()}} for line in lines]
+
+
+async def _ndjson(docs: AsyncIterator[BaseModel]) -> AsyncIterator[str]:
+    async for doc in docs:
+        yield doc.model_dump_json() + "\n"
+
+
+async def _csv(docs: AsyncIterator[BaseModel], columns: list[str], lines_field: str) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    async for doc in docs:
+        writer.writerows(_document_csv_rows(doc, lines_field))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+async def _csv_rows(rows: AsyncIterator[BaseModel], columns: list[str]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    async for row in rows:
+        writer.writerow(row.model_dump(mode='json'))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_csv(
+    rows: Callable[[], AsyncIterator[BaseModel]], schema: type[BaseModel], filename: str
+) -> StreamingResponse:
+    """Stream flat rows (one schema instance each) as CSV; ``rows`` as for ``stream_documents``."""
+    return StreamingResponse(
+        _csv_rows(rows(), list(schema.model_fields)),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'},
+    )
+
+
+def stream_documents(
+    docs: Callable[[], AsyncIterator[BaseModel]],
+    fmt: ExportFormat,
+    schema: type[BaseModel],
+    filename: str,
+    lines_field: str = 'lines',
+) -> StreamingResponse:
+    """Stream documents as NDJSON (one document per line) or CSV (one row per document line).
+
+    ``docs`` is called once the response starts; it should open its own session, as the
+    request-scoped one is closed before the body is sent.
+    """
+    if fmt == 'csv':
+        body = _csv(docs(), document_csv_columns(schema, lines_field), lines_field)
+        media_type = "text/csv"
+    else:
+        body = _ndjson(docs())
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -6,6 +6,7 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from api.router import router as api_router  # This imports the router from api/router.py
 from config.settings import settings
 from core.database import create_tables
+from core.events import event_bus
 
 
 @asynccontextmanager
@@ -13,6 +14,8 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     await create_tables()
+    # fan-out of live events from other workers
+    event_bus.start()
     # Log CORS settings at startup for debugging
     try:
         print(f"[Startup] DEBUG={settings.DEBUG} ALLOWED_ORIGINS={settings.ALLOWED_ORIGINS}")
@@ -20,7 +23,7 @@ async def lifespan(app: FastAPI):
         pass
     yield
     # Shutdown
-    pass
+    await event_bus.stop()
 
 
 # Create FastAPI application
@@ -33,6 +36,9 @@ app = FastAPI(
     redoc_url="/redoc" if settings.DEBUG else None,
 )
 
+# Response headers the frontend needs to read (pagination etc.)
+EXPOSED_HEADERS = ["X-Next-Cursor", "X-Total-Count", "ETag"]
+
 # Add CORS middleware
 if settings.DEBUG:
     # In development, allow localhost on any port via regex, plus configured explicit origins
@@ -43,6 +49,7 @@ if settings.DEBUG:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=EXPOSED_HEADERS,
     )
 else:
     app.add_middleware(
@@ -51,6 +58,7 @@ else:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=EXPOSED_HEADERS,
     )
 
 # Add trusted host middleware (security) - disabled for development
@@ -1,13 +1,44 @@
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
 import enum
-from sqlalchemy import Enum, String, ForeignKey, Numeric, Boolean, Integer
+from sqlalchemy import BigInteger, Enum, String, ForeignKey, Numeric, Boolean, Integer, Index
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from sqlalchemy.sql import func
 from sqlalchemy import Date
 
 from core.database import Base
 
+
+class CacheVersion(Base):
+    """Write counter per cached collection, used to keep per-worker caches coherent."""
+    __tablename__ = "cache_versions"
+
+    key: Mapped[str] = mapped_column(String(50), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
+    updated_at: Mapped[datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
+
+
+class SyncChangeLog(Base):
+    """A committed change to a synced record.
+
+    ``seq`` is the writing transaction's id on PostgreSQL (``pg_current_xact_id``), so
+    writers share no lock; readers only take changes below their snapshot's xmin, which
+    no running transaction can still add to. All changes of one transaction share a
+    ``seq``. Written by the session hooks in ``services.sync_service``.
+    """
+    __tablename__ = "sync_changes"
+    __table_args__ = (
+        Index("ix_sync_changes_seq_id", "seq", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    entity: Mapped[str] = mapped_column(String(30), nullable=False)
+    entity_id: Mapped[UUID] = mapped_column(nullable=False)
+    op: Mapped[str] = mapped_column(String(10), nullable=False)  # 'upsert' | 'delete'
+    changed_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+
 class Tax(Base):
     __tablename__ = "taxes"
     
@@ -18,11 +49,19 @@ class Tax(Base):
     is_applicable_on_sales: Mapped[bool] = mapped_column(Boolean, server_default='true')
     is_applicable_on_purchase: Mapped[bool] = mapped_column(Boolean, server_default='true')
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
 
 # Contact models
 
 class Contact(Base):
     __tablename__ = "contacts"
+    __table_args__ = (
+        # fuzzy search (pg_trgm); GET /contacts/search
+        *(
+            Index(f"ix_contacts_{column}_trgm", column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+            for column in ("name", "email", "mobile")
+        ),
+    )
     
     id: Mapped[UUID] = mapped_column(primary_key=True, server_default=func.gen_random_uuid())
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -63,7 +102,7 @@ class Product(Base):
     __tablename__ = "products"
 
     id: Mapped[UUID] = mapped_column(primary_key=True, server_default=func.gen_random_uuid())
-    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    name: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
     # DB enum name 'product_type' to match requested type
     type: Mapped[str] = mapped_column(Enum('goods', 'service', name='product_type'), nullable=False)
 
@@ -90,6 +129,14 @@ class SalesOrderStatus(str, enum.Enum):
 
 class SalesOrder(Base):
     __tablename__ = "sales_orders"
+    __table_args__ = (
+        # keyset pagination of the list endpoint
+        Index("ix_sales_orders_created_at_id", "created_at", "id"),
+        # status-filtered lists, newest first
+        Index("ix_sales_orders_status_created_at", "status", "created_at"),
+        # keyset pagination when sorted by updated_at
+        Index("ix_sales_orders_updated_at_id", "updated_at", "id"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, server_default=func.gen_random_uuid())
     # business-visible number (uuid string for now per requirement)
@@ -141,6 +188,14 @@ class PurchaseOrderStatus(str, enum.Enum):
 
 class PurchaseOrder(Base):
     __tablename__ = "purchase_orders"
+    __table_args__ = (
+        # keyset pagination of the list endpoint
+        Index("ix_purchase_orders_created_at_id", "created_at", "id"),
+        # status-filtered lists, newest first
+        Index("ix_purchase_orders_status_created_at", "status", "created_at"),
+        # keyset pagination when sorted by updated_at
+        Index("ix_purchase_orders_updated_at_id", "updated_at", "id"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, server_default=func.gen_random_uuid())
     po_number: Mapped[str] = mapped_column(String(36), unique=True, nullable=False)
@@ -190,6 +245,11 @@ class VendorBillStatus(str, enum.Enum):
 
 class VendorBill(Base):
     __tablename__ = "vendor_bills"
+    __table_args__ = (
+        # list filters: by status (newest first) and by status within a bill date range
+        Index("ix_vendor_bills_status_created_at", "status", "created_at"),
+        Index("ix_vendor_bills_status_bill_date", "status", "bill_date"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, server_default=func.gen_random_uuid())
     bill_number: Mapped[str] = mapped_column(String(36), unique=True, nullable=False)
@@ -197,7 +257,7 @@ class VendorBill(Base):
     bill_reference: Mapped[str | None] = mapped_column(String(50), nullable=True)
     bill_date: Mapped[datetime | None] = mapped_column(Date(), nullable=True)
     due_date: Mapped[datetime | None] = mapped_column(Date(), nullable=True)
-    purchase_order_id: Mapped[UUID | None] = mapped_column(ForeignKey("purchase_orders.id", ondelete="SET NULL"), nullable=True)
+    purchase_order_id: Mapped[UUID | None] = mapped_column(ForeignKey("purchase_orders.id", ondelete="SET NULL"), nullable=True, index=True)
     status: Mapped[str] = mapped_column(
         Enum('draft', 'confirmed', 'cancelled', name='vendor_bill_status'),
         nullable=False, server_default='draft'
@@ -251,11 +311,22 @@ class InvoiceStatus(str, enum.Enum):
 
 class CustomerInvoice(Base):
     __tablename__ = "customer_invoices"
+    __table_args__ = (
+        # list filters: by status (newest first) and per customer by invoice date
+        Index("ix_customer_invoices_status_created_at", "status", "created_at"),
+        Index("ix_customer_invoices_customer_id_invoice_date", "customer_id", "invoice_date"),
+        # aged receivables: posted invoices by due date; covering, so the report reads only the index
+        Index(
+            "ix_customer_invoices_status_due_date", "status", "due_date",
+            postgresql_include=["customer_id", "customer_name", "invoice_date", "total_amount", "amount_paid"],
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, server_default=func.gen_random_uuid())
     invoice_number: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
     customer_id: Mapped[UUID | None] = mapped_column(ForeignKey("contacts.id", ondelete="SET NULL"), nullable=True)
     customer_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    sales_order_id: Mapped[UUID | None] = mapped_column(ForeignKey("sales_orders.id", ondelete="SET NULL"), nullable=True, index=True)
     invoice_date: Mapped[datetime | None] = mapped_column(Date(), nullable=True)
     due_date: Mapped[datetime | None] = mapped_column(Date(), nullable=True)
     status: Mapped[str] = mapped_column(
@@ -318,6 +389,15 @@ class PaymentMethod(str, enum.Enum):
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        # list filters: by status, newest first
+        Index("ix_payments_status_created_at", "status", "created_at"),
+        # dashboard: posted payments in a date range; covering, so the scan never visits the heap
+        Index(
+            "ix_payments_status_payment_date", "status", "payment_date",
+            postgresql_include=["partner_type", "amount"],
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, server_default=func.gen_random_uuid())
     payment_number: Mapped[str] = mapped_column(String(36), unique=True, nullable=False)
@@ -334,8 +414,23 @@ class Payment(Base):
     )
     amount: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, server_default='0')
     payment_date: Mapped[datetime] = mapped_column(server_default=func.now())
-    vendor_bill_id: Mapped[UUID | None] = mapped_column(ForeignKey("vendor_bills.id", ondelete="SET NULL"), nullable=True)
-    customer_invoice_id: Mapped[UUID | None] = mapped_column(ForeignKey("customer_invoices.id", ondelete="SET NULL"), nullable=True)
+    vendor_bill_id: Mapped[UUID | None] = mapped_column(ForeignKey("vendor_bills.id", ondelete="SET NULL"), nullable=True, index=True)
+    customer_invoice_id: Mapped[UUID | None] = mapped_column(ForeignKey("customer_invoices.id", ondelete="SET NULL"), nullable=True, index=True)
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
 
+
+class MonthlyFinancialSummary(Base):
+    """Posted payment totals per calendar month and partner type.
+
+    Maintained in the same transaction as posting/cancelling a payment (see
+    ``services.financial_summary``); rebuild from ``payments`` with
+    ``scripts/rebuild_financial_summary.py``.
+    """
+    __tablename__ = "monthly_financial_summary"
+
+    month: Mapped[date] = mapped_column(Date(), primary_key=True)  # first day of the month
+    partner_type: Mapped[str] = mapped_column(String(10), primary_key=True)  # 'customer' | 'vendor'
+    total_amount: Mapped[float] = mapped_column(Numeric(16, 2), nullable=False, server_default='0')
+    payment_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default='0')
+    updated_at: Mapped[datetime] = mapped_column(server_default=func.now(), onupdate=func.now())
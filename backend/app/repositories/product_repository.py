@@ -1,10 +1,85 @@
-from typing import List, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, List, Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Select, func, literal, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from models.models import Product
+from config.settings import settings
+from core.cache import VersionedRegistry
+from models.models import Product, Tax
+
+
+@dataclass(frozen=True, slots=True)
+class CachedProduct:
+    """Detached, read-only copy of a Product row held by the catalog cache."""
+    id: UUID
+    name: str
+    type: str
+    sales_price: Decimal
+    purchase_price: Decimal
+    hsn_code: str | None
+    category: str | None
+    current_stock: int
+    tax_name: str | None
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_model(cls, p: Product) -> "CachedProduct":
+        return cls(
+            id=p.id, name=p.name, type=p.type,
+            sales_price=p.sales_price, purchase_price=p.purchase_price,
+            hsn_code=p.hsn_code, category=p.category, current_stock=p.current_stock,
+            tax_name=p.tax_name, created_at=p.created_at, updated_at=p.updated_at,
+        )
+
+
+class ProductCache(VersionedRegistry):
+    """Bounded LRU cache of products indexed by id and by exact name.
+
+    Entries are filled lazily by ``ProductRepository.get_many``. Product writes bump
+    the 'products' cache version, which clears the cache here and, on the next
+    version check, in every other worker.
+    """
+
+    version_key = "products"
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+        self._by_id: OrderedDict[UUID, CachedProduct] = OrderedDict()
+        self._by_name: dict[str, UUID] = {}
+
+    async def _load(self, session: AsyncSession) -> None:
+        self._by_id.clear()
+        self._by_name.clear()
+
+    def get(self, product_id: UUID) -> CachedProduct | None:
+        product = self._by_id.get(product_id)
+        if product is not None:
+            self._by_id.move_to_end(product_id)
+        return product
+
+    def get_by_name(self, name: str) -> CachedProduct | None:
+        product_id = self._by_name.get(name)
+        return self.get(product_id) if product_id is not None else None
+
+    def put(self, product: CachedProduct, index_name: bool = False) -> None:
+        self._by_id[product.id] = product
+        self._by_id.move_to_end(product.id)
+        if index_name:
+            self._by_name[product.name] = product.id
+        while len(self._by_id) > self.maxsize:
+            _, evicted = self._by_id.popitem(last=False)
+            if self._by_name.get(evicted.name) == evicted.id:
+                del self._by_name[evicted.name]
+
+
+product_cache = ProductCache(maxsize=settings.PRODUCT_CACHE_SIZE)
 
 
 class ProductRepository:
@@ -22,10 +97,85 @@ class ProductRepository:
         result = await self.session.execute(select(Product).where(Product.id == product_id))
         return result.scalar_one_or_none()
 
+    async def get_many(
+        self, ids: Iterable[UUID] = (), names: Iterable[str] = ()
+    ) -> tuple[dict[UUID, CachedProduct], dict[str, CachedProduct]]:
+        """Look up products by id and by exact name through the catalog cache.
+
+        Cache misses are fetched together in one query. When several products share a
+        name, the oldest one wins, matching the previous single-row lookup.
+        """
+        await product_cache.ensure_fresh(self.session)
+        by_id: dict[UUID, CachedProduct] = {}
+        by_name: dict[str, CachedProduct] = {}
+        missing_ids = set()
+        missing_names = set()
+        for product_id in set(ids):
+            cached = product_cache.get(product_id)
+            if cached:
+                by_id[product_id] = cached
+            else:
+                missing_ids.add(product_id)
+        for name in set(names):
+            cached = product_cache.get_by_name(name)
+            if cached:
+                by_name[name] = cached
+            else:
+                missing_names.add(name)
+
+        if missing_ids or missing_names:
+            conditions = []
+            if missing_ids:
+                conditions.append(Product.id.in_(missing_ids))
+            if missing_names:
+                conditions.append(Product.name.in_(missing_names))
+            stmt = select(Product).where(or_(*conditions)).order_by(Product.created_at)
+            for row in (await self.session.execute(stmt)).scalars():
+                product = CachedProduct.from_model(row)
+                first_for_name = product.name in missing_names and product.name not in by_name
+                if first_for_name:
+                    by_name[product.name] = product
+                if product.id in missing_ids:
+                    by_id[product.id] = product
+                product_cache.put(product, index_name=first_for_name)
+        return by_id, by_name
+
     async def list(self) -> List[Product]:
         result = await self.session.execute(select(Product).order_by(Product.created_at.desc()))
         return list(result.scalars())
 
+    @staticmethod
+    def select_with_tax_percents() -> Select:
+        """Product columns plus sales/purchase tax percents, joined in one query.
+
+        Each side's rate comes from the oldest tax with the product's ``tax_name`` that
+        applies to that side (the same row the tax registry picks); no match gives 0.
+        """
+        def first_tax_per_name(applicable):
+            ranked = select(
+                Tax.name,
+                Tax.value,
+                func.row_number().over(partition_by=Tax.name, order_by=Tax.created_at).label('rn'),
+            ).where(applicable).subquery()
+            return select(ranked.c.name, ranked.c.value).where(ranked.c.rn == 1).subquery()
+
+        sales = first_tax_per_name(Tax.is_applicable_on_sales)
+        purchase = first_tax_per_name(Tax.is_applicable_on_purchase)
+        return (
+            select(
+                *Product.__table__.columns,
+                func.coalesce(sales.c.value, literal(0)).label('sales_tax_percent'),
+                func.coalesce(purchase.c.value, literal(0)).label('purchase_tax_percent'),
+            )
+            .outerjoin(sales, sales.c.name == Product.tax_name)
+            .outerjoin(purchase, purchase.c.name == Product.tax_name)
+        )
+
+    async def list_with_tax_percents(self) -> List[dict]:
+        """All products, newest first, with their tax percents (see ``select_with_tax_percents``)."""
+        stmt = self.select_with_tax_percents().order_by(Product.created_at.desc())
+        return (await self.session.execute(stmt)).mappings().all()
+
     async def update(self, product: Product, **data) -> Product:
         for field, value in data.items():
             setattr(product, field, value)
@@ -34,4 +184,4 @@ class ProductRepository:
         return product
 
     async def delete(self, product: Product) -> None:
-        await self.session.delete(product)
\ No newline at end of file
+        await self.session.delete(product)
@@ -1,6 +1,6 @@
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
-from typing import Optional
+from typing import Any, Literal, Optional
 from pydantic import BaseModel, EmailStr, Field
 from typing import List
 
@@ -31,6 +31,34 @@ class ContactResponse(ContactBase):
         from_attributes = True
 
 
+# Tax schemas
+
+class TaxBase(BaseModel):
+    name: str
+    computation_method: str  # 'percentage' or 'fixed'
+    value: float
+    is_applicable_on_sales: bool = True
+    is_applicable_on_purchase: bool = True
+
+class TaxCreate(TaxBase):
+    pass
+
+class TaxUpdate(BaseModel):
+    name: str | None = None
+    computation_method: str | None = None
+    value: float | None = None
+    is_applicable_on_sales: bool | None = None
+    is_applicable_on_purchase: bool | None = None
+
+class TaxResponse(TaxBase):
+    id: UUID
+    created_at: datetime
+    updated_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
 # =============================
 # Dashboard Schemas
 # =============================
@@ -98,6 +126,20 @@ class HSNResponse(BaseModel):
     data: list[HSNItem]
 
 
+class ProductSuggestion(BaseModel):
+    """Autocomplete hit: just what order entry needs to fill a line."""
+    id: UUID
+    name: str
+    hsn_code: Optional[str] = None
+    type: str
+    sales_price: float
+    purchase_price: float
+    tax_name: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
 # =============================
 # Sales Order Schemas
 # =============================
@@ -111,6 +153,7 @@ class SalesOrderLineBase(BaseModel):
 
 class SalesOrderLineCreate(SalesOrderLineBase):
     product_id: UUID | None = None
+    id: UUID | None = None  # existing line to update in place (update payloads only)
 
 
 class SalesOrderLineResponse(SalesOrderLineBase):
@@ -135,11 +178,13 @@ class SalesOrderCreate(SalesOrderBase):
     lines: list[SalesOrderLineCreate]
 
 class SalesOrderUpdate(SalesOrderBase):
-    # Optional replacement of all lines; if provided, existing lines are replaced
+    # Optional replacement of all lines; if provided, stored lines are diffed against
+    # them (matched by id, then product) so unchanged lines are not rewritten
     lines: list[SalesOrderLineCreate] | None = None
 
 
-class SalesOrderResponse(SalesOrderBase):
+class SalesOrderSummary(SalesOrderBase):
+    """Header fields only, as returned by the list endpoint unless lines are requested."""
     id: UUID
     so_number: str
     total_untaxed: float
@@ -147,12 +192,29 @@ class SalesOrderResponse(SalesOrderBase):
     total_amount: float
     created_at: datetime
     updated_at: datetime
-    lines: list[SalesOrderLineResponse] = []
 
     class Config:
         from_attributes = True
 
 
+class SalesOrderResponse(SalesOrderSummary):
+    lines: list[SalesOrderLineResponse] = []
+
+
+class SalesOrderBulkResult(BaseModel):
+    index: int  # position of the order in the request body
+    success: bool
+    id: UUID | None = None
+    so_number: str | None = None
+    error: str | None = None
+
+
+class SalesOrderBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[SalesOrderBulkResult]
+
+
 # =============================
 # Purchase Order Schemas
 # =============================
@@ -166,6 +228,7 @@ class PurchaseOrderLineBase(BaseModel):
 
 class PurchaseOrderLineCreate(PurchaseOrderLineBase):
     product_id: UUID | None = None
+    id: UUID | None = None  # existing line to update in place (update payloads only)
 
 
 class PurchaseOrderLineResponse(PurchaseOrderLineBase):
@@ -192,7 +255,7 @@ class PurchaseOrderUpdate(PurchaseOrderBase):
     lines: list[PurchaseOrderLineCreate] | None = None
 
 
-class PurchaseOrderResponse(PurchaseOrderBase):
+class PurchaseOrderSummary(PurchaseOrderBase):
     id: UUID
     po_number: str
     vendor_name: str | None = None
@@ -201,12 +264,15 @@ class PurchaseOrderResponse(PurchaseOrderBase):
     total_amount: float
     created_at: datetime
     updated_at: datetime
-    lines: list[PurchaseOrderLineResponse] = []
 
     class Config:
         from_attributes = True
 
 
+class PurchaseOrderResponse(PurchaseOrderSummary):
+    lines: list[PurchaseOrderLineResponse] = []
+
+
 # =============================
 # Vendor Bill Schemas
 # =============================
@@ -220,6 +286,7 @@ class VendorBillLineBase(BaseModel):
 
 class VendorBillLineCreate(VendorBillLineBase):
     product_id: UUID | None = None
+    id: UUID | None = None  # existing line to update in place (update payloads only)
     account_name: str | None = None
 
 
@@ -254,7 +321,7 @@ class VendorBillUpdate(VendorBillBase):
     lines: List[VendorBillLineCreate] | None = None
 
 
-class VendorBillResponse(VendorBillBase):
+class VendorBillSummary(VendorBillBase):
     id: UUID
     bill_number: str
     total_untaxed: float
@@ -264,12 +331,35 @@ class VendorBillResponse(VendorBillBase):
     paid_bank: float
     created_at: datetime
     updated_at: datetime
-    lines: List[VendorBillLineResponse] = []
 
     class Config:
         from_attributes = True
 
 
+class VendorBillResponse(VendorBillSummary):
+    lines: List[VendorBillLineResponse] = []
+
+
+class VendorBillFromPurchaseOrders(BaseModel):
+    """Purchase orders to bill; omit ``purchase_order_ids`` to bill every confirmed, unbilled PO."""
+    purchase_order_ids: List[UUID] | None = None
+
+
+class VendorBillBulkResult(BaseModel):
+    purchase_order_id: UUID
+    po_number: str | None = None
+    success: bool
+    bill_id: UUID | None = None
+    bill_number: str | None = None
+    error: str | None = None
+
+
+class VendorBillBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[VendorBillBulkResult]
+
+
 # =============================
 # Customer Invoice Schemas
 # =============================
@@ -312,21 +402,52 @@ class CustomerInvoiceCreate(CustomerInvoiceBase):
     lines: List[CustomerInvoiceLineCreate]
 
 
-class CustomerInvoiceResponse(CustomerInvoiceBase):
+class CustomerInvoiceSummary(CustomerInvoiceBase):
     id: UUID
     invoice_number: str
+    sales_order_id: UUID | None = None
     total_untaxed: float
     total_tax: float
     total_amount: float
     amount_paid: float
     created_at: datetime
     updated_at: datetime
-    lines: List[CustomerInvoiceLineResponse] = []
 
     class Config:
         from_attributes = True
 
 
+class CustomerInvoiceResponse(CustomerInvoiceSummary):
+    lines: List[CustomerInvoiceLineResponse] = []
+
+
+class AgedReceivablesRow(BaseModel):
+    """Outstanding balance of one customer, split by how far past due it is on ``as_of``."""
+    customer_id: UUID | None = None
+    customer_name: str | None = None  # both None on the totals row
+    invoice_count: int
+    current: float  # not yet due, or no due date
+    days_1_30: float
+    days_31_60: float
+    days_61_90: float
+    days_90_plus: float
+    total: float
+
+
+class AgedReceivablesResponse(BaseModel):
+    as_of: date
+    customers: List[AgedReceivablesRow]
+    totals: AgedReceivablesRow
+
+
+class InvoiceBatchFromSalesOrders(BaseModel):
+    """Either explicit sales order ids or (when omitted) all confirmed orders in the date range."""
+    sales_order_ids: List[UUID] | None = None
+    date_from: date | None = None
+    date_to: date | None = None
+    chunk_size: int = Field(200, ge=1, le=1000)
+
+
 # =============================
 # Payment Schemas
 # =============================
@@ -358,3 +479,35 @@ class PaymentResponse(PaymentBase):
 
     class Config:
         from_attributes = True
+
+
+class DocumentPaymentsResponse(BaseModel):
+    """Payment history of one vendor bill or customer invoice with what is still owed."""
+    document_type: Literal['vendor_bill', 'customer_invoice']
+    document_id: UUID
+    document_status: str
+    total_amount: float
+    paid_amount: float  # posted payments, as applied to the document
+    pending_amount: float  # draft payments not posted yet
+    outstanding_amount: float
+    payments: List[PaymentResponse]
+
+
+# =============================
+# Sync Schemas
+# =============================
+
+class SyncChange(BaseModel):
+    """One entry of the change feed, in commit order."""
+    entity: str  # 'contacts', 'products', 'taxes', 'sales_orders', ...
+    id: UUID  # id of the changed record
+    op: Literal['upsert', 'delete']
+    changed_at: datetime
+    data: Optional[dict[str, Any]] = None  # full record for upserts, None for deletes
+
+
+class SyncChangesResponse(BaseModel):
+    changes: List[SyncChange]
+    # pass back as ?since= on the next call; always present, even when nothing changed
+    next_cursor: str
+    has_more: bool
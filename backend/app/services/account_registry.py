@@ -0,0 +1,59 @@
+from typing import NamedTuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import VersionedRegistry
+from models.models import ChartOfAccount
+
+
+class AccountEntry(NamedTuple):
+    id: UUID
+    name: str
+    type: str
+    is_active: bool
+
+
+class AccountRegistry(VersionedRegistry):
+    """In-memory copy of ``chart_of_accounts`` indexed by id, name and type.
+
+    Invalidated by the write handlers in ``api/endpoints/coa.py``.
+    """
+
+    version_key = "chart_of_accounts"
+
+    def __init__(self):
+        super().__init__()
+        self._by_id: dict[UUID, AccountEntry] = {}
+        self._by_name: dict[str, AccountEntry] = {}
+        self._by_type: dict[str, list[AccountEntry]] = {}
+
+    async def _load(self, session: AsyncSession) -> None:
+        res = await session.execute(select(ChartOfAccount).order_by(ChartOfAccount.created_at))
+        by_id, by_name, by_type = {}, {}, {}
+        for a in res.scalars():
+            entry = AccountEntry(a.id, a.name, a.type, a.is_active)
+            by_id[entry.id] = entry
+            by_name.setdefault(entry.name, entry)
+            by_type.setdefault(entry.type, []).append(entry)
+        self._by_id, self._by_name, self._by_type = by_id, by_name, by_type
+
+    def get(self, account_id: UUID) -> AccountEntry | None:
+        """Return the account with ``account_id``. Call ``ensure_fresh`` first."""
+        return self._by_id.get(account_id)
+
+    def by_name(self, name: str) -> AccountEntry | None:
+        return self._by_name.get(name)
+
+    def by_type(self, account_type: str, active_only: bool = True) -> list[AccountEntry]:
+        """Accounts of ``account_type``, oldest first."""
+        accounts = self._by_type.get(account_type, [])
+        return [a for a in accounts if a.is_active] if active_only else list(accounts)
+
+    def first_of_type(self, account_type: str) -> AccountEntry | None:
+        accounts = self.by_type(account_type)
+        return accounts[0] if accounts else None
+
+
+account_registry = AccountRegistry()
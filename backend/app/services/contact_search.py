@@ -0,0 +1,129 @@
+import heapq
+import re
+from typing import NamedTuple
+from uuid import UUID
+
+from sqlalchemy import func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import CONTACTS_VERSION_KEY, VersionedRegistry
+from models.models import Contact
+
+
+# pg_trgm's default word_similarity_threshold, used for the fallback index as well
+MIN_WORD_SIMILARITY = 0.6
+
+_WORD = re.compile(r"[0-9a-z]+")
+
+
+def trigrams(text: str | None) -> set[str]:
+    """Trigrams of ``text`` the way pg_trgm builds them: lowercased alphanumeric words,
+    each padded with two spaces in front and one behind."""
+    result = set()
+    for word in _WORD.findall((text or "").lower()):
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def _escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class _IndexedContact(NamedTuple):
+    id: UUID
+    name: str
+    # lowercased name, email and mobile, for the substring check
+    fields: tuple[str, ...]
+
+
+class ContactSearchIndex(VersionedRegistry):
+    """In-memory trigram index over contact name, email and mobile.
+
+    Fallback for databases without pg_trgm (SQLite test deployments). A contact's score
+    is the best share of the query's trigrams found in one of its fields, which tracks
+    pg_trgm's ``word_similarity``; substring matches always qualify. Invalidated by the
+    write handlers in ``api/endpoints/contacts.py``.
+    """
+
+    version_key = CONTACTS_VERSION_KEY
+
+    def __init__(self):
+        super().__init__()
+        self._contacts: dict[UUID, _IndexedContact] = {}
+        # trigram -> {contact id: bitmask of the fields containing it}
+        self._postings: dict[str, dict[UUID, int]] = {}
+
+    async def _load(self, session: AsyncSession) -> None:
+        res = await session.execute(select(Contact.id, Contact.name, Contact.email, Contact.mobile))
+        contacts, postings = {}, {}
+        for row in res:
+            values = (row.name, row.email, row.mobile)
+            contacts[row.id] = _IndexedContact(row.id, row.name, tuple((v or "").lower() for v in values))
+            for bit, value in enumerate(values):
+                for gram in trigrams(value):
+                    fields = postings.setdefault(gram, {})
+                    fields[row.id] = fields.get(row.id, 0) | (1 << bit)
+        self._contacts, self._postings = contacts, postings
+
+    def search(self, q: str, limit: int) -> list[UUID]:
+        """Ids of the best matches for ``q``, best first. Call ``ensure_fresh`` first."""
+        grams = trigrams(q)
+        needle = q.strip().lower()
+        # shared trigram count per (contact, field)
+        shared: dict[tuple[UUID, int], int] = {}
+        for gram in grams:
+            for contact_id, mask in self._postings.get(gram, {}).items():
+                for bit in range(3):
+                    if mask & (1 << bit):
+                        shared[contact_id, bit] = shared.get((contact_id, bit), 0) + 1
+
+        scores: dict[UUID, float] = {}
+        for (contact_id, _), count in shared.items():
+            score = count / len(grams)
+            if score > scores.get(contact_id, 0.0):
+                scores[contact_id] = score
+        matches = {cid: s for cid, s in scores.items() if s >= MIN_WORD_SIMILARITY}
+        if needle:
+            # substrings qualify regardless of score, like the ILIKE branch of the SQL query
+            for contact in self._contacts.values():
+                if contact.id not in matches and any(needle in field for field in contact.fields):
+                    matches[contact.id] = scores.get(contact.id, 0.0)
+
+        best = heapq.nsmallest(
+            limit, matches.items(), key=lambda item: (-item[1], self._contacts[item[0]].name, item[0])
+        )
+        return [contact_id for contact_id, _ in best]
+
+
+contact_search_index = ContactSearchIndex()
+
+
+async def search_contacts(session: AsyncSession, q: str, limit: int) -> list[Contact]:
+    """Contacts whose name, email or mobile match ``q``, best match first.
+
+    On PostgreSQL this is one query served by the pg_trgm GIN indexes (``<%`` for fuzzy
+    word matches, ILIKE for plain substrings); elsewhere the in-memory index ranks and
+    the matching rows are fetched by id.
+    """
+    if session.bind.dialect.name == "postgresql":
+        columns = (Contact.name, Contact.email, Contact.mobile)
+        pattern = f"%{_escape_like(q)}%"
+        score = func.greatest(*(func.word_similarity(q, c) for c in columns)).label("score")
+        stmt = (
+            select(Contact)
+            .where(or_(
+                *(literal(q).op("<%")(c) for c in columns),
+                *(c.ilike(pattern, escape='\\') for c in columns),
+            ))
+            .order_by(score.desc(), Contact.name, Contact.id)
+            .limit(limit)
+        )
+        return list((await session.execute(stmt)).scalars())
+
+    await contact_search_index.ensure_fresh(session)
+    ids = contact_search_index.search(q, limit)
+    if not ids:
+        return []
+    rows = {c.id: c for c in (await session.execute(select(Contact).where(Contact.id.in_(ids)))).scalars()}
+    return [rows[i] for i in ids if i in rows]
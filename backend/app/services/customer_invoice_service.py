@@ -1,19 +1,83 @@
-from uuid import uuid4
+from datetime import date, datetime, time, timedelta
+from typing import AsyncIterator
+from uuid import UUID, uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from models.models import Product, Tax, CustomerInvoice, CustomerInvoiceItem, SalesOrder, SalesOrderLine
-from schemas.schemas import CustomerInvoiceCreate, CustomerInvoiceResponse
+from sqlalchemy import Select, exists, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import noload, selectinload
+from core.cache import DASHBOARD_VERSION_KEY, bump_cache_version
+from core.events import event_bus
+from core.counting import CountMode, count_rows
+from core.exceptions import ConflictError
+from core.filters import FilterSpec, ListFilters, apply_filters, apply_sort
+from core.pagination import Page
+from core.streaming import STREAM_BATCH_SIZE
+from models.models import CustomerInvoice, CustomerInvoiceItem, SalesOrder
+from repositories.product_repository import ProductRepository
+from schemas.schemas import CustomerInvoiceCreate, CustomerInvoiceResponse, CustomerInvoiceSummary
+from services.dashboard_cache import dashboard_cache
+from services.line_resolver import LineResolver, document_totals
+from services.pricing import price_batch
+
+
+LIST_FILTERS = FilterSpec(
+    id=CustomerInvoice.id,
+    status=CustomerInvoice.status,
+    party=CustomerInvoice.customer_name,
+    party_id=CustomerInvoice.customer_id,
+    date=CustomerInvoice.invoice_date,
+    amount=CustomerInvoice.total_amount,
+    sorts={
+        'created_at': CustomerInvoice.created_at,
+        'invoice_date': CustomerInvoice.invoice_date,
+        'due_date': CustomerInvoice.due_date,
+        'total_amount': CustomerInvoice.total_amount,
+        'customer_name': CustomerInvoice.customer_name,
+        'invoice_number': CustomerInvoice.invoice_number,
+    },
+)
 
 
 class CustomerInvoiceService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def list_invoices(self):
-        stmt = select(CustomerInvoice).options(selectinload(CustomerInvoice.lines)).order_by(CustomerInvoice.created_at.desc())
-        result = (await self.session.execute(stmt)).scalars().unique().all()
-        return [CustomerInvoiceResponse.model_validate(inv) for inv in result]
+    @staticmethod
+    def list_statement(filters: ListFilters | None = None) -> Select:
+        """Invoices matching ``filters`` in their sort order (newest first by default).
+
+        Raises ValueError for an invalid filter or sort.
+        """
+        filters = filters or ListFilters()
+        return apply_sort(apply_filters(select(CustomerInvoice), LIST_FILTERS, filters), LIST_FILTERS, filters)
+
+    async def list_invoices(
+        self,
+        include_lines: bool = False,
+        filters: ListFilters | None = None,
+        count: CountMode = 'none',
+    ) -> Page[CustomerInvoiceSummary] | Page[CustomerInvoiceResponse]:
+        """Every invoice matching ``filters``, on a single page.
+
+        ``count`` selects how ``Page.total`` is computed; ``exact`` takes the length
+        of the loaded list instead of a second query.
+        """
+        stmt = self.list_statement(filters)
+        line_load = selectinload(CustomerInvoice.lines) if include_lines else noload(CustomerInvoice.lines)
+        result = (await self.session.execute(stmt.options(line_load))).scalars().unique().all()
+        total = len(result) if count == 'exact' else await count_rows(self.session, stmt, count)
+        schema = CustomerInvoiceResponse if include_lines else CustomerInvoiceSummary
+        return Page([schema.model_validate(inv) for inv in result], None, total)
+
+    async def stream_invoices(self, stmt: Select) -> AsyncIterator[CustomerInvoiceResponse]:
+        """Invoices of a ``list_statement`` read through a server-side cursor in batches."""
+        stmt = (
+            stmt
+            .options(selectinload(CustomerInvoice.lines))
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for inv in await self.session.stream_scalars(stmt):
+            yield CustomerInvoiceResponse.model_validate(inv)
 
     async def get_invoice(self, invoice_id):
         stmt = select(CustomerInvoice).options(selectinload(CustomerInvoice.lines)).where(CustomerInvoice.id == invoice_id)
@@ -34,55 +98,29 @@ class CustomerInvoiceService:
         self.session.add(inv)
         await self.session.flush()
 
-        total_untaxed = 0.0
-        total_tax = 0.0
-
-        for line_in in payload.lines:
-            product = None
-            if getattr(line_in, 'product_id', None):
-                product = (await self.session.execute(select(Product).where(Product.id == line_in.product_id))).scalar_one_or_none()
-            if not product:
-                product = (await self.session.execute(select(Product).where(Product.name == line_in.product_name))).scalar_one_or_none()
-            if not product:
-                raise ValueError(f"Product '{line_in.product_name}' not found")
-
-            tax_percent = 0.0
-            if product.tax_name:
-                # Per requirement: use purchase tax percent for customer invoices
-                tax_row = (await self.session.execute(
-                    select(Tax).where(
-                        Tax.name == product.tax_name,
-                        Tax.is_applicable_on_purchase == True
-                    )
-                )).scalar_one_or_none()
-                if tax_row and tax_row.computation_method == 'percentage':
-                    tax_percent = float(tax_row.value)
-
-            untaxed = line_in.quantity * line_in.unit_price
-            tax_amount = round(float(untaxed) * (tax_percent / 100), 2)
-            total = untaxed + tax_amount
-
-            total_untaxed += float(untaxed)
-            total_tax += float(tax_amount)
-
-            item = CustomerInvoiceItem(
+        # Per requirement: use purchase tax percent for customer invoices
+        priced = await LineResolver(self.session, 'purchase').price_lines(payload.lines)
+        self.session.add_all([
+            CustomerInvoiceItem(
                 customer_invoice_id=inv.id,
-                product_id=product.id,
-                product_name=product.name,
-                hsn_code=product.hsn_code,
-                account_id=getattr(line_in, 'account_id', None),
-                quantity=line_in.quantity,
-                unit_price=line_in.unit_price,
-                tax_percent=tax_percent,
-                untaxed_amount=untaxed,
-                tax_amount=tax_amount,
-                total_amount=total,
+                product_id=p.product.id,
+                product_name=p.product.name,
+                hsn_code=p.product.hsn_code,
+                account_id=getattr(p.source, 'account_id', None),
+                quantity=p.quantity,
+                unit_price=p.unit_price,
+                tax_percent=p.tax_percent,
+                untaxed_amount=p.untaxed_amount,
+                tax_amount=p.tax_amount,
+                total_amount=p.total_amount,
             )
-            self.session.add(item)
+            for p in priced
+        ])
+        total_untaxed, total_tax, total_amount = document_totals(priced)
 
         inv.total_untaxed = total_untaxed
         inv.total_tax = total_tax
-        inv.total_amount = total_untaxed + total_tax
+        inv.total_amount = total_amount
 
         await self.session.commit()
 
@@ -96,50 +134,147 @@ class CustomerInvoiceService:
         the frontend render as read-only and missing product meta. We now:
           * create invoice with status 'draft' so user can fill remaining fields (customer, dates)
           * hydrate line items with product HSN codes
+        An order that already has a live (not cancelled) invoice raises ConflictError, as
+        the batch path skips it.
         """
+        # the row lock makes a concurrent call for the same order wait, then see its invoice
         so = (await self.session.execute(
-            select(SalesOrder).options(selectinload(SalesOrder.lines)).where(SalesOrder.id == sales_order_id)
+            select(SalesOrder).options(selectinload(SalesOrder.lines))
+            .where(SalesOrder.id == sales_order_id)
+            .with_for_update(of=SalesOrder)
         )).scalar_one_or_none()
         if not so:
             raise ValueError("Sales Order not found")
         if so.status != 'confirmed':
             raise ValueError("Sales Order must be confirmed before creating an invoice")
+        invoiced = await self.session.execute(
+            select(SalesOrder.id).where(SalesOrder.id == so.id, self._has_live_invoice())
+        )
+        if invoiced.first():
+            raise ConflictError("Sales Order already has an invoice")
 
-        invoice_number = str(uuid4())
-        inv = CustomerInvoice(
-            invoice_number=invoice_number,
-            customer_name=so.customer_name,  # carry over from sales order (can still edit)
-            customer_id=getattr(so, 'customer_id', None),
-            invoice_date=None,
-            due_date=None,
-            status='draft',  # allow user to review/edit before posting
+        products, _ = await ProductRepository(self.session).get_many({l.product_id for l in so.lines})
+        header, items = self._invoice_rows_from_sales_order(so, products)
+        await self.session.execute(insert(CustomerInvoice), [header])
+        if items:
+            await self.session.execute(insert(CustomerInvoiceItem), items)
+        await self.session.commit()
+        return await self.get_invoice(header['id'])
+
+    async def create_invoices_from_sales_orders(
+        self,
+        sales_order_ids: list[UUID] | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        chunk_size: int = 200,
+    ) -> AsyncIterator[dict]:
+        """Invoice many confirmed sales orders, yielding a progress event per chunk.
+
+        Targets are the given ``sales_order_ids`` or, if omitted, every confirmed order
+        (optionally restricted to a created_at date range) that has no live invoice yet.
+        Each chunk loads its orders and lines in one selectin pass, inserts invoices and
+        items with executemany and commits on its own, so a failing chunk is rolled back
+        and reported without undoing the chunks before it.
+        """
+        stmt = (
+            select(SalesOrder.id)
+            .where(SalesOrder.status == 'confirmed', ~self._has_live_invoice())
+            .order_by(SalesOrder.created_at, SalesOrder.id)
         )
-        self.session.add(inv)
-        await self.session.flush()
+        if sales_order_ids is not None:
+            stmt = stmt.where(SalesOrder.id.in_(sales_order_ids))
+        if date_from:
+            stmt = stmt.where(SalesOrder.created_at >= datetime.combine(date_from, time.min))
+        if date_to:
+            stmt = stmt.where(SalesOrder.created_at < datetime.combine(date_to + timedelta(days=1), time.min))
+        target_ids = list((await self.session.execute(stmt)).scalars())
+        # release the read transaction before the (long) chunked writes
+        await self.session.commit()
 
-        total_untaxed = 0.0
-        total_tax = 0.0
+        skipped = []
+        if sales_order_ids is not None:
+            eligible = set(target_ids)
+            skipped = [
+                {"sales_order_id": str(i), "error": "Not found, not confirmed or already invoiced"}
+                for i in dict.fromkeys(sales_order_ids) if i not in eligible
+            ]
+        progress = {"event": "progress", "total": len(target_ids), "processed": 0,
+                    "created": 0, "failed": 0, "skipped": len(skipped)}
+        yield {**progress, "event": "started", "results": skipped}
 
-        # Recompute amounts from lines to ensure consistency
-        so_lines = (await self.session.execute(select(SalesOrderLine).where(SalesOrderLine.sales_order_id == so.id))).scalars().all()
-        # Preload products for HSN lookup
-        product_ids = {l.product_id for l in so_lines if l.product_id}
-        products = {}
-        if product_ids:
-            prod_rows = (await self.session.execute(select(Product).where(Product.id.in_(product_ids)))).scalars().all()
-            products = {p.id: p for p in prod_rows}
+        for offset in range(0, len(target_ids), chunk_size):
+            chunk = target_ids[offset:offset + chunk_size]
+            results = []
+            try:
+                # lock the chunk and re-check eligibility so concurrent runs cannot double-invoice
+                orders = (await self.session.execute(
+                    select(SalesOrder)
+                    .options(selectinload(SalesOrder.lines))
+                    .where(SalesOrder.id.in_(chunk), SalesOrder.status == 'confirmed', ~self._has_live_invoice())
+                    .with_for_update(of=SalesOrder, skip_locked=True)
+                )).scalars().all()
+                product_ids = {l.product_id for so in orders for l in so.lines}
+                products, _ = await ProductRepository(self.session).get_many(product_ids)
+                headers, items = [], []
+                for so in orders:
+                    header, lines = self._invoice_rows_from_sales_order(so, products)
+                    headers.append(header)
+                    items.extend(lines)
+                    results.append({"sales_order_id": str(so.id), "invoice_id": str(header['id'])})
+                if headers:
+                    await self.session.execute(insert(CustomerInvoice), headers)
+                if items:
+                    await self.session.execute(insert(CustomerInvoiceItem), items)
+                await self.session.commit()
+            except SQLAlchemyError as e:
+                await self.session.rollback()
+                progress["failed"] += len(chunk)
+                results = [{"sales_order_id": str(i), "error": str(e.__cause__ or e)} for i in chunk]
+            else:
+                progress["created"] += len(headers)
+                handled = {r["sales_order_id"] for r in results}
+                # orders invoiced or locked by a concurrent run since the id scan
+                missed = [{"sales_order_id": str(i), "error": "Already invoiced or locked by another run"}
+                          for i in chunk if str(i) not in handled]
+                progress["skipped"] += len(missed)
+                results.extend(missed)
+            progress["processed"] += len(chunk)
+            yield {**progress, "results": results}
 
-        for l in so_lines:
-            untaxed = float(l.quantity) * float(l.unit_price)
-            tax_amount = float(l.tax_amount)
-            total = float(l.total_amount)
+        yield {**progress, "event": "done", "results": []}
 
-            total_untaxed += float(l.untaxed_amount)
-            total_tax += float(l.tax_amount)
+    @staticmethod
+    def _has_live_invoice():
+        return exists().where(
+            CustomerInvoice.sales_order_id == SalesOrder.id,
+            CustomerInvoice.status != 'cancelled',
+        )
 
+    @staticmethod
+    def _invoice_rows_from_sales_order(so: SalesOrder, products: dict) -> tuple[dict, list[dict]]:
+        """Build insert rows for a draft invoice copying a sales order's lines."""
+        invoice_id = uuid4()
+        header = dict(
+            id=invoice_id,
+            invoice_number=str(uuid4()),
+            sales_order_id=so.id,
+            customer_name=so.customer_name,  # carry over from sales order (can still edit)
+            customer_id=getattr(so, 'customer_id', None),
+            invoice_date=None,
+            due_date=None,
+            status='draft',  # allow user to review/edit before posting
+        )
+        # Recompute amounts from the lines' stored quantity, price and tax rate
+        batch = price_batch(
+            [l.quantity for l in so.lines],
+            [l.unit_price for l in so.lines],
+            [l.tax_percent for l in so.lines],
+        )
+        items = []
+        for l, untaxed, tax, total in zip(so.lines, *batch.line_amounts()):
             prod = products.get(l.product_id)
-            item = CustomerInvoiceItem(
-                customer_invoice_id=inv.id,
+            items.append(dict(
+                customer_invoice_id=invoice_id,
                 product_id=l.product_id,
                 product_name=l.product_name,
                 hsn_code=getattr(prod, 'hsn_code', None),
@@ -148,17 +283,12 @@ class CustomerInvoiceService:
                 unit_price=l.unit_price,
                 tax_percent=l.tax_percent,
                 untaxed_amount=untaxed,
-                tax_amount=tax_amount,
+                tax_amount=tax,
                 total_amount=total,
-            )
-            self.session.add(item)
-
-        inv.total_untaxed = total_untaxed
-        inv.total_tax = total_tax
-        inv.total_amount = total_untaxed + total_tax
-
-        await self.session.commit()
-        return await self.get_invoice(inv.id)
+            ))
+        total_untaxed, total_tax, total_amount = next(batch.document_amounts())
+        header.update(total_untaxed=total_untaxed, total_tax=total_tax, total_amount=total_amount)
+        return header, items
 
     async def post_invoice(self, invoice_id) -> CustomerInvoiceResponse:
         """Transition an invoice from draft to posted.
@@ -173,5 +303,10 @@ class CustomerInvoiceService:
         if inv.status and inv.status != 'draft':
             raise ValueError("Only draft invoices can be posted")
         inv.status = 'posted'
+        await bump_cache_version(self.session, DASHBOARD_VERSION_KEY)
+        await event_bus.emit(self.session, 'invoice', {
+            "document_type": 'customer_invoice', "id": str(inv.id), "status": inv.status,
+        })
         await self.session.commit()
+        dashboard_cache.invalidate()
         return await self.get_invoice(inv.id)
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Hashable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import settings
+from core.cache import DASHBOARD_VERSION_KEY, get_cache_version
+from schemas.schemas import DashboardResponse
+
+
+_MAX_CACHED_DASHBOARDS = 256
+
+
+class DashboardCache:
+    """Process-local cache of computed dashboards, keyed by role and date range.
+
+    Entries live for ``DASHBOARD_CACHE_TTL_SECONDS``. Writes that change dashboard
+    figures bump ``DASHBOARD_VERSION_KEY`` in their transaction and call
+    ``invalidate()`` after commit; other workers notice the bump within
+    ``CACHE_VERSION_CHECK_SECONDS``. Concurrent misses for one key share a single
+    computation.
+    """
+
+    def __init__(self):
+        # key -> (monotonic expiry, dashboard)
+        self._entries: dict[Hashable, tuple[float, DashboardResponse]] = {}
+        # key -> future of the computation in progress
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._version: int | None = None
+        self._checked_at = 0.0
+        self._generation = 0
+
+    def invalidate(self) -> None:
+        """Drop every entry; computations already running are not cached when they finish."""
+        self._generation += 1
+        self._entries.clear()
+        self._inflight.clear()
+
+    async def _check_version(self, session: AsyncSession) -> None:
+        if time.monotonic() - self._checked_at < settings.CACHE_VERSION_CHECK_SECONDS:
+            return
+        version = await get_cache_version(session, DASHBOARD_VERSION_KEY)
+        if version != self._version:
+            self.invalidate()
+            self._version = version
+        self._checked_at = time.monotonic()
+
+    async def get(
+        self, session: AsyncSession, key: Hashable, compute: Callable[[], Awaitable[DashboardResponse]]
+    ) -> DashboardResponse:
+        """Cached dashboard for ``key``, running ``compute`` on a miss.
+
+        Callers that miss while another request computes the same key wait for its
+        result instead of querying again. If that request is cancelled, one of the
+        waiters takes over.
+        """
+        await self._check_version(session)
+        while True:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            flight = self._inflight.get(key)
+            if flight is None:
+                break
+            try:
+                # shielded: a waiter going away must not cancel the shared computation
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+
+        flight = asyncio.get_running_loop().create_future()
+        # mark the exception retrieved even when nobody else was waiting
+        flight.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = flight
+        generation = self._generation
+        try:
+            result = await compute()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                flight.cancel()
+            else:
+                flight.set_exception(e)
+            raise
+        finally:
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+
+        flight.set_result(result)
+        if generation == self._generation:
+            if len(self._entries) >= _MAX_CACHED_DASHBOARDS:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + settings.DASHBOARD_CACHE_TTL_SECONDS, result)
+        return result
+
+
+dashboard_cache = DashboardCache()
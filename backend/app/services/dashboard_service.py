@@ -0,0 +1,105 @@
+import calendar
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from sqlalchemy import Select, case, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.models import MonthlyFinancialSummary, Payment, Product
+from schemas.schemas import DashboardMonthlyItem, DashboardResponse
+from services.financial_summary import month_start
+
+
+def _month_aligned(date_from: date | None, date_to: date | None) -> bool:
+    """True when the range covers whole calendar months, so the monthly rollup can answer it."""
+    if date_from and date_from.day != 1:
+        return False
+    if date_to and date_to.day != calendar.monthrange(date_to.year, date_to.month)[1]:
+        return False
+    return True
+
+
+class DashboardService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _month(self, column):
+        """'YYYY-MM' of a date or timestamp column."""
+        if self.session.bind.dialect.name == "postgresql":
+            return func.to_char(column, 'YYYY-MM')
+        return func.strftime('%Y-%m', column)
+
+    def _from_summary(self, date_from: date | None, date_to: date | None) -> Select:
+        """Monthly sales/purchases read from the rollup: O(months)."""
+        s = MonthlyFinancialSummary
+        month = self._month(s.month).label('month')
+        stmt = select(
+            month,
+            func.sum(case((s.partner_type == 'customer', s.total_amount), else_=0)).label('sales'),
+            func.sum(case((s.partner_type == 'vendor', s.total_amount), else_=0)).label('purchases'),
+        ).group_by(month)
+        if date_from:
+            stmt = stmt.where(s.month >= date_from)
+        if date_to:
+            stmt = stmt.where(s.month <= month_start(date_to))
+        return stmt
+
+    def _from_payments(self, date_from: date | None, date_to: date | None) -> Select:
+        """Monthly sales/purchases aggregated from posted payments, for ranges that split a month."""
+        month = self._month(Payment.payment_date).label('month')
+        stmt = (
+            select(
+                month,
+                func.sum(case((Payment.partner_type == 'customer', Payment.amount), else_=0)).label('sales'),
+                func.sum(case((Payment.partner_type == 'vendor', Payment.amount), else_=0)).label('purchases'),
+            )
+            .where(Payment.status == 'posted')
+            .group_by(month)
+        )
+        if date_from:
+            stmt = stmt.where(Payment.payment_date >= datetime.combine(date_from, time.min))
+        if date_to:
+            stmt = stmt.where(Payment.payment_date < datetime.combine(date_to + timedelta(days=1), time.min))
+        return stmt
+
+    async def get_dashboard(self, date_from: date | None = None, date_to: date | None = None) -> DashboardResponse:
+        """Totals, monthly sales vs purchases and stock on hand in one round trip.
+
+        Only posted payments count: customer payments are sales (revenue), vendor
+        payments are purchases (expenses). ``date_from``/``date_to`` bound the payment
+        date, both inclusive. Ranges of whole months (including no range) are read from
+        ``monthly_financial_summary``; others aggregate payments through the
+        (status, payment_date) index. Totals are summed from the monthly rows.
+        """
+        if date_from and date_to and date_from > date_to:
+            raise ValueError("date_from must not be after date_to")
+
+        if _month_aligned(date_from, date_to):
+            monthly = self._from_summary(date_from, date_to).subquery()
+        else:
+            monthly = self._from_payments(date_from, date_to).subquery()
+        stock = select(func.coalesce(func.sum(Product.current_stock), 0).label('total')).subquery()
+
+        # the one-row stock subquery keeps the stock total even when no payment matches
+        stmt = (
+            select(stock.c.total, monthly.c.month, monthly.c.sales, monthly.c.purchases)
+            .select_from(stock.outerjoin(monthly, true()))
+            .order_by(monthly.c.month)
+        )
+        rows = (await self.session.execute(stmt)).all()
+
+        total_items_in_stock = int(rows[0].total or 0) if rows else 0
+        months = [r for r in rows if r.month is not None]
+        sales_vs_purchases = [
+            DashboardMonthlyItem(month=r.month, sales=float(r.sales or 0), purchases=float(r.purchases or 0))
+            for r in months
+        ]
+        total_revenue = sum((Decimal(str(r.sales or 0)) for r in months), Decimal(0))
+        total_expenses = sum((Decimal(str(r.purchases or 0)) for r in months), Decimal(0))
+        return DashboardResponse(
+            total_revenue=float(total_revenue),
+            total_expenses=float(total_expenses),
+            net_profit=float(total_revenue - total_expenses),
+            total_items_in_stock=total_items_in_stock,
+            sales_vs_purchases=sales_vs_purchases,
+        )
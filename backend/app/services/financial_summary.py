@@ -0,0 +1,62 @@
+from datetime import date, datetime
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database import dialect_insert
+from models.models import MonthlyFinancialSummary, Payment
+
+
+def month_start(value: date | datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _month_of(session: AsyncSession, column):
+    """First day of the month of a timestamp column, as a date."""
+    if session.bind.dialect.name == "postgresql":
+        return func.date_trunc('month', column).cast(MonthlyFinancialSummary.month.type)
+    return func.date(column, 'start of month')
+
+
+async def record_payment(session: AsyncSession, payment: Payment, sign: int) -> None:
+    """Add (``sign=1``, on posting) or remove (``sign=-1``, on cancelling) a payment's amount
+    in its month's summary row. Runs in the caller's transaction."""
+    insert_stmt = dialect_insert(session)(MonthlyFinancialSummary).values(
+        month=month_start(payment.payment_date),
+        partner_type=payment.partner_type,
+        total_amount=sign * payment.amount,
+        payment_count=sign,
+    )
+    stmt = insert_stmt.on_conflict_do_update(
+        index_elements=[MonthlyFinancialSummary.month, MonthlyFinancialSummary.partner_type],
+        set_={
+            "total_amount": MonthlyFinancialSummary.total_amount + insert_stmt.excluded.total_amount,
+            "payment_count": MonthlyFinancialSummary.payment_count + insert_stmt.excluded.payment_count,
+            "updated_at": func.now(),
+        },
+    )
+    await session.execute(stmt)
+
+
+async def rebuild_monthly_summary(session: AsyncSession) -> int:
+    """Recompute every summary row from posted payments; returns the number of rows.
+
+    The table is locked for the rebuild, so postings that race with it either land
+    before the snapshot is taken or wait and apply on top of the rebuilt rows.
+    """
+    if session.bind.dialect.name == "postgresql":
+        await session.execute(text("LOCK TABLE monthly_financial_summary IN EXCLUSIVE MODE"))
+    month = _month_of(session, Payment.payment_date)
+    posted = (
+        select(month, Payment.partner_type, func.sum(Payment.amount), func.count())
+        .where(Payment.status == 'posted')
+        .group_by(month, Payment.partner_type)
+    )
+    await session.execute(delete(MonthlyFinancialSummary))
+    result = await session.execute(
+        insert(MonthlyFinancialSummary).from_select(
+            ['month', 'partner_type', 'total_amount', 'payment_count'], posted
+        )
+    )
+    await session.commit()
+    return result.rowcount
@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Callable
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from services.line_resolver import PricedLine
+
+
+CENT = Decimal('0.01')
+
+
+def to_decimal(value) -> Decimal:
+    if value is None:
+        return Decimal(0)
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def _money(value) -> Decimal:
+    """Value as it will be stored in a Numeric(_, 2) column, rounded half-up like the pricing engine."""
+    return to_decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _same(old, new) -> bool:
+    if isinstance(old, (Decimal, float)) or isinstance(new, (Decimal, float)):
+        return _money(old) == _money(new)
+    return old == new
+
+
+@dataclass
+class LineChanges:
+    """Outcome of a diff-based line replacement."""
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    untaxed_delta: Decimal = Decimal(0)
+    tax_delta: Decimal = Decimal(0)
+
+    def apply_to(self, header) -> None:
+        """Shift a document header's totals by the line deltas instead of re-summing.
+
+        Any line write also touches the header's ``updated_at``, even when the totals
+        come out the same, so the sync feed picks the document up.
+        """
+        header.total_untaxed = to_decimal(header.total_untaxed) + self.untaxed_delta
+        header.total_tax = to_decimal(header.total_tax) + self.tax_delta
+        header.total_amount = header.total_untaxed + header.total_tax
+        if self.inserted or self.updated or self.deleted:
+            header.updated_at = func.now()
+
+
+async def apply_line_changes(
+    session: AsyncSession,
+    line_model,
+    parent_fk: InstrumentedAttribute,
+    parent_id: UUID,
+    priced: list[PricedLine],
+    values_for: Callable[[PricedLine], dict[str, Any]],
+) -> LineChanges:
+    """Make a document's stored lines match ``priced`` with the fewest writes.
+
+    Incoming lines are matched to existing ones by explicit ``id`` first, then by
+    product. Matched lines whose values did not change are left alone; changed ones
+    are written with one executemany UPDATE, unmatched incoming lines with one
+    executemany INSERT and leftover existing lines with one DELETE. Only the narrow
+    value columns of existing lines are read; the ORM collection is never loaded.
+    """
+    columns = list(values_for(priced[0]).keys()) if priced else []
+    select_cols = {'id', 'product_id', 'untaxed_amount', 'tax_amount', *columns}
+    rows = (await session.execute(
+        select(*(getattr(line_model, c) for c in select_cols)).where(parent_fk == parent_id)
+    )).mappings().all()
+    existing = {row['id']: row for row in rows}
+    existing_by_product: dict[UUID, list[UUID]] = {}
+    for row in rows:
+        existing_by_product.setdefault(row['product_id'], []).append(row['id'])
+    unmatched = dict.fromkeys(existing)  # insertion-ordered set
+
+    changes = LineChanges()
+    to_update: list[dict[str, Any]] = []
+    to_insert: list[dict[str, Any]] = []
+
+    for p in priced:
+        values = values_for(p)
+        line_id = getattr(p.source, 'id', None)
+        if line_id not in unmatched:
+            line_id = next((i for i in existing_by_product.get(p.product.id, ()) if i in unmatched), None)
+        if line_id is not None:
+            del unmatched[line_id]
+
+        if line_id is None:
+            to_insert.append({parent_fk.key: parent_id, **values})
+            changes.untaxed_delta += _money(values['untaxed_amount'])
+            changes.tax_delta += _money(values['tax_amount'])
+            continue
+
+        old = existing[line_id]
+        if all(_same(old[k], v) for k, v in values.items()):
+            continue
+        to_update.append({'id': line_id, **values})
+        changes.untaxed_delta += _money(values['untaxed_amount']) - _money(old['untaxed_amount'])
+        changes.tax_delta += _money(values['tax_amount']) - _money(old['tax_amount'])
+
+    to_delete = list(unmatched)
+    for line_id in to_delete:
+        changes.untaxed_delta -= _money(existing[line_id]['untaxed_amount'])
+        changes.tax_delta -= _money(existing[line_id]['tax_amount'])
+
+    if to_delete:
+        await session.execute(
+            delete(line_model).where(line_model.id.in_(to_delete)),
+            execution_options={'synchronize_session': False},
+        )
+    if to_update:
+        await session.execute(update(line_model), to_update)
+    if to_insert:
+        await session.execute(insert(line_model), to_insert)
+
+    changes.inserted = len(to_insert)
+    changes.updated = len(to_update)
+    changes.deleted = len(to_delete)
+    return changes
@@ -0,0 +1,154 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from repositories.product_repository import CachedProduct, ProductRepository
+from services.pricing import price_batch
+from services.tax_registry import TaxSide, tax_registry
+
+
+@dataclass
+class PricedLine:
+    """A document line resolved against the catalog and priced."""
+    source: Any
+    product: CachedProduct
+    quantity: int
+    unit_price: float
+    tax_percent: Decimal
+    untaxed_amount: Decimal
+    tax_amount: Decimal
+    total_amount: Decimal
+
+
+class LineResolver:
+    """Resolve products and taxes for a whole set of document lines at once.
+
+    Every service used to run up to three SELECTs per line (product by id, product
+    by name, tax by product.tax_name). The resolver instead fetches all referenced
+    products through the catalog cache (one query for the misses) and reads taxes
+    from the process-local tax registry, then prices the lines in memory with the
+    integer minor-unit engine in ``services.pricing`` (one call per document or batch).
+
+    ``side`` selects which tax applicability flag is honoured ('sales' or 'purchase').
+    """
+
+    def __init__(self, session: AsyncSession, side: TaxSide):
+        self.session = session
+        self.side = side
+        self._products_by_id: dict[UUID, CachedProduct] = {}
+        self._products_by_name: dict[str, CachedProduct] = {}
+
+    async def load(self, lines: Iterable[Any]) -> None:
+        """Preload every product referenced by ``lines`` (a single query at most)."""
+        lines = list(lines)
+        ids = {l.product_id for l in lines if getattr(l, 'product_id', None)}
+        names = {l.product_name for l in lines if getattr(l, 'product_name', None)}
+        ids -= self._products_by_id.keys()
+        names -= self._products_by_name.keys()
+
+        if ids or names:
+            by_id, by_name = await ProductRepository(self.session).get_many(ids, names)
+            self._products_by_id.update(by_id)
+            self._products_by_name.update(by_name)
+
+        await tax_registry.ensure_fresh(self.session)
+
+    def product_for(self, line: Any) -> CachedProduct:
+        """Return the product for a line, preferring product_id over product_name."""
+        product = None
+        if getattr(line, 'product_id', None):
+            product = self._products_by_id.get(line.product_id)
+        if not product:
+            product = self._products_by_name.get(line.product_name)
+        if not product:
+            raise ValueError(f"Product '{line.product_name}' not found")
+        return product
+
+    def tax_percent_for(self, product: CachedProduct) -> Decimal:
+        return tax_registry.percent(product.tax_name, self.side)
+
+    def price(self, line: Any, product: CachedProduct | None = None) -> PricedLine:
+        return self.price_many([(line, product or self.product_for(line))])[0]
+
+    def price_many(self, pairs: Sequence[tuple[Any, CachedProduct]]) -> list[PricedLine]:
+        """Price resolved (line, product) pairs of one document in a single engine call."""
+        return self.price_documents([pairs])[0].lines
+
+    def price_documents(self, documents: Sequence[Sequence[tuple[Any, CachedProduct]]]) -> list["PricedDocument"]:
+        """Price the lines of many documents together and return per-document totals.
+
+        Amounts stay in minor-unit arrays through the engine and are converted to
+        Decimal once per column for the whole batch; no per-line objects are built.
+        """
+        pairs = [pair for doc in documents for pair in doc]
+        percents: dict[str | None, Decimal] = {}
+        tax_percents = []
+        for _, product in pairs:
+            if product.tax_name not in percents:
+                percents[product.tax_name] = self.tax_percent_for(product)
+            tax_percents.append(percents[product.tax_name])
+        # the engine takes percents as floats too (they have two places); converting the
+        # few distinct Decimals once is cheaper than converting one per line
+        engine_percents = {name: float(percent) for name, percent in percents.items()}
+        batch = price_batch(
+            [line.quantity for line, _ in pairs],
+            [line.unit_price for line, _ in pairs],
+            [engine_percents[product.tax_name] for _, product in pairs],
+            doc_index=np.repeat(np.arange(len(documents)), [len(doc) for doc in documents]),
+            n_docs=len(documents),
+        )
+        untaxed, tax, total = batch.line_amounts()
+        docs = []
+        start = 0
+        for doc, (doc_untaxed, doc_tax, doc_total) in zip(documents, batch.document_amounts()):
+            end = start + len(doc)
+            docs.append(PricedDocument(
+                pairs[start:end], tax_percents[start:end], untaxed[start:end], tax[start:end], total[start:end],
+                doc_untaxed, doc_tax, doc_total,
+            ))
+            start = end
+        return docs
+
+    async def price_lines(self, lines: Iterable[Any]) -> list[PricedLine]:
+        """Load everything ``lines`` needs and price them in memory."""
+        lines = list(lines)
+        await self.load(lines)
+        return self.price_many([(l, self.product_for(l)) for l in lines])
+
+
+@dataclass
+class PricedDocument:
+    """Priced lines of one document, held as columns, and its header totals."""
+    pairs: list[tuple[Any, CachedProduct]]
+    tax_percents: list[Decimal]
+    untaxed_amounts: list[Decimal]
+    tax_amounts: list[Decimal]
+    total_amounts: list[Decimal]
+    total_untaxed: Decimal
+    total_tax: Decimal
+    total_amount: Decimal
+
+    def line_amounts(self) -> Iterator[tuple[tuple[Any, CachedProduct], Decimal, Decimal, Decimal, Decimal]]:
+        """((line, product), tax_percent, untaxed, tax, total) per line, for building insert rows."""
+        return zip(self.pairs, self.tax_percents, self.untaxed_amounts, self.tax_amounts, self.total_amounts)
+
+    @property
+    def lines(self) -> list[PricedLine]:
+        return [
+            PricedLine(line, product, line.quantity, line.unit_price, percent, untaxed, tax, total)
+            for (line, product), percent, untaxed, tax, total in self.line_amounts()
+        ]
+
+
+def document_totals(priced: Iterable[PricedLine]) -> tuple[Decimal, Decimal, Decimal]:
+    """Return (total_untaxed, total_tax, total_amount) for a set of priced lines."""
+    total_untaxed = Decimal(0)
+    total_tax = Decimal(0)
+    for p in priced:
+        total_untaxed += p.untaxed_amount
+        total_tax += p.tax_amount
+    return total_untaxed, total_tax, total_untaxed + total_tax
@@ -1,20 +1,54 @@
-from uuid import uuid4
+from uuid import UUID, uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime
+from decimal import Decimal
 
+from core.cache import DASHBOARD_VERSION_KEY, bump_cache_version
+from core.counting import CountMode, count_rows
+from core.events import event_bus
+from core.filters import FilterSpec, ListFilters, apply_filters, apply_sort
+from core.pagination import Page
 from models.models import Payment, VendorBill, CustomerInvoice
-from schemas.schemas import PaymentCreate, PaymentResponse, PaymentUpdate
+from schemas.schemas import DocumentPaymentsResponse, PaymentCreate, PaymentResponse, PaymentUpdate
+from services.dashboard_cache import dashboard_cache
+from services.financial_summary import record_payment
+
+
+LIST_FILTERS = FilterSpec(
+    id=Payment.id,
+    status=Payment.status,
+    party=Payment.partner_name,
+    date=Payment.payment_date,
+    amount=Payment.amount,
+    sorts={
+        'created_at': Payment.created_at,
+        'payment_date': Payment.payment_date,
+        'amount': Payment.amount,
+        'partner_name': Payment.partner_name,
+        'payment_number': Payment.payment_number,
+    },
+)
 
 
 class PaymentService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def list_payments(self):
-        res = await self.session.execute(select(Payment).order_by(Payment.created_at.desc()))
+    async def list_payments(
+        self, filters: ListFilters | None = None, count: CountMode = 'none'
+    ) -> Page[PaymentResponse]:
+        """Every payment matching ``filters``, on a single page.
+
+        ``count`` selects how ``Page.total`` is computed; ``exact`` takes the length
+        of the loaded list instead of a second query.
+        """
+        filters = filters or ListFilters()
+        stmt = apply_sort(apply_filters(select(Payment), LIST_FILTERS, filters), LIST_FILTERS, filters)
+        res = await self.session.execute(stmt)
         rows = res.scalars().unique().all()
-        return [PaymentResponse.model_validate(p) for p in rows]
+        total = len(rows) if count == 'exact' else await count_rows(self.session, stmt, count)
+        return Page([PaymentResponse.model_validate(p) for p in rows], None, total)
 
     async def get_payment(self, payment_id):
         res = await self.session.execute(select(Payment).where(Payment.id == payment_id))
@@ -23,6 +57,41 @@ class PaymentService:
             return None
         return PaymentResponse.model_validate(p)
 
+    async def document_payments(
+        self, vendor_bill_id: UUID | None = None, customer_invoice_id: UUID | None = None
+    ) -> DocumentPaymentsResponse | None:
+        """Payments of one vendor bill or customer invoice, oldest first, with its outstanding amount.
+
+        The paid amount is the one posting maintains on the document itself; draft
+        payments are reported separately as pending. None if the document does not exist.
+        """
+        if vendor_bill_id:
+            doc = (await self.session.execute(select(VendorBill).where(VendorBill.id == vendor_bill_id))).scalar_one_or_none()
+            if not doc:
+                return None
+            document_type, fk = 'vendor_bill', Payment.vendor_bill_id
+            paid = Decimal(str(doc.paid_cash or 0)) + Decimal(str(doc.paid_bank or 0))
+        else:
+            doc = (await self.session.execute(select(CustomerInvoice).where(CustomerInvoice.id == customer_invoice_id))).scalar_one_or_none()
+            if not doc:
+                return None
+            document_type, fk = 'customer_invoice', Payment.customer_invoice_id
+            paid = Decimal(str(doc.amount_paid or 0))
+
+        stmt = select(Payment).where(fk == doc.id).order_by(Payment.payment_date, Payment.id)
+        payments = (await self.session.execute(stmt)).scalars().all()
+        total = Decimal(str(doc.total_amount or 0))
+        return DocumentPaymentsResponse(
+            document_type=document_type,
+            document_id=doc.id,
+            document_status=doc.status,
+            total_amount=total,
+            paid_amount=paid,
+            pending_amount=sum((Decimal(str(p.amount)) for p in payments if p.status == 'draft'), Decimal(0)),
+            outstanding_amount=max(total - paid, Decimal(0)),
+            payments=[PaymentResponse.model_validate(p) for p in payments],
+        )
+
     async def create_payment(self, payload: PaymentCreate) -> PaymentResponse:
         """Create a draft (pending) payment record.
 
@@ -97,21 +166,29 @@ class PaymentService:
             return None
         original_status = payment.status
         new_status = payload.status or payment.status
+        impacted = False
         # Only process if status actually changes
         if new_status != original_status:
             # Transition draft -> posted: apply financial impact
             if original_status == 'draft' and new_status == 'posted':
                 await self._apply_financial_impact(payment)
                 payment.status = 'posted'
+                impacted = True
             # Transition posted -> cancelled: reverse financial impact
             elif original_status == 'posted' and new_status == 'cancelled':
                 await self._reverse_financial_impact(payment)
                 payment.status = 'cancelled'
+                impacted = True
             # Other transitions just set (e.g., draft -> cancelled)
             else:
                 payment.status = new_status
         payment.updated_at = datetime.utcnow()
+        if impacted:
+            await bump_cache_version(self.session, DASHBOARD_VERSION_KEY)
+            await event_bus.emit(self.session, 'payment', self._dashboard_delta(payment))
         await self.session.commit()
+        if impacted:
+            dashboard_cache.invalidate()
         await self.session.refresh(payment)
         return PaymentResponse.model_validate(payment)
 
@@ -143,6 +220,10 @@ class PaymentService:
             inv.amount_paid = (inv.amount_paid or 0) + payment.amount
             if float(inv.amount_paid) >= float(inv.total_amount):
                 inv.status = 'paid'
+                await event_bus.emit(self.session, 'invoice', {
+                    "document_type": 'customer_invoice', "id": str(inv.id), "status": inv.status,
+                })
+        await record_payment(self.session, payment, 1)
 
     async def _reverse_financial_impact(self, payment: Payment):
         """Reverse previously applied impact when a posted payment is cancelled."""
@@ -160,3 +241,20 @@ class PaymentService:
                 # If it was marked paid and now outstanding, revert to posted
                 if float(inv.amount_paid) < float(inv.total_amount) and inv.status == 'paid':
                     inv.status = 'posted'
+                    await event_bus.emit(self.session, 'invoice', {
+                        "document_type": 'customer_invoice', "id": str(inv.id), "status": inv.status,
+                    })
+        await record_payment(self.session, payment, -1)
+
+    @staticmethod
+    def _dashboard_delta(payment: Payment) -> dict:
+        """What a post (or cancel) adds to (or takes off) the dashboard, for live subscribers."""
+        amount = float(payment.amount) if payment.status == 'posted' else -float(payment.amount)
+        return {
+            "payment_id": str(payment.id),
+            "status": payment.status,
+            "partner_type": payment.partner_type,
+            "month": payment.payment_date.strftime('%Y-%m'),
+            "sales": amount if payment.partner_type == 'customer' else 0.0,
+            "purchases": amount if payment.partner_type == 'vendor' else 0.0,
+        }
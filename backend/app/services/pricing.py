@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+from operator import add
+from typing import Iterable, Iterator, Sequence
+
+import numpy as np
+
+
+MINOR_UNITS = 100  # cents per currency unit (amounts are Numeric(_, 2))
+RATE_UNITS = 100  # tax percents are carried in hundredths of a percent (Numeric(5, 2))
+_TAX_DIVISOR = 100 * RATE_UNITS  # minor units * rate units -> minor units
+
+CENT = Decimal(1) / MINOR_UNITS
+_INT64_MAX = np.iinfo(np.int64).max
+# float64 scaling is exact enough to recognise whole minor units below 2**53 / 1000
+_FAST_LIMIT = 2 ** 53 / 1000
+_FAST_TOLERANCE = 1e-3
+
+
+def _to_decimal(value) -> Decimal:
+    if isinstance(value, Decimal):
+        return value
+    # str() keeps the value as entered (0.1, not 0.1000000000000000055...)
+    return Decimal(str(value))
+
+
+def to_minor(values: Iterable, units: int = MINOR_UNITS) -> np.ndarray:
+    """Scale amounts to integers, rounding half away from zero (Decimal ROUND_HALF_UP).
+
+    Values that already have at most ``units`` precision (every stored Numeric(_, 2)
+    amount) land within float error of an integer after scaling and are converted in
+    array form; only the rest go through Decimal.
+    """
+    values = values if isinstance(values, (list, tuple)) else list(values)
+    scaled = np.fromiter(map(float, values), dtype=np.float64, count=len(values)) * units
+    rounded = np.rint(scaled)
+    exact = (np.abs(scaled - rounded) < _FAST_TOLERANCE) & (np.abs(scaled) < _FAST_LIMIT)
+    out = rounded.astype(np.int64)
+    scale = Decimal(units)
+    for i in np.flatnonzero(~exact):
+        out[i] = int((_to_decimal(values[i]) * scale).quantize(Decimal(1), ROUND_HALF_UP))
+    return out
+
+
+def from_minor(values: np.ndarray) -> list[Decimal]:
+    """Convert a column of minor units back to Decimal amounts with two places."""
+    # multiplying by CENT is exact and sets the exponent; map keeps the loop in C
+    return list(map(CENT.__mul__, map(Decimal, values.tolist())))
+
+
+def _div_half_up(numerator: np.ndarray, divisor: int) -> np.ndarray:
+    """Integer division rounding half away from zero, exactly like ``Decimal.quantize``."""
+    return np.sign(numerator) * ((np.abs(numerator) + divisor // 2) // divisor)
+
+
+@dataclass
+class PricedBatch:
+    """Line and document amounts for a batch, all in integer minor units."""
+    untaxed: np.ndarray
+    tax: np.ndarray
+    total: np.ndarray
+    doc_untaxed: np.ndarray
+    doc_tax: np.ndarray
+    doc_total: np.ndarray
+
+    def line_amounts(self) -> tuple[list[Decimal], list[Decimal], list[Decimal]]:
+        """Per-line (untaxed, tax, total) as Decimal columns."""
+        untaxed, tax = from_minor(self.untaxed), from_minor(self.tax)
+        # adding the converted columns is exact and cheaper than converting ``total``
+        return untaxed, tax, list(map(add, untaxed, tax))
+
+    def document_amounts(self) -> Iterator[tuple[Decimal, Decimal, Decimal]]:
+        """Per-document (total_untaxed, total_tax, total_amount) as Decimals."""
+        return zip(from_minor(self.doc_untaxed), from_minor(self.doc_tax), from_minor(self.doc_total))
+
+
+def price_batch(
+    quantities: Sequence[int],
+    unit_prices: Sequence,
+    tax_percents: Sequence,
+    doc_index: Sequence[int] | None = None,
+    n_docs: int = 1,
+) -> PricedBatch:
+    """Price many lines (of one or many documents) at once.
+
+    Per line: ``untaxed = quantity * unit_price`` and ``tax = untaxed * percent / 100``
+    rounded half-up to the cent; header totals are the sums of the rounded line
+    amounts. ``doc_index[i]`` names the document (0..n_docs-1) line ``i`` belongs to;
+    omit it for a single document. Unit prices and percents are first rounded to the
+    two places their columns store, which makes every result identical to
+    ``price_line_decimal``.
+    """
+    qty = np.asarray(quantities, dtype=np.int64)
+    price = to_minor(unit_prices)
+    rate = to_minor(tax_percents, RATE_UNITS)
+
+    # largest intermediate is untaxed * rate (+ rounding half); check it before multiplying
+    peak = 1
+    for arr in (qty, price, rate):
+        peak *= max(int(np.abs(arr).max(initial=0)), 1)
+    if peak + _TAX_DIVISOR > _INT64_MAX:
+        # beyond int64: same arithmetic on Python ints (object arrays), still exact
+        qty, price, rate = qty.astype(object), price.astype(object), rate.astype(object)
+    untaxed = qty * price
+    tax = _div_half_up(untaxed * rate, _TAX_DIVISOR)
+    total = untaxed + tax
+
+    if doc_index is None:
+        doc_index = np.zeros(len(qty), dtype=np.intp)
+    else:
+        doc_index = np.asarray(doc_index, dtype=np.intp)
+    sums = []
+    for amounts in (untaxed, tax, total):
+        out = np.zeros(n_docs, dtype=amounts.dtype)
+        np.add.at(out, doc_index, amounts)
+        sums.append(out)
+    return PricedBatch(untaxed, tax, total, *sums)
+
+
+def price_line_decimal(quantity, unit_price, tax_percent) -> tuple[Decimal, Decimal, Decimal]:
+    """Reference implementation of the line formula in plain Decimal arithmetic."""
+    price = _to_decimal(unit_price).quantize(CENT, ROUND_HALF_UP)
+    percent = _to_decimal(tax_percent).quantize(Decimal(1) / RATE_UNITS, ROUND_HALF_UP)
+    untaxed = Decimal(quantity) * price
+    tax = (untaxed * percent / 100).quantize(CENT, ROUND_HALF_UP)
+    return untaxed, tax, untaxed + tax
@@ -0,0 +1,140 @@
+import re
+from bisect import bisect_left, insort
+from decimal import Decimal
+from typing import Iterator, Literal, NamedTuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import VersionedRegistry
+from models.models import Product
+
+
+AutocompleteField = Literal['name', 'hsn_code', 'any']
+
+_WORD_START = re.compile(r"(?<![0-9a-z])[0-9a-z]")
+
+
+class ProductEntry(NamedTuple):
+    id: UUID
+    name: str
+    hsn_code: str | None
+    type: str
+    sales_price: Decimal
+    purchase_price: Decimal
+    tax_name: str | None
+
+
+def _name_keys(name: str) -> set[str]:
+    """The lowercased name from each word start, so 'Blue Cotton Shirt' is found by 'cot' too."""
+    lowered = name.lower()
+    return {lowered} | {lowered[m.start():] for m in _WORD_START.finditer(lowered)}
+
+
+class _SortedPrefixIndex:
+    """Sorted (key, id) pairs; a prefix query is a bisect plus a walk over the matching run."""
+
+    def __init__(self):
+        self._pairs: list[tuple[str, UUID]] = []
+
+    def build(self, pairs: list[tuple[str, UUID]]) -> None:
+        self._pairs = sorted(pairs)
+
+    def add(self, key: str, product_id: UUID) -> None:
+        insort(self._pairs, (key, product_id))
+
+    def remove(self, key: str, product_id: UUID) -> None:
+        i = bisect_left(self._pairs, (key, product_id))
+        if i < len(self._pairs) and self._pairs[i] == (key, product_id):
+            del self._pairs[i]
+
+    def matches(self, prefix: str) -> Iterator[UUID]:
+        i = bisect_left(self._pairs, (prefix,))
+        while i < len(self._pairs) and self._pairs[i][0].startswith(prefix):
+            yield self._pairs[i][1]
+            i += 1
+
+
+class ProductAutocomplete(VersionedRegistry):
+    """In-memory prefix index over product names and HSN codes for type-ahead.
+
+    Loaded once per worker; this worker's own product writes are patched in through
+    ``apply_write`` and other workers' writes trigger a reload on the next version check.
+    """
+
+    version_key = "products"
+
+    def __init__(self):
+        super().__init__()
+        self._products: dict[UUID, ProductEntry] = {}
+        self._names = _SortedPrefixIndex()
+        self._hsn_codes = _SortedPrefixIndex()
+
+    async def _load(self, session: AsyncSession) -> None:
+        res = await session.execute(select(
+            Product.id, Product.name, Product.hsn_code, Product.type,
+            Product.sales_price, Product.purchase_price, Product.tax_name,
+        ))
+        products = {row.id: ProductEntry(*row) for row in res}
+        names, hsn_codes = _SortedPrefixIndex(), _SortedPrefixIndex()
+        names.build([(key, p.id) for p in products.values() for key in _name_keys(p.name)])
+        hsn_codes.build([(p.hsn_code.lower(), p.id) for p in products.values() if p.hsn_code])
+        self._products, self._names, self._hsn_codes = products, names, hsn_codes
+
+    def _put(self, product: ProductEntry) -> None:
+        self._drop(product.id)
+        self._products[product.id] = product
+        for key in _name_keys(product.name):
+            self._names.add(key, product.id)
+        if product.hsn_code:
+            self._hsn_codes.add(product.hsn_code.lower(), product.id)
+
+    def _drop(self, product_id: UUID) -> None:
+        old = self._products.pop(product_id, None)
+        if old is None:
+            return
+        for key in _name_keys(old.name):
+            self._names.remove(key, product_id)
+        if old.hsn_code:
+            self._hsn_codes.remove(old.hsn_code.lower(), product_id)
+
+    async def product_saved(self, version: int, product: Product) -> None:
+        """Reflect a created or updated product; call after commit with the bumped version."""
+        entry = ProductEntry(
+            product.id, product.name, product.hsn_code, product.type,
+            product.sales_price, product.purchase_price, product.tax_name,
+        )
+        await self.apply_write(version, lambda: self._put(entry))
+
+    async def product_deleted(self, version: int, product_id: UUID) -> None:
+        await self.apply_write(version, lambda: self._drop(product_id))
+
+    def suggest(self, q: str, limit: int, field: AutocompleteField = 'any') -> list[ProductEntry]:
+        """Products whose name (any word) or HSN code starts with ``q``. Call ``ensure_fresh`` first.
+
+        Whole-name matches come before word matches, then HSN code matches; each group
+        is in key order.
+        """
+        prefix = q.strip().lower()
+        if not prefix:
+            return []
+        found: dict[UUID, None] = {}  # insertion-ordered set
+
+        def take(ids: Iterator[UUID]) -> bool:
+            for product_id in ids:
+                found.setdefault(product_id)
+                if len(found) >= limit:
+                    return True
+            return False
+
+        if field in ('name', 'any'):
+            whole = (i for i in self._names.matches(prefix) if self._products[i].name.lower().startswith(prefix))
+            if take(whole) or take(self._names.matches(prefix)):
+                return [self._products[i] for i in found]
+        if field in ('hsn_code', 'any'):
+            take(self._hsn_codes.matches(prefix))
+        return [self._products[i] for i in found]
+
+
+product_autocomplete = ProductAutocomplete()
@@ -5,9 +5,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from uuid import UUID
 
-from repositories.product_repository import ProductRepository
+from core.cache import DASHBOARD_VERSION_KEY, bump_cache_version
+from repositories.product_repository import ProductRepository, product_cache
 from schemas.schemas import ProductCreate, ProductUpdate, Product as ProductSchema, HSNResponse
-from models.models import Product, Tax
+from models.models import Product
+from services.dashboard_cache import dashboard_cache
+from services.product_autocomplete import product_autocomplete
+from services.tax_registry import tax_registry
 
 
 class ProductService:
@@ -16,13 +20,19 @@ class ProductService:
         self.session = session
 
     async def list_products(self):
-        products = await self.repo.list()
-        return [await self._enrich_with_tax(p) for p in products]
+        # tax percents are joined in by the query; rows validate straight into the schema
+        rows = await self.repo.list_with_tax_percents()
+        return [ProductSchema.model_validate(row) for row in rows]
 
     async def create_product(self, payload: ProductCreate) -> ProductSchema:
         data = payload.model_dump()
         product = await self.repo.create(**data)
+        version = await bump_cache_version(self.session, product_cache.version_key)
+        await bump_cache_version(self.session, DASHBOARD_VERSION_KEY)
         await self.session.commit()
+        product_cache.invalidate()
+        dashboard_cache.invalidate()
+        await product_autocomplete.product_saved(version, product)
         return await self._enrich_with_tax(product)
 
     async def hsn_search(self, query: str, mode: Literal['byCode', 'byDesc'] = 'byCode', category: str | None = None) -> HSNResponse:
@@ -49,7 +59,16 @@ class ProductService:
             raise httpx.HTTPStatusError("Not Found", request=None, response=type("Resp", (), {"status_code": 404})())
         data = payload.model_dump(exclude_unset=True)
         product = await self.repo.update(product, **data)
+        version = await bump_cache_version(self.session, product_cache.version_key)
+        # only stock feeds the dashboard
+        stock_changed = 'current_stock' in data
+        if stock_changed:
+            await bump_cache_version(self.session, DASHBOARD_VERSION_KEY)
         await self.session.commit()
+        product_cache.invalidate()
+        if stock_changed:
+            dashboard_cache.invalidate()
+        await product_autocomplete.product_saved(version, product)
         return await self._enrich_with_tax(product)
 
     async def delete_product(self, product_id: UUID) -> None:
@@ -57,33 +76,25 @@ class ProductService:
         if not product:
             raise httpx.HTTPStatusError("Not Found", request=None, response=type("Resp", (), {"status_code": 404})())
         await self.repo.delete(product)
+        version = await bump_cache_version(self.session, product_cache.version_key)
+        await bump_cache_version(self.session, DASHBOARD_VERSION_KEY)
         await self.session.commit()
+        product_cache.invalidate()
+        dashboard_cache.invalidate()
+        await product_autocomplete.product_deleted(version, product.id)
 
     async def _enrich_with_tax(self, product: Product) -> ProductSchema:
         """Attach dynamic sales/purchase tax percent values based on tax_name.
         Strategy:
           - If product.tax_name is null -> both percents = 0
-          - Query taxes where name = tax_name.
+          - Look up tax_name in the in-memory tax registry (no query per product).
           - A tax may be applicable to sales, purchase, or both via flags.
-          - If multiple rows (unlikely), combine: pick one marked sales for sales, one purchase for purchase.
         """
-        sales_percent = 0.0
-        purchase_percent = 0.0
-        if product.tax_name:
-            res = await self.session.execute(
-                select(Tax).where(Tax.name == product.tax_name)
-            )
-            rows = res.scalars().all()
-            for t in rows:
-                # Original Tax model has 'value' or 'rate_percent'? Check attribute gracefully.
-                rate = getattr(t, 'value', None)
-                if rate is None:
-                    rate = getattr(t, 'rate_percent', 0)
-                rate_f = float(rate)
-                if getattr(t, 'is_applicable_on_sales', False):
-                    sales_percent = rate_f
-                if getattr(t, 'is_applicable_on_purchase', False):
-                    purchase_percent = rate_f
+        await tax_registry.ensure_fresh(self.session)
+        sales_tax = tax_registry.lookup(product.tax_name, 'sales')
+        purchase_tax = tax_registry.lookup(product.tax_name, 'purchase')
+        sales_percent = float(sales_tax.value) if sales_tax else 0.0
+        purchase_percent = float(purchase_tax.value) if purchase_tax else 0.0
         schema_obj = ProductSchema.model_validate(product, from_attributes=True)
         # Dynamically attach computed fields (they exist in frontend expectation but not persisted)
         # If schema lacks these fields, we can patch via dict since response_model can ignore extras.
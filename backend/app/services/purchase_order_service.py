@@ -1,17 +1,58 @@
 from uuid import uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from models.models import Product, PurchaseOrder, PurchaseOrderLine, Tax
-from schemas.schemas import PurchaseOrderCreate, PurchaseOrderResponse, PurchaseOrderUpdate
+from sqlalchemy.orm import noload
+from core.counting import CountMode, count_rows
+from core.filters import FilterSpec, ListFilters, apply_filters, sort_keys
+from core.pagination import Page, keyset_paginate
+from models.models import PurchaseOrder, PurchaseOrderLine
+from schemas.schemas import PurchaseOrderCreate, PurchaseOrderResponse, PurchaseOrderSummary, PurchaseOrderUpdate
+from services.line_diff import apply_line_changes
+from services.line_resolver import LineResolver, PricedLine, document_totals
+
+
+# sort keys must be non-null: they double as the keyset pagination cursor
+LIST_FILTERS = FilterSpec(
+    id=PurchaseOrder.id,
+    status=PurchaseOrder.status,
+    party=PurchaseOrder.vendor_name,
+    date=PurchaseOrder.created_at,
+    amount=PurchaseOrder.total_amount,
+    sorts={
+        'created_at': PurchaseOrder.created_at,
+        'updated_at': PurchaseOrder.updated_at,
+        'total_amount': PurchaseOrder.total_amount,
+        'po_number': PurchaseOrder.po_number,
+    },
+)
+
 
 class PurchaseOrderService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def list_orders(self):
-        stmt = select(PurchaseOrder).order_by(PurchaseOrder.created_at.desc())
-        result = (await self.session.execute(stmt)).scalars().unique().all()
-        return [PurchaseOrderResponse.model_validate(o) for o in result]
+    async def list_orders(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        include_lines: bool = False,
+        filters: ListFilters | None = None,
+        count: CountMode = 'none',
+    ) -> Page[PurchaseOrderSummary] | Page[PurchaseOrderResponse]:
+        """One page of orders matching ``filters``, newest first by default.
+
+        Pages are keyed on (sort column, id). Lines are only loaded (and returned)
+        when ``include_lines`` is set. ``count`` selects how ``Page.total`` is computed.
+        """
+        filters = filters or ListFilters()
+        stmt = apply_filters(select(PurchaseOrder), LIST_FILTERS, filters)
+        if not include_lines:
+            stmt = stmt.options(noload(PurchaseOrder.lines))
+        keys, descending, scope = sort_keys(LIST_FILTERS, filters)
+        page = await keyset_paginate(self.session, stmt, keys, limit, cursor, descending, scope)
+        total = await count_rows(self.session, stmt, count)
+        schema = PurchaseOrderResponse if include_lines else PurchaseOrderSummary
+        return Page([schema.model_validate(o) for o in page.items], page.next_cursor, total)
 
     async def get_order(self, order_id):
         stmt = select(PurchaseOrder).where(PurchaseOrder.id == order_id)
@@ -26,60 +67,21 @@ class PurchaseOrderService:
         self.session.add(order)
         await self.session.flush()
 
-        total_untaxed = 0.0
-        total_tax = 0.0
-
-        for line_in in payload.lines:
-            product = None
-            if getattr(line_in, 'product_id', None):
-                stmt = select(Product).where(Product.id == line_in.product_id)
-                product = (await self.session.execute(stmt)).scalar_one_or_none()
-            if not product:
-                stmt = select(Product).where(Product.name == line_in.product_name)
-                product = (await self.session.execute(stmt)).scalar_one_or_none()
-            if not product:
-                raise ValueError(f"Product '{line_in.product_name}' not found")
-
-            tax_percent = 0.0
-            if product.tax_name:
-                tax_stmt = select(Tax).where(
-                    Tax.name == product.tax_name,
-                    Tax.is_applicable_on_purchase == True
-                )
-                tax_row = (await self.session.execute(tax_stmt)).scalar_one_or_none()
-                if tax_row and tax_row.computation_method == 'percentage':
-                    tax_percent = float(tax_row.value)
-
-            untaxed = line_in.quantity * line_in.unit_price
-            tax_amount = round(float(untaxed) * (tax_percent / 100), 2)
-            total = untaxed + tax_amount
-
-            total_untaxed += untaxed
-            total_tax += tax_amount
-
-            line = PurchaseOrderLine(
-                purchase_order_id=order.id,
-                product_id=product.id,
-                product_name=product.name,
-                quantity=line_in.quantity,
-                unit_price=line_in.unit_price,
-                tax_percent=tax_percent,
-                untaxed_amount=untaxed,
-                tax_amount=tax_amount,
-                total_amount=total,
-            )
-            self.session.add(line)
+        priced = await LineResolver(self.session, 'purchase').price_lines(payload.lines)
+        self.session.add_all(self._build_lines(order, priced))
+        total_untaxed, total_tax, total_amount = document_totals(priced)
 
         order.total_untaxed = total_untaxed
         order.total_tax = total_tax
-        order.total_amount = total_untaxed + total_tax
+        order.total_amount = total_amount
 
         await self.session.commit()
         await self.session.refresh(order)
         return PurchaseOrderResponse.model_validate(order)
 
     async def update_order(self, order_id, payload: PurchaseOrderUpdate):
-        stmt = select(PurchaseOrder).where(PurchaseOrder.id == order_id)
+        # lines are diffed with narrow queries, so skip loading the collection
+        stmt = select(PurchaseOrder).options(noload(PurchaseOrder.lines)).where(PurchaseOrder.id == order_id)
         order = (await self.session.execute(stmt)).scalar_one_or_none()
         if not order:
             return None
@@ -90,62 +92,34 @@ class PurchaseOrderService:
             order.vendor_name = payload.vendor_name
 
         if payload.lines is not None:
-            existing_lines_stmt = select(PurchaseOrderLine).where(PurchaseOrderLine.purchase_order_id == order.id)
-            existing_lines = (await self.session.execute(existing_lines_stmt)).scalars().all()
-            for l in existing_lines:
-                await self.session.delete(l)
-
-            total_untaxed = 0.0
-            total_tax = 0.0
-            for line_in in payload.lines:
-                product = None
-                if getattr(line_in, 'product_id', None):
-                    stmt_prod = select(Product).where(Product.id == line_in.product_id)
-                    product = (await self.session.execute(stmt_prod)).scalar_one_or_none()
-                if not product:
-                    stmt_prod = select(Product).where(Product.name == line_in.product_name)
-                    product = (await self.session.execute(stmt_prod)).scalar_one_or_none()
-                if not product:
-                    raise ValueError(f"Product '{line_in.product_name}' not found")
-
-                tax_percent = 0.0
-                if product.tax_name:
-                    tax_stmt = select(Tax).where(
-                        Tax.name == product.tax_name,
-                        Tax.is_applicable_on_purchase == True
-                    )
-                    tax_row = (await self.session.execute(tax_stmt)).scalar_one_or_none()
-                    if tax_row and tax_row.computation_method == 'percentage':
-                        tax_percent = float(tax_row.value)
-
-                untaxed = line_in.quantity * line_in.unit_price
-                tax_amount = round(float(untaxed) * (tax_percent / 100), 2)
-                total = untaxed + tax_amount
-
-                total_untaxed += untaxed
-                total_tax += tax_amount
-
-                new_line = PurchaseOrderLine(
-                    purchase_order_id=order.id,
-                    product_id=product.id,
-                    product_name=product.name,
-                    quantity=line_in.quantity,
-                    unit_price=line_in.unit_price,
-                    tax_percent=tax_percent,
-                    untaxed_amount=untaxed,
-                    tax_amount=tax_amount,
-                    total_amount=total,
-                )
-                self.session.add(new_line)
-
-            order.total_untaxed = total_untaxed
-            order.total_tax = total_tax
-            order.total_amount = total_untaxed + total_tax
+            priced = await LineResolver(self.session, 'purchase').price_lines(payload.lines)
+            changes = await apply_line_changes(
+                self.session, PurchaseOrderLine, PurchaseOrderLine.purchase_order_id, order.id, priced, self._line_values
+            )
+            changes.apply_to(order)
 
         await self.session.commit()
-        await self.session.refresh(order)
+        # lines were written with bulk statements; reload them for the response
+        stmt = select(PurchaseOrder).where(PurchaseOrder.id == order.id).execution_options(populate_existing=True)
+        order = (await self.session.execute(stmt)).scalar_one()
         return PurchaseOrderResponse.model_validate(order)
 
+    @staticmethod
+    def _line_values(p: PricedLine) -> dict:
+        return dict(
+            product_id=p.product.id,
+            product_name=p.product.name,
+            quantity=p.quantity,
+            unit_price=p.unit_price,
+            tax_percent=p.tax_percent,
+            untaxed_amount=p.untaxed_amount,
+            tax_amount=p.tax_amount,
+            total_amount=p.total_amount,
+        )
+
+    def _build_lines(self, order: PurchaseOrder, priced: list[PricedLine]) -> list[PurchaseOrderLine]:
+        return [PurchaseOrderLine(purchase_order_id=order.id, **self._line_values(p)) for p in priced]
+
     async def delete_order(self, order_id):
         stmt = select(PurchaseOrder).where(PurchaseOrder.id == order_id)
         order = (await self.session.execute(stmt)).scalar_one_or_none()
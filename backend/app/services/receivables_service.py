@@ -0,0 +1,88 @@
+from datetime import date
+from decimal import Decimal
+from typing import AsyncIterator
+
+from sqlalchemy import Date, Select, case, func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.streaming import STREAM_BATCH_SIZE
+from models.models import CustomerInvoice
+from schemas.schemas import AgedReceivablesResponse, AgedReceivablesRow
+
+
+# aging buckets as inclusive (first, last) days past due; None leaves the end open
+AGING_BUCKETS = {
+    'days_1_30': (1, 30),
+    'days_31_60': (31, 60),
+    'days_61_90': (61, 90),
+    'days_90_plus': (91, None),
+}
+
+
+class ReceivablesService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _days_overdue(self, as_of: date):
+        """Whole days between the invoice due date and ``as_of`` (negative before it is due)."""
+        due = CustomerInvoice.due_date
+        if self.session.bind.dialect.name == "postgresql":
+            return literal(as_of, Date) - due
+        return func.julianday(literal(as_of.isoformat())) - func.julianday(due)
+
+    def _aged_receivables_stmt(self, as_of: date) -> Select:
+        """One row per customer with its open balance in each aging bucket.
+
+        Reads posted invoices issued on or before ``as_of`` through the
+        (status, due_date) index. Paid amounts are the current ones, so an as-of date
+        in the past ages today's balances rather than replaying payments.
+        """
+        inv = CustomerInvoice
+        outstanding = inv.total_amount - inv.amount_paid
+        days = self._days_overdue(as_of)
+
+        def bucket(condition):
+            return func.coalesce(func.sum(case((condition, outstanding), else_=0)), 0)
+
+        buckets = [bucket(or_(inv.due_date.is_(None), days <= 0)).label('current')]
+        for name, (first, last) in AGING_BUCKETS.items():
+            condition = days >= first if last is None else days.between(first, last)
+            buckets.append(bucket(condition).label(name))
+
+        return (
+            select(
+                inv.customer_id,
+                inv.customer_name,
+                func.count().label('invoice_count'),
+                *buckets,
+                func.sum(outstanding).label('total'),
+            )
+            .where(
+                inv.status == 'posted',
+                outstanding > 0,
+                or_(inv.invoice_date.is_(None), inv.invoice_date <= as_of),
+            )
+            .group_by(inv.customer_id, inv.customer_name)
+            .order_by(inv.customer_name, inv.customer_id)
+        )
+
+    async def aged_receivables(self, as_of: date) -> AgedReceivablesResponse:
+        rows = [
+            AgedReceivablesRow.model_validate(row._mapping)
+            for row in await self.session.execute(self._aged_receivables_stmt(as_of))
+        ]
+        amounts = ['current', *AGING_BUCKETS, 'total']
+        totals = {
+            name: float(sum((Decimal(str(getattr(r, name))) for r in rows), Decimal(0))) for name in amounts
+        }
+        return AgedReceivablesResponse(
+            as_of=as_of,
+            customers=rows,
+            totals=AgedReceivablesRow(invoice_count=sum(r.invoice_count for r in rows), **totals),
+        )
+
+    async def stream_aged_receivables(self, as_of: date) -> AsyncIterator[AgedReceivablesRow]:
+        """Per-customer rows of the report, read through a server-side cursor in batches."""
+        stmt = self._aged_receivables_stmt(as_of).execution_options(yield_per=STREAM_BATCH_SIZE)
+        async for row in await self.session.stream(stmt):
+            yield AgedReceivablesRow.model_validate(row._mapping)
@@ -1,19 +1,66 @@
 from uuid import uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from models.models import Product, SalesOrder, SalesOrderLine, Tax, Contact
-from schemas.schemas import SalesOrderCreate, SalesOrderResponse, SalesOrderUpdate
+from sqlalchemy import insert, select
+from sqlalchemy.orm import noload
+from core.counting import CountMode, count_rows
+from core.filters import FilterSpec, ListFilters, apply_filters, sort_keys
+from core.pagination import Page, keyset_paginate
+from models.models import SalesOrder, SalesOrderLine, Contact
+from schemas.schemas import (
+    SalesOrderCreate,
+    SalesOrderResponse,
+    SalesOrderSummary,
+    SalesOrderUpdate,
+    SalesOrderBulkResult,
+    SalesOrderBulkResponse,
+)
+from services.line_diff import apply_line_changes
+from services.line_resolver import LineResolver, PricedLine, document_totals
+
+
+# sort keys must be non-null: they double as the keyset pagination cursor
+LIST_FILTERS = FilterSpec(
+    id=SalesOrder.id,
+    status=SalesOrder.status,
+    party=SalesOrder.customer_name,
+    party_id=SalesOrder.customer_id,
+    date=SalesOrder.created_at,
+    amount=SalesOrder.total_amount,
+    sorts={
+        'created_at': SalesOrder.created_at,
+        'updated_at': SalesOrder.updated_at,
+        'total_amount': SalesOrder.total_amount,
+        'so_number': SalesOrder.so_number,
+    },
+)
 
 
 class SalesOrderService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def list_orders(self):
-        stmt = select(SalesOrder).order_by(SalesOrder.created_at.desc())
-        result = (await self.session.execute(stmt)).scalars().unique().all()
-        # Ensure lines are loaded (relationship is selectin, so already fetched)
-        return [SalesOrderResponse.model_validate(o) for o in result]
+    async def list_orders(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        include_lines: bool = False,
+        filters: ListFilters | None = None,
+        count: CountMode = 'none',
+    ) -> Page[SalesOrderSummary] | Page[SalesOrderResponse]:
+        """One page of orders matching ``filters``, newest first by default.
+
+        Pages are keyed on (sort column, id). Lines are only loaded (and returned)
+        when ``include_lines`` is set. ``count`` selects how ``Page.total`` is computed.
+        """
+        filters = filters or ListFilters()
+        stmt = apply_filters(select(SalesOrder), LIST_FILTERS, filters)
+        if not include_lines:
+            stmt = stmt.options(noload(SalesOrder.lines))
+        keys, descending, scope = sort_keys(LIST_FILTERS, filters)
+        page = await keyset_paginate(self.session, stmt, keys, limit, cursor, descending, scope)
+        total = await count_rows(self.session, stmt, count)
+        schema = SalesOrderResponse if include_lines else SalesOrderSummary
+        return Page([schema.model_validate(o) for o in page.items], page.next_cursor, total)
 
     async def get_order(self, order_id):
         stmt = select(SalesOrder).where(SalesOrder.id == order_id)
@@ -35,63 +82,92 @@ class SalesOrderService:
         self.session.add(order)
         await self.session.flush()  # get order id
 
-        total_untaxed = 0
-        total_tax = 0
-
-        for line_in in payload.lines:
-            # Prefer product_id for lookup if supplied, otherwise fallback to name
-            product = None
-            if getattr(line_in, 'product_id', None):
-                stmt = select(Product).where(Product.id == line_in.product_id)
-                product = (await self.session.execute(stmt)).scalar_one_or_none()
-            if not product:
-                stmt = select(Product).where(Product.name == line_in.product_name)
-                product = (await self.session.execute(stmt)).scalar_one_or_none()
-            if not product:
-                raise ValueError(f"Product '{line_in.product_name}' not found")
-
-            # Derive tax percent by looking up the tax record referenced by product.tax_name
-            tax_percent = 0.0
-            if product.tax_name:
-                tax_stmt = select(Tax).where(
-                    Tax.name == product.tax_name,
-                    Tax.is_applicable_on_sales == True
-                )
-                tax_row = (await self.session.execute(tax_stmt)).scalar_one_or_none()
-                if tax_row and tax_row.computation_method == 'percentage':
-                    tax_percent = float(tax_row.value)
-
-            # Untaxed amount = qty * unit price
-            untaxed = line_in.quantity * line_in.unit_price
-            tax_amount = round(float(untaxed) * (tax_percent / 100), 2)
-            total = untaxed + tax_amount
-
-            total_untaxed += untaxed
-            total_tax += tax_amount
-
-            line = SalesOrderLine(
-                sales_order_id=order.id,
-                product_id=product.id,
-                product_name=product.name,
-                quantity=line_in.quantity,
-                unit_price=line_in.unit_price,
-                tax_percent=tax_percent,
-                untaxed_amount=untaxed,
-                tax_amount=tax_amount,
-                total_amount=total,
-            )
-            self.session.add(line)
+        priced = await LineResolver(self.session, 'sales').price_lines(payload.lines)
+        self.session.add_all(self._build_lines(order, priced))
+        total_untaxed, total_tax, total_amount = document_totals(priced)
 
         order.total_untaxed = total_untaxed
         order.total_tax = total_tax
-        order.total_amount = total_untaxed + total_tax
+        order.total_amount = total_amount
 
         await self.session.commit()
         await self.session.refresh(order)
         return SalesOrderResponse.model_validate(order)
 
+    async def create_orders_bulk(self, payloads: list[SalesOrderCreate]) -> SalesOrderBulkResponse:
+        """Create many draft orders in one transaction.
+
+        Products, taxes and customer names are resolved once for the whole batch, and
+        headers and lines are written with one executemany INSERT each. An order whose
+        customer or lines cannot be resolved is reported as failed without affecting the
+        others.
+        """
+        resolver = LineResolver(self.session, 'sales')
+        await resolver.load(line for payload in payloads for line in payload.lines)
+
+        # every referenced customer is checked up front: an unknown id would otherwise
+        # fail the foreign key and roll back the whole batch
+        contact_ids = {p.customer_id for p in payloads if p.customer_id}
+        contact_names = {}
+        if contact_ids:
+            rows = await self.session.execute(select(Contact.id, Contact.name).where(Contact.id.in_(contact_ids)))
+            contact_names = dict(rows.all())
+
+        results: list[SalesOrderBulkResult | None] = [None] * len(payloads)
+        resolved: list[tuple[int, list]] = []
+        for index, payload in enumerate(payloads):
+            try:
+                if payload.customer_id and payload.customer_id not in contact_names:
+                    raise ValueError(f"Customer {payload.customer_id} not found")
+                resolved.append((index, [(line, resolver.product_for(line)) for line in payload.lines]))
+            except ValueError as e:
+                results[index] = SalesOrderBulkResult(index=index, success=False, error=str(e))
+
+        # price every resolvable order in one engine call
+        documents = resolver.price_documents([pairs for _, pairs in resolved])
+        headers: list[dict] = []
+        lines: list[dict] = []
+        for (index, _), doc in zip(resolved, documents):
+            payload = payloads[index]
+            order_id = uuid4()
+            so_number = str(uuid4())
+            headers.append(dict(
+                id=order_id,
+                so_number=so_number,
+                customer_id=payload.customer_id,
+                customer_name=payload.customer_name or contact_names.get(payload.customer_id),
+                total_untaxed=doc.total_untaxed,
+                total_tax=doc.total_tax,
+                total_amount=doc.total_amount,
+            ))
+            lines.extend(
+                dict(
+                    sales_order_id=order_id,
+                    product_id=product.id,
+                    product_name=product.name,
+                    quantity=line.quantity,
+                    unit_price=line.unit_price,
+                    tax_percent=percent,
+                    untaxed_amount=untaxed,
+                    tax_amount=tax,
+                    total_amount=total,
+                )
+                for (line, product), percent, untaxed, tax, total in doc.line_amounts()
+            )
+            results[index] = SalesOrderBulkResult(index=index, success=True, id=order_id, so_number=so_number)
+
+        if headers:
+            await self.session.execute(insert(SalesOrder), headers)
+        if lines:
+            await self.session.execute(insert(SalesOrderLine), lines)
+        await self.session.commit()
+
+        created = len(headers)
+        return SalesOrderBulkResponse(created=created, failed=len(payloads) - created, results=results)
+
     async def update_order(self, order_id, payload: SalesOrderUpdate):
-        stmt = select(SalesOrder).where(SalesOrder.id == order_id)
+        # lines are diffed with narrow queries, so skip loading the collection
+        stmt = select(SalesOrder).options(noload(SalesOrder.lines)).where(SalesOrder.id == order_id)
         order = (await self.session.execute(stmt)).scalar_one_or_none()
         if not order:
             return None
@@ -111,65 +187,36 @@ class SalesOrderService:
             # Allow overriding customer_name manually if provided
             order.customer_name = payload.customer_name
 
-        # If lines provided, replace all existing lines
+        # If lines provided, make the stored lines match them (only changed rows are written)
         if payload.lines is not None:
-            # delete existing lines
-            existing_lines_stmt = select(SalesOrderLine).where(SalesOrderLine.sales_order_id == order.id)
-            existing_lines = (await self.session.execute(existing_lines_stmt)).scalars().all()
-            for l in existing_lines:
-                await self.session.delete(l)
-
-            total_untaxed = 0
-            total_tax = 0
-            for line_in in payload.lines:
-                product = None
-                if getattr(line_in, 'product_id', None):
-                    stmt_prod = select(Product).where(Product.id == line_in.product_id)
-                    product = (await self.session.execute(stmt_prod)).scalar_one_or_none()
-                if not product:
-                    stmt_prod = select(Product).where(Product.name == line_in.product_name)
-                    product = (await self.session.execute(stmt_prod)).scalar_one_or_none()
-                if not product:
-                    raise ValueError(f"Product '{line_in.product_name}' not found")
-
-                tax_percent = 0.0
-                if product.tax_name:
-                    tax_stmt = select(Tax).where(
-                        Tax.name == product.tax_name,
-                        Tax.is_applicable_on_sales == True
-                    )
-                    tax_row = (await self.session.execute(tax_stmt)).scalar_one_or_none()
-                    if tax_row and tax_row.computation_method == 'percentage':
-                        tax_percent = float(tax_row.value)
-
-                untaxed = line_in.quantity * line_in.unit_price
-                tax_amount = round(float(untaxed) * (tax_percent / 100), 2)
-                total = untaxed + tax_amount
-
-                total_untaxed += untaxed
-                total_tax += tax_amount
-
-                new_line = SalesOrderLine(
-                    sales_order_id=order.id,
-                    product_id=product.id,
-                    product_name=product.name,
-                    quantity=line_in.quantity,
-                    unit_price=line_in.unit_price,
-                    tax_percent=tax_percent,
-                    untaxed_amount=untaxed,
-                    tax_amount=tax_amount,
-                    total_amount=total,
-                )
-                self.session.add(new_line)
-
-            order.total_untaxed = total_untaxed
-            order.total_tax = total_tax
-            order.total_amount = total_untaxed + total_tax
+            priced = await LineResolver(self.session, 'sales').price_lines(payload.lines)
+            changes = await apply_line_changes(
+                self.session, SalesOrderLine, SalesOrderLine.sales_order_id, order.id, priced, self._line_values
+            )
+            changes.apply_to(order)
 
         await self.session.commit()
-        await self.session.refresh(order)
+        # lines were written with bulk statements; reload them for the response
+        stmt = select(SalesOrder).where(SalesOrder.id == order.id).execution_options(populate_existing=True)
+        order = (await self.session.execute(stmt)).scalar_one()
         return SalesOrderResponse.model_validate(order)
 
+    @staticmethod
+    def _line_values(p: PricedLine) -> dict:
+        return dict(
+            product_id=p.product.id,
+            product_name=p.product.name,
+            quantity=p.quantity,
+            unit_price=p.unit_price,
+            tax_percent=p.tax_percent,
+            untaxed_amount=p.untaxed_amount,
+            tax_amount=p.tax_amount,
+            total_amount=p.total_amount,
+        )
+
+    def _build_lines(self, order: SalesOrder, priced: list[PricedLine]) -> list[SalesOrderLine]:
+        return [SalesOrderLine(sales_order_id=order.id, **self._line_values(p)) for p in priced]
+
     async def delete_order(self, order_id):
         stmt = select(SalesOrder).where(SalesOrder.id == order_id)
         order = (await self.session.execute(stmt)).scalar_one_or_none()
@@ -0,0 +1,247 @@
+from dataclasses import dataclass
+from functools import cache
+from typing import Any, Callable
+from uuid import UUID
+
+from sqlalchemy import BigInteger, Select, Table, Text, cast, event, func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from core.pagination import decode_cursor, encode_cursor
+from models.models import (
+    Contact, CustomerInvoice, Payment, Product, PurchaseOrder, SalesOrder, SyncChangeLog, Tax, VendorBill,
+)
+from repositories.product_repository import ProductRepository
+from schemas.schemas import (
+    ContactResponse, CustomerInvoiceResponse, PaymentResponse, Product as ProductSchema,
+    PurchaseOrderResponse, SalesOrderResponse, SyncChange, SyncChangesResponse, TaxResponse, VendorBillResponse,
+)
+
+
+CURSOR_SCOPE = "sync-log"
+
+# session.info key: {(entity, record id): op} written to the change log on commit
+_PENDING = "pending_sync_changes"
+
+
+@dataclass(frozen=True)
+class SyncEntity:
+    model: Any
+    # rows of this select are validated into ``schema``; ``scalars`` is False for column selects
+    select: Callable[[], Select]
+    schema: Any
+    scalars: bool = True
+
+
+SYNC_ENTITIES: dict[str, SyncEntity] = {
+    'contacts': SyncEntity(Contact, lambda: select(Contact), ContactResponse),
+    'products': SyncEntity(Product, ProductRepository.select_with_tax_percents, ProductSchema, scalars=False),
+    'taxes': SyncEntity(Tax, lambda: select(Tax), TaxResponse),
+    'sales_orders': SyncEntity(SalesOrder, lambda: select(SalesOrder), SalesOrderResponse),
+    'purchase_orders': SyncEntity(PurchaseOrder, lambda: select(PurchaseOrder), PurchaseOrderResponse),
+    'vendor_bills': SyncEntity(VendorBill, lambda: select(VendorBill), VendorBillResponse),
+    'customer_invoices': SyncEntity(CustomerInvoice, lambda: select(CustomerInvoice), CustomerInvoiceResponse),
+    'payments': SyncEntity(Payment, lambda: select(Payment), PaymentResponse),
+}
+
+_ENTITY_BY_MODEL = {entity.model: name for name, entity in SYNC_ENTITIES.items()}
+_ENTITY_BY_TABLE = {entity.model.__table__: name for name, entity in SYNC_ENTITIES.items()}
+
+
+def _as_bigint(xid8):
+    return cast(cast(xid8, Text), BigInteger)
+
+
+@cache
+def _fk_actions() -> dict[Table, list[tuple[Any, str, str]]]:
+    """Parent table -> (synced child FK column, entity, op) for every ON DELETE the database
+    applies to a synced table. Resolved on first use, once every model is mapped."""
+    actions: dict[Table, list[tuple[Any, str, str]]] = {}
+    for table, entity in _ENTITY_BY_TABLE.items():
+        for fk in table.foreign_keys:
+            op = {'CASCADE': 'delete', 'SET NULL': 'upsert'}.get((fk.ondelete or '').upper())
+            if op:
+                actions.setdefault(fk.column.table, []).append((fk.parent, entity, op))
+    return actions
+
+
+def record_change(session: Session | AsyncSession, entity: str, entity_id: UUID, op: str = 'upsert') -> None:
+    """Queue a change for the change log of the session's current transaction.
+
+    ORM writes and bulk inserts/updates/deletes of synced tables are recorded automatically by
+    the hooks below; call this only for writes that bypass both.
+    """
+    pending = session.info.setdefault(_PENDING, {})
+    # re-insert so the record is ordered by its latest change
+    pending.pop((entity, entity_id), None)
+    pending[(entity, entity_id)] = op
+
+
+def _record_fk_actions(session: Session, table: Table, ids: list) -> None:
+    """Record the synced rows the database will null or delete when ``ids`` of ``table`` go.
+
+    Must run before the delete: afterwards the referencing rows are gone or nulled.
+    """
+    actions = _fk_actions().get(table)
+    if not ids or not actions:
+        return
+    conn = session.connection()
+    for column, entity, op in actions:
+        child_ids = conn.execute(select(column.table.c.id).where(column.in_(ids))).scalars().all()
+        for child_id in child_ids:
+            record_change(session, entity, child_id, op)
+        if op == 'delete':
+            _record_fk_actions(session, column.table, child_ids)
+
+
+@event.listens_for(Session, "before_flush")
+def _record_deleting(session: Session, flush_context, instances) -> None:
+    for obj in session.deleted:
+        _record_fk_actions(session, type(obj).__table__, [obj.id])
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed(session: Session, flush_context) -> None:
+    for obj in session.new:
+        if type(obj) in _ENTITY_BY_MODEL:
+            record_change(session, _ENTITY_BY_MODEL[type(obj)], obj.id)
+    for obj in session.dirty:
+        if type(obj) in _ENTITY_BY_MODEL and session.is_modified(obj, include_collections=False):
+            record_change(session, _ENTITY_BY_MODEL[type(obj)], obj.id)
+    for obj in session.deleted:
+        if type(obj) in _ENTITY_BY_MODEL:
+            record_change(session, _ENTITY_BY_MODEL[type(obj)], obj.id, 'delete')
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_bulk(state) -> None:
+    """Record bulk ``insert`` / ``update`` / ``delete`` statements on synced tables.
+
+    Inserts must pass rows with their id. Updates by primary key take the ids from their
+    rows; other updates and deletes read the ids of the rows they match first, locking
+    them so the statement changes exactly those.
+    """
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    table = state.statement.table
+    entity = _ENTITY_BY_TABLE.get(table)
+    if entity is None and not (state.is_delete and table in _fk_actions()):
+        return
+    rows = state.parameters if isinstance(state.parameters, list) else [state.parameters or {}]
+    if all('id' in row for row in rows):
+        ids = [row['id'] for row in rows]
+    elif state.is_insert:
+        # the change log needs the ids of every written record
+        raise ValueError(f"Bulk inserts into synced table '{entity}' must pass rows with their id")
+    else:
+        matched = select(table.c.id).with_for_update()
+        if state.statement.whereclause is not None:
+            matched = matched.where(state.statement.whereclause)
+        ids = state.session.connection().execute(matched).scalars().all()
+    if state.is_delete:
+        _record_fk_actions(state.session, table, ids)
+    if entity is not None:
+        for record_id in ids:
+            record_change(state.session, entity, record_id, 'delete' if state.is_delete else 'upsert')
+
+
+@event.listens_for(Session, "before_commit")
+def _write_change_log(session: Session) -> None:
+    # changes still waiting for the commit's own flush must be recorded first
+    session.flush()
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    if session.bind.dialect.name == "postgresql":
+        seq = session.execute(select(_as_bigint(func.pg_current_xact_id()))).scalar_one()
+    else:
+        # SQLite runs one writing transaction at a time, so the next number is free
+        seq = session.execute(select(func.coalesce(func.max(SyncChangeLog.seq), 0) + 1)).scalar_one()
+    session.execute(insert(SyncChangeLog), [
+        dict(seq=seq, entity=entity, entity_id=entity_id, op=op) for (entity, entity_id), op in pending.items()
+    ])
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+class SyncService:
+    """Change feed over the synced collections, read from ``sync_changes`` in ``seq`` order.
+
+    The cursor is the (seq, id) of the last change returned. On PostgreSQL ``seq`` is the
+    writing transaction's id, and a page only holds changes of transactions older than
+    every one still running (the snapshot's xmin), so a late commit always lands after
+    the cursor. Upserts carry the record's current state.
+
+    Records nulled or deleted by an ON DELETE foreign key are logged when the delete goes
+    through the ORM or a bulk delete on the session; raw SQL bypasses the log.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def changes(self, since: str | None = None, limit: int | None = None) -> SyncChangesResponse:
+        limit = limit or settings.SYNC_PAGE_SIZE
+        after = decode_cursor(since, CURSOR_SCOPE, size=2) if since else None
+
+        stmt = select(SyncChangeLog).order_by(SyncChangeLog.seq, SyncChangeLog.id).limit(limit + 1)
+        if self.session.bind.dialect.name == "postgresql":
+            # evaluated in the same snapshot as the rows it filters
+            horizon = _as_bigint(func.pg_snapshot_xmin(func.pg_current_snapshot()))
+            stmt = stmt.where(SyncChangeLog.seq < horizon)
+        if after:
+            stmt = stmt.where(tuple_(SyncChangeLog.seq, SyncChangeLog.id) > tuple_(*after))
+        entries = list((await self.session.execute(stmt)).scalars())
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        # one change per record and page, at the position of its latest entry
+        latest: dict[tuple[str, UUID], SyncChangeLog] = {}
+        for entry in entries:
+            latest.pop((entry.entity, entry.entity_id), None)
+            latest[(entry.entity, entry.entity_id)] = entry
+        records = await self._records([e for e in latest.values() if e.op == 'upsert'])
+
+        changes = []
+        for entry in latest.values():
+            if entry.op == 'delete':
+                changes.append(SyncChange(
+                    entity=entry.entity, id=entry.entity_id, op='delete', changed_at=entry.changed_at,
+                ))
+                continue
+            record = records.get((entry.entity, entry.entity_id))
+            if record is None:
+                # deleted since; its delete entry follows
+                continue
+            changes.append(SyncChange(
+                entity=entry.entity, id=entry.entity_id, op='upsert', changed_at=entry.changed_at,
+                data=record.model_dump(mode='json'),
+            ))
+
+        if entries:
+            position = (entries[-1].seq, entries[-1].id)
+        else:
+            position = after or (0, 0)
+        return SyncChangesResponse(
+            changes=changes,
+            next_cursor=encode_cursor(list(position), CURSOR_SCOPE),
+            has_more=has_more,
+        )
+
+    async def _records(self, entries: list[SyncChangeLog]) -> dict[tuple[str, UUID], Any]:
+        """Current state of the upserted records, one query per entity."""
+        ids: dict[str, list[UUID]] = {}
+        for entry in entries:
+            ids.setdefault(entry.entity, []).append(entry.entity_id)
+        records = {}
+        for name, entity_ids in ids.items():
+            entity = SYNC_ENTITIES[name]
+            res = await self.session.execute(entity.select().where(entity.model.id.in_(entity_ids)))
+            rows = res.scalars().all() if entity.scalars else res.mappings().all()
+            for row in rows:
+                record = entity.schema.model_validate(row)
+                records[(name, record.id)] = record
+        return records
@@ -0,0 +1,60 @@
+from decimal import Decimal
+from typing import Literal, NamedTuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import VersionedRegistry
+from models.models import Tax
+
+
+TaxSide = Literal['sales', 'purchase']
+
+
+class TaxEntry(NamedTuple):
+    id: UUID
+    name: str
+    computation_method: str
+    value: Decimal
+
+
+class TaxRegistry(VersionedRegistry):
+    """In-memory copy of the ``taxes`` table keyed by (name, 'sales' | 'purchase').
+
+    Invalidated by the write handlers in ``api/endpoints/taxes.py``.
+    """
+
+    version_key = "taxes"
+
+    def __init__(self):
+        super().__init__()
+        self._entries: dict[tuple[str, TaxSide], TaxEntry] = {}
+
+    async def _load(self, session: AsyncSession) -> None:
+        res = await session.execute(select(Tax).order_by(Tax.created_at))
+        entries: dict[tuple[str, TaxSide], TaxEntry] = {}
+        for t in res.scalars():
+            entry = TaxEntry(t.id, t.name, t.computation_method, Decimal(t.value))
+            # first row wins if a name is (unexpectedly) duplicated
+            if t.is_applicable_on_sales:
+                entries.setdefault((t.name, 'sales'), entry)
+            if t.is_applicable_on_purchase:
+                entries.setdefault((t.name, 'purchase'), entry)
+        self._entries = entries
+
+    def lookup(self, name: str | None, side: TaxSide) -> TaxEntry | None:
+        """Return the tax applicable on ``side`` for ``name``. Call ``ensure_fresh`` first."""
+        if not name:
+            return None
+        return self._entries.get((name, side))
+
+    def percent(self, name: str | None, side: TaxSide) -> Decimal:
+        """Percentage rate used for line pricing (fixed taxes do not contribute)."""
+        entry = self.lookup(name, side)
+        if entry and entry.computation_method == 'percentage':
+            return entry.value
+        return Decimal(0)
+
+
+tax_registry = TaxRegistry()
@@ -1,31 +1,93 @@
-from uuid import uuid4
+from typing import AsyncIterator
+from uuid import UUID, uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Select, exists, insert, select
+from sqlalchemy.orm import noload, selectinload
 from datetime import date
 
+from core.counting import CountMode, count_rows
+from core.events import event_bus
+from core.exceptions import ConflictError
+from core.filters import FilterSpec, ListFilters, apply_filters, apply_sort
+from core.pagination import Page
+from core.streaming import STREAM_BATCH_SIZE
 from models.models import (
-    Product,
-    Tax,
-    ChartOfAccount,
     VendorBill,
     VendorBillLine,
     PurchaseOrder,
-    PurchaseOrderLine,
 )
-from schemas.schemas import VendorBillCreate, VendorBillResponse, VendorBillUpdate
+from schemas.schemas import (
+    VendorBillBulkResponse,
+    VendorBillBulkResult,
+    VendorBillCreate,
+    VendorBillResponse,
+    VendorBillSummary,
+    VendorBillUpdate,
+)
+from services.account_registry import account_registry
+from services.line_diff import apply_line_changes
+from services.line_resolver import LineResolver, PricedDocument, PricedLine, document_totals
 
 
 DEFAULT_PURCHASE_ACCOUNT_NAME = "Purchase Expense A/c"
 
+LIST_FILTERS = FilterSpec(
+    id=VendorBill.id,
+    status=VendorBill.status,
+    party=VendorBill.vendor_name,
+    date=VendorBill.bill_date,
+    amount=VendorBill.total_amount,
+    sorts={
+        'created_at': VendorBill.created_at,
+        'bill_date': VendorBill.bill_date,
+        'due_date': VendorBill.due_date,
+        'total_amount': VendorBill.total_amount,
+        'vendor_name': VendorBill.vendor_name,
+        'bill_number': VendorBill.bill_number,
+    },
+)
+
 
 class VendorBillService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def list_bills(self):
-        res = await self.session.execute(select(VendorBill).order_by(VendorBill.created_at.desc()))
-        bills = res.scalars().unique().all()
-        return [VendorBillResponse.model_validate(b) for b in bills]
+    @staticmethod
+    def list_statement(filters: ListFilters | None = None) -> Select:
+        """Bills matching ``filters`` in their sort order (newest first by default).
+
+        Raises ValueError for an invalid filter or sort.
+        """
+        filters = filters or ListFilters()
+        return apply_sort(apply_filters(select(VendorBill), LIST_FILTERS, filters), LIST_FILTERS, filters)
+
+    async def list_bills(
+        self,
+        include_lines: bool = False,
+        filters: ListFilters | None = None,
+        count: CountMode = 'none',
+    ) -> Page[VendorBillSummary] | Page[VendorBillResponse]:
+        """Every bill matching ``filters``, on a single page.
+
+        ``count`` selects how ``Page.total`` is computed; ``exact`` takes the length
+        of the loaded list instead of a second query.
+        """
+        stmt = self.list_statement(filters)
+        load = stmt if include_lines else stmt.options(noload(VendorBill.lines))
+        bills = (await self.session.execute(load)).scalars().unique().all()
+        total = len(bills) if count == 'exact' else await count_rows(self.session, stmt, count)
+        schema = VendorBillResponse if include_lines else VendorBillSummary
+        return Page([schema.model_validate(b) for b in bills], None, total)
+
+    async def stream_bills(self, stmt: Select) -> AsyncIterator[VendorBillResponse]:
+        """Bills of a ``list_statement`` read through a server-side cursor in batches."""
+        stmt = (
+            stmt
+            .options(selectinload(VendorBill.lines))
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for bill in await self.session.stream_scalars(stmt):
+            yield VendorBillResponse.model_validate(bill)
 
     async def get_bill(self, bill_id):
         res = await self.session.execute(select(VendorBill).where(VendorBill.id == bill_id))
@@ -47,72 +109,35 @@ class VendorBillService:
         self.session.add(bill)
         await self.session.flush()
 
-        total_untaxed = 0.0
-        total_tax = 0.0
-
         # Try fetch default COA account once
         coa_name_default = await self._get_default_purchase_account_name()
 
-        for line_in in payload.lines:
-            product = None
-            if getattr(line_in, 'product_id', None):
-                res_p = await self.session.execute(select(Product).where(Product.id == line_in.product_id))
-                product = res_p.scalar_one_or_none()
-            if not product:
-                res_p = await self.session.execute(select(Product).where(Product.name == line_in.product_name))
-                product = res_p.scalar_one_or_none()
-            if not product:
-                raise ValueError(f"Product '{line_in.product_name}' not found")
-
-            # Tax percent from tax_name, purchase side
-            tax_percent = 0.0
-            if product.tax_name:
-                res_t = await self.session.execute(select(Tax).where(
-                    Tax.name == product.tax_name,
-                    Tax.is_applicable_on_purchase == True
-                ))
-                tax_row = res_t.scalar_one_or_none()
-                if tax_row and getattr(tax_row, 'computation_method', 'percentage') == 'percentage':
-                    tax_percent = float(getattr(tax_row, 'value', 0) or 0)
-
-            untaxed = float(line_in.quantity) * float(line_in.unit_price)
-            tax_amount = round(untaxed * (tax_percent / 100), 2)
-            total = untaxed + tax_amount
-
-            total_untaxed += untaxed
-            total_tax += tax_amount
-
-            vb_line = VendorBillLine(
-                vendor_bill_id=bill.id,
-                product_id=product.id,
-                product_name=product.name,
-                hsn_code=getattr(product, 'hsn_code', None),
-                account_name=getattr(line_in, 'account_name', None) or coa_name_default,
-                quantity=line_in.quantity,
-                unit_price=line_in.unit_price,
-                tax_percent=tax_percent,
-                untaxed_amount=untaxed,
-                tax_amount=tax_amount,
-                total_amount=total,
-            )
-            self.session.add(vb_line)
+        priced = await LineResolver(self.session, 'purchase').price_lines(payload.lines)
+        self.session.add_all(self._build_lines(bill, priced, coa_name_default))
+        total_untaxed, total_tax, total_amount = document_totals(priced)
 
         bill.total_untaxed = total_untaxed
         bill.total_tax = total_tax
-        bill.total_amount = total_untaxed + total_tax
+        bill.total_amount = total_amount
 
         await self.session.commit()
         await self.session.refresh(bill)
         return VendorBillResponse.model_validate(bill)
 
     async def update_bill(self, bill_id, payload: VendorBillUpdate):
-        res = await self.session.execute(select(VendorBill).where(VendorBill.id == bill_id))
+        # lines are diffed with narrow queries, so skip loading the collection
+        res = await self.session.execute(
+            select(VendorBill).options(noload(VendorBill.lines)).where(VendorBill.id == bill_id)
+        )
         bill = res.scalar_one_or_none()
         if not bill:
             return None
 
-        if payload.status:
+        if payload.status and payload.status != bill.status:
             bill.status = payload.status
+            await event_bus.emit(self.session, 'invoice', {
+                "document_type": 'vendor_bill', "id": str(bill.id), "status": bill.status,
+            })
         if payload.vendor_name is not None:
             bill.vendor_name = payload.vendor_name
         if payload.bill_reference is not None:
@@ -125,73 +150,47 @@ class VendorBillService:
             bill.purchase_order_id = payload.purchase_order_id
 
         if payload.lines is not None:
-            # replace
-            existing = (await self.session.execute(select(VendorBillLine).where(VendorBillLine.vendor_bill_id == bill.id))).scalars().all()
-            for l in existing:
-                await self.session.delete(l)
-
-            total_untaxed = 0.0
-            total_tax = 0.0
             coa_name_default = await self._get_default_purchase_account_name()
 
-            for line_in in payload.lines:
-                product = None
-                if getattr(line_in, 'product_id', None):
-                    res_p = await self.session.execute(select(Product).where(Product.id == line_in.product_id))
-                    product = res_p.scalar_one_or_none()
-                if not product:
-                    res_p = await self.session.execute(select(Product).where(Product.name == line_in.product_name))
-                    product = res_p.scalar_one_or_none()
-                if not product:
-                    raise ValueError(f"Product '{line_in.product_name}' not found")
-
-                tax_percent = 0.0
-                if product.tax_name:
-                    res_t = await self.session.execute(select(Tax).where(
-                        Tax.name == product.tax_name,
-                        Tax.is_applicable_on_purchase == True
-                    ))
-                    tax_row = res_t.scalar_one_or_none()
-                    if tax_row and getattr(tax_row, 'computation_method', 'percentage') == 'percentage':
-                        tax_percent = float(getattr(tax_row, 'value', 0) or 0)
-
-                untaxed = float(line_in.quantity) * float(line_in.unit_price)
-                tax_amount = round(untaxed * (tax_percent / 100), 2)
-                total = untaxed + tax_amount
-
-                total_untaxed += untaxed
-                total_tax += tax_amount
-
-                new_line = VendorBillLine(
-                    vendor_bill_id=bill.id,
-                    product_id=product.id,
-                    product_name=product.name,
-                    hsn_code=getattr(product, 'hsn_code', None),
-                    account_name=getattr(line_in, 'account_name', None) or coa_name_default,
-                    quantity=line_in.quantity,
-                    unit_price=line_in.unit_price,
-                    tax_percent=tax_percent,
-                    untaxed_amount=untaxed,
-                    tax_amount=tax_amount,
-                    total_amount=total,
-                )
-                self.session.add(new_line)
-
-            bill.total_untaxed = total_untaxed
-            bill.total_tax = total_tax
-            bill.total_amount = total_untaxed + total_tax
+            priced = await LineResolver(self.session, 'purchase').price_lines(payload.lines)
+            changes = await apply_line_changes(
+                self.session, VendorBillLine, VendorBillLine.vendor_bill_id, bill.id, priced,
+                lambda p: self._line_values(p, coa_name_default),
+            )
+            changes.apply_to(bill)
 
         await self.session.commit()
-        await self.session.refresh(bill)
+        # lines were written with bulk statements; reload them for the response
+        stmt = select(VendorBill).where(VendorBill.id == bill.id).execution_options(populate_existing=True)
+        bill = (await self.session.execute(stmt)).scalar_one()
         return VendorBillResponse.model_validate(bill)
 
+    @staticmethod
+    def _line_values(p: PricedLine, default_account_name: str) -> dict:
+        return dict(
+            product_id=p.product.id,
+            product_name=p.product.name,
+            hsn_code=getattr(p.product, 'hsn_code', None),
+            account_name=getattr(p.source, 'account_name', None) or default_account_name,
+            quantity=p.quantity,
+            unit_price=p.unit_price,
+            tax_percent=p.tax_percent,
+            untaxed_amount=p.untaxed_amount,
+            tax_amount=p.tax_amount,
+            total_amount=p.total_amount,
+        )
+
+    def _build_lines(self, bill: VendorBill, priced: list[PricedLine], default_account_name: str) -> list[VendorBillLine]:
+        return [
+            VendorBillLine(vendor_bill_id=bill.id, **self._line_values(p, default_account_name))
+            for p in priced
+        ]
+
     async def _get_default_purchase_account_name(self) -> str:
         # Ideally pick a specific expense account; fallback to constant if not found.
-        res = await self.session.execute(
-            select(ChartOfAccount).where(ChartOfAccount.type == 'expense').limit(1)
-        )
-        row = res.scalar_one_or_none()
-        return row.name if row else DEFAULT_PURCHASE_ACCOUNT_NAME
+        await account_registry.ensure_fresh(self.session)
+        account = account_registry.first_of_type('expense')
+        return account.name if account else DEFAULT_PURCHASE_ACCOUNT_NAME
 
     async def create_bill_from_purchase_order(self, purchase_order_id) -> VendorBillResponse:
         """Generate a vendor bill directly from a confirmed purchase order.
@@ -201,71 +200,149 @@ class VendorBillService:
         - Copies each PO line into vendor bill lines with tax recomputed (in case tax config changed) and adds hsn_code/account_name.
         - Sets vendor_name from PO.
         - Bill number auto generated.
+        - A PO that already has a live (not cancelled) bill raises ConflictError, as the bulk path skips it.
         """
-        po = (await self.session.execute(select(PurchaseOrder).where(PurchaseOrder.id == purchase_order_id))).scalar_one_or_none()
+        # the row lock makes a concurrent call for the same PO wait, then see its bill
+        po = (await self.session.execute(
+            select(PurchaseOrder).options(selectinload(PurchaseOrder.lines))
+            .where(PurchaseOrder.id == purchase_order_id)
+            .with_for_update(of=PurchaseOrder)
+        )).scalar_one_or_none()
         if not po:
             raise ValueError("Purchase Order not found")
         if po.status != 'confirmed':
             raise ValueError("Purchase Order must be confirmed before creating a bill")
+        billed = await self.session.execute(
+            select(PurchaseOrder.id).where(PurchaseOrder.id == po.id, self._has_live_bill())
+        )
+        if billed.first():
+            raise ConflictError("Purchase Order already has a bill")
 
-        bill_number = str(uuid4())
-        bill = VendorBill(
-            bill_number=bill_number,
-            vendor_name=po.vendor_name,
-            purchase_order_id=po.id,
-            status='draft',
+        resolver = LineResolver(self.session, 'purchase')
+        await resolver.load(po.lines)
+        coa_name_default = await self._get_default_purchase_account_name()
+        doc = resolver.price_documents([self._billable_lines(po, resolver)])[0]
+        header, lines = self._bill_rows_from_purchase_order(po, doc, coa_name_default)
+        await self.session.execute(insert(VendorBill), [header])
+        if lines:
+            await self.session.execute(insert(VendorBillLine), lines)
+        await self.session.commit()
+        return await self.get_bill(header['id'])
+
+    async def create_bills_from_purchase_orders(self, purchase_order_ids: list[UUID] | None = None) -> VendorBillBulkResponse:
+        """Bill every confirmed purchase order that has no live bill yet (or just ``purchase_order_ids``).
+
+        Orders and their lines are loaded in one selectin pass, products and taxes are
+        resolved once for all of them and the default expense account is looked up once.
+        Bills and bill lines are then written with one executemany INSERT each.
+        """
+        stmt = (
+            select(PurchaseOrder)
+            .options(selectinload(PurchaseOrder.lines))
+            .where(PurchaseOrder.status == 'confirmed', ~self._has_live_bill())
+            .order_by(PurchaseOrder.created_at, PurchaseOrder.id)
+            .with_for_update(of=PurchaseOrder, skip_locked=True)
         )
-        self.session.add(bill)
-        await self.session.flush()
+        if purchase_order_ids is not None:
+            stmt = stmt.where(PurchaseOrder.id.in_(purchase_order_ids))
+        orders = (await self.session.execute(stmt)).scalars().all()
 
-        total_untaxed = 0.0
-        total_tax = 0.0
+        resolver = LineResolver(self.session, 'purchase')
+        await resolver.load(l for po in orders for l in po.lines)
         coa_name_default = await self._get_default_purchase_account_name()
 
-        # fetch lines separate to ensure fresh state (use relationship or query)
-        po_lines = (await self.session.execute(select(PurchaseOrderLine).where(PurchaseOrderLine.purchase_order_id == po.id))).scalars().all()
-        for po_line in po_lines:
-            # ensure product details for hsn_code & tax updates
-            product = (await self.session.execute(select(Product).where(Product.id == po_line.product_id))).scalar_one_or_none()
-            if not product:
-                # skip line gracefully (could also raise)
-                continue
-            tax_percent = 0.0
-            if product.tax_name:
-                res_t = await self.session.execute(select(Tax).where(
-                    Tax.name == product.tax_name,
-                    Tax.is_applicable_on_purchase == True
+        results: list[VendorBillBulkResult] = []
+        headers: list[dict] = []
+        bill_lines: list[dict] = []
+        # price every order in one engine call
+        documents = resolver.price_documents([self._billable_lines(po, resolver) for po in orders])
+        for po, doc in zip(orders, documents):
+            header, lines = self._bill_rows_from_purchase_order(po, doc, coa_name_default)
+            if not lines:
+                results.append(VendorBillBulkResult(
+                    purchase_order_id=po.id, po_number=po.po_number, success=False,
+                    error="Purchase Order has no lines with known products",
                 ))
-                tax_row = res_t.scalar_one_or_none()
-                if tax_row and getattr(tax_row, 'computation_method', 'percentage') == 'percentage':
-                    tax_percent = float(getattr(tax_row, 'value', 0) or 0)
+                continue
+            headers.append(header)
+            bill_lines.extend(lines)
+            results.append(VendorBillBulkResult(
+                purchase_order_id=po.id, po_number=po.po_number, success=True,
+                bill_id=header['id'], bill_number=header['bill_number'],
+            ))
+
+        if purchase_order_ids is not None:
+            found = {po.id for po in orders}
+            results.extend(
+                VendorBillBulkResult(
+                    purchase_order_id=po_id, success=False,
+                    error="Purchase Order not found, not confirmed or already billed",
+                )
+                for po_id in dict.fromkeys(purchase_order_ids) if po_id not in found
+            )
+
+        if headers:
+            await self.session.execute(insert(VendorBill), headers)
+            await self.session.execute(insert(VendorBillLine), bill_lines)
+        await self.session.commit()
 
-            untaxed = float(po_line.quantity) * float(po_line.unit_price)
-            tax_amount = round(untaxed * (tax_percent / 100), 2)
-            total = untaxed + tax_amount
+        created = len(headers)
+        return VendorBillBulkResponse(created=created, failed=len(results) - created, results=results)
 
-            total_untaxed += untaxed
-            total_tax += tax_amount
+    @staticmethod
+    def _has_live_bill():
+        return exists().where(
+            VendorBill.purchase_order_id == PurchaseOrder.id,
+            VendorBill.status != 'cancelled',
+        )
+
+    @staticmethod
+    def _billable_lines(po: PurchaseOrder, resolver: LineResolver) -> list[tuple]:
+        """Pair PO lines with their products; ``resolver`` must already have loaded ``po.lines``.
 
-            vb_line = VendorBillLine(
-                vendor_bill_id=bill.id,
+        Taxes are recomputed from the current configuration; lines whose product no
+        longer exists are skipped.
+        """
+        pairs = []
+        for po_line in po.lines:
+            # ensure product details for hsn_code & tax updates
+            try:
+                product = resolver.product_for(po_line)
+            except ValueError:
+                # skip line gracefully (could also raise)
+                continue
+            pairs.append((po_line, product))
+        return pairs
+
+    def _bill_rows_from_purchase_order(
+        self, po: PurchaseOrder, doc: PricedDocument, default_account_name: str
+    ) -> tuple[dict, list[dict]]:
+        """Build insert rows for a draft bill copying a purchase order's priced lines."""
+        bill_id = uuid4()
+        header = dict(
+            id=bill_id,
+            bill_number=str(uuid4()),
+            vendor_name=po.vendor_name,
+            purchase_order_id=po.id,
+            status='draft',
+            total_untaxed=doc.total_untaxed,
+            total_tax=doc.total_tax,
+            total_amount=doc.total_amount,
+        )
+        lines = [
+            dict(
+                vendor_bill_id=bill_id,
                 product_id=product.id,
                 product_name=product.name,
-                hsn_code=getattr(product, 'hsn_code', None),
-                account_name=coa_name_default,
+                hsn_code=product.hsn_code,
+                account_name=getattr(po_line, 'account_name', None) or default_account_name,
                 quantity=po_line.quantity,
                 unit_price=po_line.unit_price,
-                tax_percent=tax_percent,
+                tax_percent=percent,
                 untaxed_amount=untaxed,
-                tax_amount=tax_amount,
+                tax_amount=tax,
                 total_amount=total,
             )
-            self.session.add(vb_line)
-
-        bill.total_untaxed = total_untaxed
-        bill.total_tax = total_tax
-        bill.total_amount = total_untaxed + total_tax
-
-        await self.session.commit()
-        await self.session.refresh(bill)
-        return VendorBillResponse.model_validate(bill)
+            for (po_line, product), percent, untaxed, tax, total in doc.line_amounts()
+        ]
+        return header, lines
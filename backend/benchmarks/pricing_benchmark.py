@@ -0,0 +1,166 @@
+"""Benchmark document pricing on large documents, end to end.
+
+Run from the backend directory (settings are read from backend/.env; no database
+connection is made):
+
+    python benchmarks/pricing_benchmark.py [--lines 10000] [--docs 10] [--repeat 5]
+
+Times what the bill services do with a purchase order's lines: price them and build
+the bill line insert rows. The engine path is ``LineResolver.price_documents`` plus
+``VendorBillService._bill_rows_from_purchase_order``; the Decimal path prices each line
+with ``price_line_decimal`` and builds the same rows. Both are checked to produce the
+same amounts. The engine call alone and the old float loop's drift are reported too.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from repositories.product_repository import CachedProduct  # noqa: E402
+from services.line_resolver import LineResolver  # noqa: E402
+from services.pricing import price_batch, price_line_decimal  # noqa: E402
+from services.vendor_bill_service import VendorBillService  # noqa: E402
+
+TAXES = {name: Decimal(name) for name in ("0", "5", "12", "18", "12.5", "28")}
+ACCOUNT = "Purchase Expense A/c"
+
+
+class BenchResolver(LineResolver):
+    """Resolver reading tax percents from ``TAXES`` instead of the tax registry."""
+
+    def tax_percent_for(self, product):
+        return TAXES[product.tax_name]
+
+
+def float_loop(quantities, unit_prices, tax_percents):
+    """The per-line loop the services used before the engine."""
+    total_untaxed = 0.0
+    total_tax = 0.0
+    for qty, price, pct in zip(quantities, unit_prices, tax_percents):
+        untaxed = float(qty) * float(price)
+        tax = round(untaxed * (float(pct) / 100), 2)
+        total_untaxed += untaxed
+        total_tax += tax
+    return total_untaxed, total_tax, total_untaxed + total_tax
+
+
+def decimal_rows(orders, resolver):
+    """Bill headers and line rows for ``orders``, priced line by line in Decimal."""
+    bills = []
+    for po in orders:
+        lines = []
+        total_untaxed = total_tax = Decimal(0)
+        for po_line, product in VendorBillService._billable_lines(po, resolver):
+            percent = resolver.tax_percent_for(product)
+            untaxed, tax, total = price_line_decimal(po_line.quantity, po_line.unit_price, percent)
+            total_untaxed += untaxed
+            total_tax += tax
+            lines.append(dict(
+                vendor_bill_id=None,
+                product_id=product.id,
+                product_name=product.name,
+                hsn_code=product.hsn_code,
+                account_name=getattr(po_line, 'account_name', None) or ACCOUNT,
+                quantity=po_line.quantity,
+                unit_price=po_line.unit_price,
+                tax_percent=percent,
+                untaxed_amount=untaxed,
+                tax_amount=tax,
+                total_amount=total,
+            ))
+        header = dict(total_untaxed=total_untaxed, total_tax=total_tax, total_amount=total_untaxed + total_tax)
+        bills.append((header, lines))
+    return bills
+
+
+def engine_rows(orders, resolver):
+    """Bill headers and line rows for ``orders`` the way the bill services build them."""
+    service = VendorBillService(None)
+    documents = resolver.price_documents([service._billable_lines(po, resolver) for po in orders])
+    return [service._bill_rows_from_purchase_order(po, doc, ACCOUNT) for po, doc in zip(orders, documents)]
+
+
+def amounts(bills):
+    return [
+        (tuple(header[k] for k in ('total_untaxed', 'total_tax', 'total_amount')),
+         [(l['untaxed_amount'], l['tax_amount'], l['total_amount']) for l in lines])
+        for header, lines in bills
+    ]
+
+
+def best_of(repeat, fn, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=10_000, help="lines per document")
+    parser.add_argument("--docs", type=int, default=10, help="documents priced as one batch")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = datetime.now()
+    products = [
+        CachedProduct(
+            id=uuid.uuid4(), name=f"P{i}", type="goods", sales_price=Decimal(0), purchase_price=Decimal(0),
+            hsn_code="8471", category=None, current_stock=0, tax_name=rng.choice(list(TAXES)),
+            created_at=now, updated_at=now,
+        )
+        for i in range(500)
+    ]
+    resolver = BenchResolver(None, 'purchase')
+    resolver._products_by_id = {p.id: p for p in products}
+
+    def purchase_order():
+        lines = []
+        for _ in range(args.lines):
+            product = rng.choice(products)
+            lines.append(SimpleNamespace(
+                product_id=product.id, product_name=product.name, quantity=rng.randint(1, 500),
+                unit_price=Decimal(rng.randint(1, 10_000_000)).scaleb(-2),  # Numeric(10, 2)
+            ))
+        return SimpleNamespace(id=uuid.uuid4(), vendor_name="Vendor", lines=lines)
+
+    orders = [purchase_order() for _ in range(args.docs)]
+
+    print(f"single document, {args.lines} lines: price + build insert rows (best of {args.repeat}):")
+    one = orders[:1]
+    t_dec, dec_bills = best_of(args.repeat, decimal_rows, one, resolver)
+    t_eng, eng_bills = best_of(args.repeat, engine_rows, one, resolver)
+    print(f"  Decimal loop  {t_dec * 1000:8.2f} ms")
+    print(f"  engine        {t_eng * 1000:8.2f} ms  ({t_dec / t_eng:.1f}x vs Decimal)")
+    assert amounts(eng_bills) == amounts(dec_bills), "engine amounts differ from Decimal"
+
+    po_lines = one[0].lines
+    quantities = [l.quantity for l in po_lines]
+    unit_prices = [l.unit_price for l in po_lines]
+    percents = [resolver.tax_percent_for(resolver.product_for(l)) for l in po_lines]
+    t_call, _ = best_of(args.repeat, price_batch, quantities, unit_prices, percents)
+    float_total = float_loop(quantities, unit_prices, percents)[2]
+    drift = abs(Decimal(repr(float_total)) - dec_bills[0][0]['total_amount'])
+    print(f"  engine call alone {t_call * 1000:.2f} ms; engine == Decimal: yes; float loop header drift: {drift}")
+
+    print(f"batch of {args.docs} documents, {args.docs * args.lines} lines:")
+    t_dec_batch, dec_bills = best_of(args.repeat, decimal_rows, orders, resolver)
+    t_eng_batch, eng_bills = best_of(args.repeat, engine_rows, orders, resolver)
+    print(f"  Decimal loop  {t_dec_batch * 1000:8.2f} ms")
+    print(f"  engine        {t_eng_batch * 1000:8.2f} ms  ({t_dec_batch / t_eng_batch:.1f}x vs Decimal)")
+    assert amounts(eng_bills) == amounts(dec_bills), "engine amounts differ from Decimal"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""add cache_versions table
+
+Revision ID: 006_add_cache_versions
+Revises: 005_products_add_tax_name_drop_tax_percents
+Create Date: 2025-09-21 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '006_add_cache_versions'
+down_revision = '005_products_add_tax_name_drop_tax_percents'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # One write counter per cached collection (e.g. 'taxes'); bumped in the writing transaction
+    op.create_table(
+        'cache_versions',
+        sa.Column('key', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('key')
+    )
+
+def downgrade() -> None:
+    op.drop_table('cache_versions')
@@ -0,0 +1,18 @@
+"""index products.name for name-based line lookups
+
+Revision ID: 007_products_name_index
+Revises: 006_add_cache_versions
+Create Date: 2025-09-21 10:30:00.000000
+"""
+from alembic import op
+
+revision = '007_products_name_index'
+down_revision = '006_add_cache_versions'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_products_name'), 'products', ['name'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_products_name'), table_name='products')
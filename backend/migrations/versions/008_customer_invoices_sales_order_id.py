@@ -0,0 +1,26 @@
+"""link customer invoices to their source sales order
+
+Revision ID: 008_customer_invoices_sales_order_id
+Revises: 007_products_name_index
+Create Date: 2025-09-21 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '008_customer_invoices_sales_order_id'
+down_revision = '007_products_name_index'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column('customer_invoices', sa.Column('sales_order_id', sa.UUID(), nullable=True))
+    op.create_foreign_key(
+        'customer_invoices_sales_order_id_fkey', 'customer_invoices', 'sales_orders',
+        ['sales_order_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_index(op.f('ix_customer_invoices_sales_order_id'), 'customer_invoices', ['sales_order_id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_customer_invoices_sales_order_id'), table_name='customer_invoices')
+    op.drop_constraint('customer_invoices_sales_order_id_fkey', 'customer_invoices', type_='foreignkey')
+    op.drop_column('customer_invoices', 'sales_order_id')
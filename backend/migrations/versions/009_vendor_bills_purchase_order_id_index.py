@@ -0,0 +1,18 @@
+"""index vendor_bills.purchase_order_id for PO billing checks
+
+Revision ID: 009_vendor_bills_po_index
+Revises: 008_customer_invoices_sales_order_id
+Create Date: 2025-09-21 13:00:00.000000
+"""
+from alembic import op
+
+revision = '009_vendor_bills_po_index'
+down_revision = '008_customer_invoices_sales_order_id'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_vendor_bills_purchase_order_id'), 'vendor_bills', ['purchase_order_id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_vendor_bills_purchase_order_id'), table_name='vendor_bills')
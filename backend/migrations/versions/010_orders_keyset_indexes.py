@@ -0,0 +1,20 @@
+"""composite (created_at, id) indexes for keyset pagination of order lists
+
+Revision ID: 010_orders_keyset_indexes
+Revises: 009_vendor_bills_po_index
+Create Date: 2025-09-21 14:00:00.000000
+"""
+from alembic import op
+
+revision = '010_orders_keyset_indexes'
+down_revision = '009_vendor_bills_po_index'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index('ix_sales_orders_created_at_id', 'sales_orders', ['created_at', 'id'], unique=False)
+    op.create_index('ix_purchase_orders_created_at_id', 'purchase_orders', ['created_at', 'id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index('ix_purchase_orders_created_at_id', table_name='purchase_orders')
+    op.drop_index('ix_sales_orders_created_at_id', table_name='sales_orders')
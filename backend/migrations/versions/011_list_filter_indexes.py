@@ -0,0 +1,30 @@
+"""composite indexes for list endpoint filters
+
+Revision ID: 011_list_filter_indexes
+Revises: 010_orders_keyset_indexes
+Create Date: 2025-09-21 15:00:00.000000
+"""
+from alembic import op
+
+revision = '011_list_filter_indexes'
+down_revision = '010_orders_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_sales_orders_status_created_at', 'sales_orders', ['status', 'created_at']),
+    ('ix_purchase_orders_status_created_at', 'purchase_orders', ['status', 'created_at']),
+    ('ix_customer_invoices_status_created_at', 'customer_invoices', ['status', 'created_at']),
+    ('ix_customer_invoices_customer_id_invoice_date', 'customer_invoices', ['customer_id', 'invoice_date']),
+    ('ix_vendor_bills_status_created_at', 'vendor_bills', ['status', 'created_at']),
+    ('ix_vendor_bills_status_bill_date', 'vendor_bills', ['status', 'bill_date']),
+    ('ix_payments_status_created_at', 'payments', ['status', 'created_at']),
+]
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
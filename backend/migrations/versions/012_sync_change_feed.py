@@ -0,0 +1,42 @@
+"""change feed for client sync: taxes.updated_at, sync_tombstones, (updated_at, id) indexes
+
+Revision ID: 012_sync_change_feed
+Revises: 011_list_filter_indexes
+Create Date: 2025-09-21 16:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '012_sync_change_feed'
+down_revision = '011_list_filter_indexes'
+branch_labels = None
+depends_on = None
+
+SYNCED_TABLES = [
+    'contacts', 'products', 'taxes',
+    'sales_orders', 'purchase_orders', 'vendor_bills', 'customer_invoices', 'payments',
+]
+
+def upgrade() -> None:
+    op.add_column('taxes', sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False))
+    op.execute("UPDATE taxes SET updated_at = created_at WHERE created_at IS NOT NULL")
+
+    op.create_table(
+        'sync_tombstones',
+        sa.Column('id', sa.Uuid(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.Column('entity', sa.String(length=30), nullable=False),
+        sa.Column('entity_id', sa.Uuid(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_tombstones_deleted_at_id', 'sync_tombstones', ['deleted_at', 'id'], unique=False)
+
+    for table in SYNCED_TABLES:
+        op.create_index(f'ix_{table}_updated_at_id', table, ['updated_at', 'id'], unique=False)
+
+def downgrade() -> None:
+    for table in reversed(SYNCED_TABLES):
+        op.drop_index(f'ix_{table}_updated_at_id', table_name=table)
+    op.drop_index('ix_sync_tombstones_deleted_at_id', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
+    op.drop_column('taxes', 'updated_at')
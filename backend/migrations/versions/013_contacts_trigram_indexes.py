@@ -0,0 +1,26 @@
+"""pg_trgm GIN indexes on contacts name, email and mobile for fuzzy search
+
+Revision ID: 013_contacts_trigram_indexes
+Revises: 012_sync_change_feed
+Create Date: 2025-09-21 17:00:00.000000
+"""
+from alembic import op
+
+revision = '013_contacts_trigram_indexes'
+down_revision = '012_sync_change_feed'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ['name', 'email', 'mobile']
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in COLUMNS:
+        op.create_index(
+            f'ix_contacts_{column}_trgm', 'contacts', [column], unique=False,
+            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+def downgrade() -> None:
+    for column in reversed(COLUMNS):
+        op.drop_index(f'ix_contacts_{column}_trgm', table_name='contacts')
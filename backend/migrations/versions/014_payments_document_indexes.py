@@ -0,0 +1,20 @@
+"""index payments.vendor_bill_id and payments.customer_invoice_id for per-document history
+
+Revision ID: 014_payments_document_indexes
+Revises: 013_contacts_trigram_indexes
+Create Date: 2025-09-21 18:00:00.000000
+"""
+from alembic import op
+
+revision = '014_payments_document_indexes'
+down_revision = '013_contacts_trigram_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_payments_vendor_bill_id'), 'payments', ['vendor_bill_id'], unique=False)
+    op.create_index(op.f('ix_payments_customer_invoice_id'), 'payments', ['customer_invoice_id'], unique=False)
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_payments_customer_invoice_id'), table_name='payments')
+    op.drop_index(op.f('ix_payments_vendor_bill_id'), table_name='payments')
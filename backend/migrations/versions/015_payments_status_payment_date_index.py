@@ -0,0 +1,21 @@
+"""covering (status, payment_date) index on payments for the dashboard aggregate
+
+Revision ID: 015_payments_status_payment_date
+Revises: 014_payments_document_indexes
+Create Date: 2025-09-21 19:00:00.000000
+"""
+from alembic import op
+
+revision = '015_payments_status_payment_date'
+down_revision = '014_payments_document_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_payments_status_payment_date', 'payments', ['status', 'payment_date'], unique=False,
+        postgresql_include=['partner_type', 'amount'],
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_payments_status_payment_date', table_name='payments')
@@ -0,0 +1,36 @@
+"""monthly_financial_summary rollup of posted payments, backfilled from payments
+
+Revision ID: 016_monthly_financial_summary
+Revises: 015_payments_status_payment_date
+Create Date: 2025-09-21 20:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '016_monthly_financial_summary'
+down_revision = '015_payments_status_payment_date'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'monthly_financial_summary',
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('partner_type', sa.String(length=10), nullable=False),
+        sa.Column('total_amount', sa.Numeric(precision=16, scale=2), server_default='0', nullable=False),
+        sa.Column('payment_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('month', 'partner_type')
+    )
+    op.execute(
+        """
+        INSERT INTO monthly_financial_summary (month, partner_type, total_amount, payment_count)
+        SELECT date_trunc('month', payment_date)::date, partner_type::text, SUM(amount), COUNT(*)
+        FROM payments
+        WHERE status = 'posted'
+        GROUP BY 1, 2
+        """
+    )
+
+def downgrade() -> None:
+    op.drop_table('monthly_financial_summary')
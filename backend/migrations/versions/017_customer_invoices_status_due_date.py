@@ -0,0 +1,21 @@
+"""covering (status, due_date) index on customer_invoices for the aged receivables report
+
+Revision ID: 017_customer_invoices_status_due_date
+Revises: 016_monthly_financial_summary
+Create Date: 2025-09-21 21:00:00.000000
+"""
+from alembic import op
+
+revision = '017_customer_invoices_status_due_date'
+down_revision = '016_monthly_financial_summary'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_customer_invoices_status_due_date', 'customer_invoices', ['status', 'due_date'], unique=False,
+        postgresql_include=['customer_id', 'customer_name', 'invoice_date', 'total_amount', 'amount_paid'],
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_customer_invoices_status_due_date', table_name='customer_invoices')
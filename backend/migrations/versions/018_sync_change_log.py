@@ -0,0 +1,74 @@
+"""commit-ordered sync_changes log replaces sync_tombstones and the (updated_at, id) feed indexes
+
+Revision ID: 018_sync_change_log
+Revises: 017_customer_invoices_status_due_date
+Create Date: 2025-09-22 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '018_sync_change_log'
+down_revision = '017_customer_invoices_status_due_date'
+branch_labels = None
+depends_on = None
+
+SYNCED_TABLES = [
+    'contacts', 'products', 'taxes',
+    'sales_orders', 'purchase_orders', 'vendor_bills', 'customer_invoices', 'payments',
+]
+# (updated_at, id) indexes only the old feed used; orders keep theirs for sorted lists
+FEED_ONLY_INDEXES = ['contacts', 'products', 'taxes', 'vendor_bills', 'customer_invoices', 'payments']
+
+def upgrade() -> None:
+    op.create_table(
+        'sync_changes',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('seq', sa.BigInteger(), nullable=False),
+        sa.Column('entity', sa.String(length=30), nullable=False),
+        sa.Column('entity_id', sa.Uuid(), nullable=False),
+        sa.Column('op', sa.String(length=10), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_changes_seq_id', 'sync_changes', ['seq', 'id'], unique=False)
+
+    # seq 0 holds what existed before the log: deletions first, then every live record
+    op.execute(
+        """
+        INSERT INTO sync_changes (seq, entity, entity_id, op, changed_at)
+        SELECT 0, entity, entity_id, 'delete', deleted_at FROM sync_tombstones ORDER BY deleted_at, id
+        """
+    )
+    for table in SYNCED_TABLES:
+        op.execute(
+            f"""
+            INSERT INTO sync_changes (seq, entity, entity_id, op, changed_at)
+            SELECT 0, '{table}', id, 'upsert', updated_at FROM {table} ORDER BY updated_at, id
+            """
+        )
+
+    op.drop_index('ix_sync_tombstones_deleted_at_id', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
+    for table in FEED_ONLY_INDEXES:
+        op.drop_index(f'ix_{table}_updated_at_id', table_name=table)
+
+def downgrade() -> None:
+    for table in reversed(FEED_ONLY_INDEXES):
+        op.create_index(f'ix_{table}_updated_at_id', table, ['updated_at', 'id'], unique=False)
+    op.create_table(
+        'sync_tombstones',
+        sa.Column('id', sa.Uuid(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.Column('entity', sa.String(length=30), nullable=False),
+        sa.Column('entity_id', sa.Uuid(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_tombstones_deleted_at_id', 'sync_tombstones', ['deleted_at', 'id'], unique=False)
+    op.execute(
+        """
+        INSERT INTO sync_tombstones (entity, entity_id, deleted_at)
+        SELECT entity, entity_id, changed_at FROM sync_changes WHERE op = 'delete'
+        """
+    )
+    op.drop_index('ix_sync_changes_seq_id', table_name='sync_changes')
+    op.drop_table('sync_changes')
@@ -0,0 +1,34 @@
+"""sync_changes.seq from the writing transaction id instead of the cache_versions counter
+
+Revision ID: 019_sync_changes_xact_seq
+Revises: 018_sync_change_log
+Create Date: 2025-09-22 11:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '019_sync_changes_xact_seq'
+down_revision = '018_sync_change_log'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # every counter value was drawn by an earlier transaction, so existing seqs stay
+    # below the transaction ids written from now on
+    op.execute("DELETE FROM cache_versions WHERE key = 'sync_changes'")
+
+def downgrade() -> None:
+    # renumber densely so the counter (an integer) can continue after the last seq
+    op.execute(
+        """
+        UPDATE sync_changes SET seq = ranked.seq
+        FROM (SELECT id, dense_rank() OVER (ORDER BY seq) - 1 AS seq FROM sync_changes) AS ranked
+        WHERE sync_changes.id = ranked.id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO cache_versions (key, version)
+        SELECT 'sync_changes', COALESCE(MAX(seq), 0) FROM sync_changes
+        """
+    )
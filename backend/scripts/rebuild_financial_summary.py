@@ -0,0 +1,26 @@
+"""Rebuild ``monthly_financial_summary`` from posted payments.
+
+Run from the backend directory after a backfill, a bulk import or a manual fix to
+payments (anything that bypassed ``PaymentService``):
+
+    python scripts/rebuild_financial_summary.py
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from core.database import AsyncSessionLocal, engine  # noqa: E402
+from services.financial_summary import rebuild_monthly_summary  # noqa: E402
+
+
+async def main() -> None:
+    async with AsyncSessionLocal() as session:
+        rows = await rebuild_monthly_summary(session)
+    await engine.dispose()
+    print(f"monthly_financial_summary rebuilt: {rows} rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())